@@ -2,6 +2,6 @@
 API Package Initialization
 """
 
-from app.api import voice
+from app.api import voice, knowledge, audit, admin
 
-__all__ = ["voice"]
+__all__ = ["voice", "knowledge", "audit", "admin"]
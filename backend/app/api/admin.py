@@ -0,0 +1,188 @@
+"""
+Admin API Endpoints
+Diagnostics for the running process: sampling profiles, event-loop stalls
+and memory
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from datetime import datetime
+import asyncio
+import gc
+import threading
+import tracemalloc
+
+from app.core.config import settings
+from app.core.logging import logger, log_stats
+from app.core.profiler import profiler, loop_watchdog, read_rss, object_counts, top_allocations
+from app.api.voice import call_sessions
+from app.services.consent_store import consent_store
+from app.services.conversation_memory import conversation_store
+
+router = APIRouter()
+
+
+# ==================== PROFILER ====================
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def run_profile(
+    seconds: float = Query(10, gt=0, le=settings.PROFILER_MAX_SECONDS),
+    mode: str = Query("wall", pattern="^(wall|cpu)$"),
+    interval_ms: Optional[float] = Query(None, ge=1, le=1000),
+    loop_only: bool = False
+):
+    """
+    Sample the process for a while and return a flamegraph
+
+    Args:
+        seconds: Profile duration
+        mode: wall (time spent, waiting included) or cpu (CPU time only)
+        interval_ms: Sampling interval (default PROFILER_INTERVAL_MS)
+        loop_only: Only sample the event loop thread
+
+    Returns:
+        Collapsed stacks ("thread;outer;...;inner weight" lines) for
+        flamegraph.pl, speedscope or Pyroscope; wall weights are samples,
+        cpu weights microseconds
+    """
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    # Handlers run on the event loop thread
+    loop_thread = threading.get_ident() if loop_only else None
+    logger.info(f"🔬 Profiling {mode} for {seconds}s")
+    try:
+        stacks, samples = await asyncio.to_thread(
+            profiler.profile,
+            seconds,
+            mode=mode,
+            interval=interval_ms / 1000 if interval_ms else None,
+            thread_id=loop_thread
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    filename = f"profile-{mode}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.folded"
+    return PlainTextResponse(
+        stacks,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(samples)
+        }
+    )
+
+
+# ==================== EVENT LOOP WATCHDOG ====================
+
+def _watchdog_status() -> dict:
+    return {
+        "enabled": loop_watchdog.running,
+        "threshold_ms": round(loop_watchdog.threshold * 1000, 1),
+        "stalls": loop_watchdog.stalls,
+        "worst_ms": round(loop_watchdog.worst * 1000, 1)
+    }
+
+
+@router.get("/loop-watchdog")
+async def get_loop_watchdog():
+    """Event loop stall watchdog state and stalls seen since startup"""
+    return _watchdog_status()
+
+
+@router.put("/loop-watchdog")
+async def set_loop_watchdog(
+    enabled: bool = True,
+    threshold_ms: Optional[float] = Query(None, ge=10)
+):
+    """
+    Turn the stall watchdog on or off, or change its threshold
+
+    Args:
+        enabled: Watch the loop
+        threshold_ms: Log callbacks blocking the loop longer than this
+
+    Returns:
+        Watchdog state
+    """
+    if enabled:
+        await loop_watchdog.start(threshold_ms)
+    else:
+        await loop_watchdog.stop()
+        logger.info("🐕 Event loop watchdog off")
+    return _watchdog_status()
+
+
+# ==================== MEMORY ====================
+
+@router.get("/memory")
+async def get_memory(
+    top: int = Query(50, ge=1, le=500),
+    collect: bool = True
+):
+    """
+    Memory snapshot for leak hunting
+
+    Args:
+        top: Object types and allocation sites to list
+        collect: Run a full garbage collection first, so only reachable
+            objects are counted
+
+    Returns:
+        RSS, live objects per type, tracemalloc's top allocation sites
+        since tracing started (null while it is off), the sizes of the
+        in-process stores, the worst event loop lag since the previous
+        snapshot and the log writer's queue depth and dropped records
+    """
+    # Walking the heap blocks the loop; that pause is ours, not a stall
+    with loop_watchdog.excused():
+        if collect:
+            gc.collect()
+        memory = read_rss()
+        total, counts = object_counts(top)
+        allocations = top_allocations(top)
+    return {
+        "rss_bytes": memory["rss"],
+        "peak_rss_bytes": memory["peak"],
+        "gc_objects": total,
+        "objects": counts,
+        "tracemalloc": allocations,
+        "stores": {
+            "call_sessions": len(call_sessions),
+            "consent_cache": len(consent_store),
+            "conversations": len(conversation_store)
+        },
+        "loop": {
+            "peak_lag_ms": round(loop_watchdog.take_peak_lag() * 1000, 1),
+            "stalls": loop_watchdog.stalls
+        },
+        "log_queue": log_stats()
+    }
+
+
+@router.put("/tracemalloc")
+async def set_tracemalloc(
+    enabled: bool = True,
+    frames: int = Query(1, ge=1, le=50)
+):
+    """
+    Start or stop tracing allocations
+
+    Starting clears earlier traces, so GET /memory then reports what was
+    allocated since and is still alive.
+
+    Args:
+        enabled: Trace allocations
+        frames: Stack frames stored per allocation
+
+    Returns:
+        Tracing state
+    """
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    if enabled:
+        tracemalloc.start(frames)
+        logger.info(f"🧮 tracemalloc on, {frames} frame(s) per allocation")
+    else:
+        logger.info("🧮 tracemalloc off")
+    return {"tracing": tracemalloc.is_tracing(), "frames": tracemalloc.get_traceback_limit() if enabled else 0}
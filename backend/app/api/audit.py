@@ -0,0 +1,68 @@
+"""
+Audit API Endpoints
+Compliance queries over the audit store
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from datetime import datetime, timedelta
+import asyncio
+
+from app.services.audit_store import audit_store
+
+from app.core.config import settings
+
+router = APIRouter()
+
+
+# ==================== ENDPOINTS ====================
+
+@router.get("/events")
+async def query_audit_events(
+    phone_number: Optional[str] = None,
+    call_id: Optional[str] = None,
+    event: Optional[str] = None,
+    days: int = Query(90, ge=1),
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """
+    Find audit events
+
+    Args:
+        phone_number: User phone number (matched by hash, never stored)
+        call_id: Call identifier
+        event: Event type, e.g. outbound_call_initiated
+        days: Look-back window
+        limit: Maximum events to return
+
+    Returns:
+        Matching events, most recent first
+    """
+    if not (phone_number or call_id or event):
+        raise HTTPException(status_code=400, detail="Provide phone_number, call_id or event")
+
+    days = min(days, settings.AUDIT_LOG_RETENTION_DAYS)
+    events = await asyncio.to_thread(
+        audit_store.query,
+        user_id=phone_number,
+        call_id=call_id,
+        event=event,
+        since=datetime.now() - timedelta(days=days),
+        limit=limit,
+        newest_first=True
+    )
+
+    return {
+        "success": True,
+        "count": len(events),
+        "events": events
+    }
+
+
+@router.get("/stats")
+async def get_audit_stats():
+    """Get audit store status"""
+    return {
+        "success": True,
+        "data": await asyncio.to_thread(audit_store.stats)
+    }
@@ -0,0 +1,144 @@
+"""
+Knowledge Base API Endpoints
+Document ingestion and index status for RAG
+"""
+
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
+import asyncio
+import os
+
+from app.services.ingestion import IngestionPipeline
+from app.services.rag_service import rag_service
+
+from app.core.config import settings
+from app.core.security import require_admin
+
+from app.core.logging import logger, audit_log
+
+router = APIRouter()
+
+
+# ==================== REQUEST MODELS ====================
+
+class IngestRequest(BaseModel):
+    """Knowledge base ingestion request"""
+    paths: List[str] = []  # Relative to KNOWLEDGE_BASE_DIR; empty = whole tree
+    sector: Optional[str] = None
+    force: bool = False
+
+
+class SearchRequest(BaseModel):
+    """Knowledge base search request"""
+    query: str
+    sector: Optional[str] = None
+    top_k: int = 4
+    mode: Optional[str] = None  # vector | lexical | hybrid
+
+
+# ==================== ENDPOINTS ====================
+
+def _resolve_paths(paths: List[str]) -> List[str]:
+    """Resolve request paths, refusing anything outside KNOWLEDGE_BASE_DIR"""
+    root = os.path.realpath(settings.KNOWLEDGE_BASE_DIR)
+    resolved = []
+    for path in paths or [""]:
+        full = os.path.realpath(os.path.join(root, path))
+        if full != root and not full.startswith(root + os.sep):
+            raise HTTPException(status_code=400, detail=f"Path outside knowledge base: {path}")
+        if not os.path.exists(full):
+            raise HTTPException(status_code=404, detail=f"Path not found: {path}")
+        resolved.append(full)
+    return resolved
+
+
+@router.post("/ingest")
+async def ingest_documents(
+    request: IngestRequest,
+    admin: Optional[Dict[str, Any]] = Depends(require_admin)
+):
+    """
+    Ingest documents from the knowledge base directory
+
+    Unchanged files are skipped and only changed chunks are re-embedded.
+    Ingestion rewrites what the agent answers from, so it needs the admin
+    role (localhost only while AUTH_ENABLED is off), like /api/admin.
+
+    Args:
+        request: Ingestion request
+        admin: Admin token payload (None when auth is disabled)
+
+    Returns:
+        Ingestion statistics
+    """
+    paths = _resolve_paths(request.paths)
+
+    try:
+        pipeline = IngestionPipeline()
+        stats = await asyncio.to_thread(pipeline.ingest, paths, request.sector, request.force)
+
+        audit_log(
+            event="knowledge_base_ingested",
+            user_id=admin.get("sub") if admin else None,
+            metadata={
+                "paths": request.paths,
+                "files": stats["files"],
+                "chunks_embedded": stats["embedded"],
+                "chunks_deleted": stats["deleted"]
+            }
+        )
+
+        return {
+            "success": True,
+            "data": stats
+        }
+
+    except Exception as e:
+        logger.error(f"❌ Ingestion failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/search")
+async def search_knowledge_base(request: SearchRequest):
+    """
+    Retrieve the passages RAG would use for a query
+
+    Args:
+        request: Search request
+
+    Returns:
+        Matching passages with similarity scores
+    """
+    passages = await asyncio.to_thread(
+        rag_service.retrieve_sync,
+        request.query,
+        request.sector,
+        request.top_k,
+        None,
+        request.mode
+    )
+
+    return {
+        "success": True,
+        "data": passages
+    }
+
+
+@router.get("/stats")
+async def get_index_stats():
+    """Get vector index status"""
+    index = rag_service.index
+
+    return {
+        "success": True,
+        "data": {
+            "chunks": index.live_count(),
+            "rows": len(index),
+            "dimension": index.dimension,
+            "embedder": rag_service.embedder.name,
+            "lexical_terms": len(rag_service.lexical.vocabulary),
+            "lexical_chunks": len(rag_service.lexical),
+            "ivf_clusters": 0 if index.ivf_centroids is None else int(index.ivf_centroids.shape[0])
+        }
+    }
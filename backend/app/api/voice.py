@@ -3,17 +3,30 @@ Voice AI API Endpoints
 Outbound voice calls using Twilio Voice API
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, field_validator
+from typing import Optional, List, AsyncIterator, Callable
 from datetime import datetime
+import asyncio
+import base64
+import json
 import uuid
 
 from app.services.sarvam_service import sarvam_service
-from app.services.groq_service import groq_service
+from app.services.groq_service import groq_service, SENTENCE_BOUNDARY
+from app.services.response_cache import response_cache
+from app.services.conversation_memory import conversation_store
+from app.services.rag_service import rag_service
+from app.services.dnd_registry import dnd_registry
+from app.services.phone_normalizer import normalize, normalize_recipients
+
+from app.core.config import settings
 
 from app.core.logging import logger, audit_log
-from app.core.security import ConsentManager, get_call_recording_disclosure
+from app.core.metrics import provider_call, timed, call_status, live_sessions
+from app.core.tracing import trace_store, trace_exporter, otlp_payload
+from app.core.security import ConsentManager, get_call_recording_disclosure, verify_twilio_signature
 
 router = APIRouter()
 
@@ -28,6 +41,21 @@ class OutboundCallRequest(BaseModel):
     language: str = "en"
     customer_data: dict = {}
     public_url: Optional[str] = None
+    
+    @field_validator("phone_number")
+    @classmethod
+    def normalize_phone_number(cls, value: str) -> str:
+        """Canonicalize to E.164 so consent, DND and Twilio see one form"""
+        normalized = normalize(value)
+        if normalized is None:
+            raise ValueError(f"Invalid phone number: {value}")
+        return normalized
+
+
+class ScreenRequest(BaseModel):
+    """Pre-dial screening request for a campaign list"""
+    phone_numbers: List[str]
+    consent_type: str = "outbound_call"
 
 
 class VoiceQueryRequest(BaseModel):
@@ -42,6 +70,21 @@ class VoiceQueryRequest(BaseModel):
 
 call_sessions = {}
 
+# Twilio statuses after which a call is over
+TERMINAL_CALL_STATUSES = {"completed", "busy", "no-answer", "failed", "canceled"}
+
+# Dialled calls that have not reached a terminal status, counted at scrape time
+live_sessions.set_function(lambda: sum(
+    1 for session in list(call_sessions.values())
+    if "twilio_call_sid" in session
+    and session.get("status") != "completed"
+    and session.get("twilio_status") not in TERMINAL_CALL_STATUSES
+))
+
+# Sarvam's demo-mode fallback returns a bare WAV header; anything this
+# small is not real speech
+MOCK_AUDIO_MAX_BYTES = 100
+
 
 # ==================== ENDPOINTS ====================
 
@@ -59,29 +102,28 @@ async def initiate_outbound_call(request: OutboundCallRequest):
     try:
         logger.info(f"🔵 Initiating REAL voice call to {request.phone_number}")
         
-        # Check consent
-        if not ConsentManager.check_consent(request.phone_number, "outbound_call"):
+        # Scrub against the national DND registry
+        if settings.DND_REGISTRY_ENABLED and dnd_registry.contains(request.phone_number):
+            logger.warning(f"📵 Number on DND registry, call blocked: {request.phone_number}")
+            audit_log(
+                event="outbound_call_blocked_dnd",
+                user_id=request.phone_number,
+                metadata={"purpose": request.purpose, "sector": request.sector}
+            )
+            raise HTTPException(status_code=403, detail="Number is registered on the DND registry")
+        
+        # Check consent (SQLite reads and WAL commits stay off the event loop)
+        if not await asyncio.to_thread(ConsentManager.check_consent, request.phone_number, "outbound_call"):
             logger.warning(f"No outbound call consent for {request.phone_number}")
-            ConsentManager.record_consent(
+            await asyncio.to_thread(
+                ConsentManager.record_consent,
                 user_id=request.phone_number,
                 consent_type="outbound_call",
                 granted=False
             )
         
         # Create call session
-        call_id = str(uuid.uuid4())
-        call_sessions[call_id] = {
-            "call_id": call_id,
-            "phone_number": request.phone_number,
-            "purpose": request.purpose,
-            "sector": request.sector,
-            "language": request.language,
-            "customer_data": request.customer_data,
-            "status": "initiated",
-            "created_at": datetime.utcnow().isoformat(),
-            "messages": [],
-            "public_url": request.public_url
-        }
+        call_id = _create_call_session(request)
         
         # Generate initial greeting
         greeting = await _generate_call_greeting(request)
@@ -102,15 +144,17 @@ async def initiate_outbound_call(request: OutboundCallRequest):
         # Store audio and greeting in session
         call_sessions[call_id]["audio_bytes"] = audio_bytes
         call_sessions[call_id]["greeting"] = greeting
+        conversation_store.get(call_id).add_message("assistant", greeting)
         
         # Make REAL Twilio Voice call
         from twilio.rest import Client
-        from app.core.config import settings
         
         client = Client(
             settings.TWILIO_ACCOUNT_SID,
             settings.TWILIO_AUTH_TOKEN
         )
+        if settings.TWILIO_API_BASE_URL:
+            client.api.base_url = settings.TWILIO_API_BASE_URL.rstrip('/')
         
         # Create TwiML URL for the call
         # This will be the URL Twilio calls to get instructions
@@ -130,14 +174,15 @@ async def initiate_outbound_call(request: OutboundCallRequest):
         # Use PUBLIC_URL for status callback if available
         status_callback_url = f"{base_url}/api/voice/status/{call_id}"
         
-        twilio_call = client.calls.create(
-            to=request.phone_number,
-            from_=settings.TWILIO_PHONE_NUMBER,
-            url=twiml_url,
-            method='POST',
-            status_callback=status_callback_url,
-            status_callback_event=['initiated', 'ringing', 'answered', 'completed']
-        )
+        with provider_call("twilio", "twilio_call_create"):
+            twilio_call = client.calls.create(
+                to=request.phone_number,
+                from_=settings.TWILIO_PHONE_NUMBER,
+                url=twiml_url,
+                method='POST',
+                status_callback=status_callback_url,
+                status_callback_event=['initiated', 'ringing', 'answered', 'completed']
+            )
         
         # Update session with Twilio call SID
         call_sessions[call_id]["twilio_call_sid"] = twilio_call.sid
@@ -156,9 +201,7 @@ async def initiate_outbound_call(request: OutboundCallRequest):
             }
         )
         
-        logger.info(f"✅ REAL Twilio call initiated with Sarvam AI audio!")
-        logger.info(f"   Call ID: {call_id}")
-        logger.info(f"   Twilio SID: {twilio_call.sid}")
+        logger.info(f"✅ REAL Twilio call initiated with Sarvam AI audio! Call ID: {call_id} Twilio SID: {twilio_call.sid}")
         
         return {
             "success": True,
@@ -171,14 +214,64 @@ async def initiate_outbound_call(request: OutboundCallRequest):
             "audio_provider": "sarvam_ai"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"❌ Failed to initiate voice call: {str(e)}")
-        logger.error(f"   Error type: {type(e).__name__}")
-        import traceback
-        logger.error(f"   Traceback: {traceback.format_exc()}")
+        logger.exception(f"❌ Failed to initiate voice call: {type(e).__name__}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to initiate call: {str(e)}")
 
 
+@router.post("/screen")
+async def screen_numbers(request: ScreenRequest):
+    """
+    Pre-dial screening of a campaign list against the DND registry and consent
+    
+    Args:
+        request: Numbers to screen
+    
+    Returns:
+        Distinct E.164 numbers split into callable, DND-registered and
+        without consent, plus duplicate and reject counts
+    """
+    recipients = await asyncio.to_thread(normalize_recipients, request.phone_numbers)
+    numbers = recipients["numbers"]
+    on_dnd = [False] * len(numbers)
+    if settings.DND_REGISTRY_ENABLED:
+        on_dnd = await asyncio.to_thread(dnd_registry.contains_many, numbers)
+    consent = await asyncio.to_thread(ConsentManager.check_consent_bulk, numbers, request.consent_type)
+    
+    callable_numbers, dnd_numbers, no_consent = [], [], []
+    for number, dnd, granted in zip(numbers, on_dnd, consent):
+        if dnd:
+            dnd_numbers.append(number)
+        elif not granted:
+            no_consent.append(number)
+        else:
+            callable_numbers.append(number)
+    
+    audit_log(
+        event="campaign_screened",
+        metadata={
+            "numbers": recipients["total"],
+            "duplicates": recipients["duplicates"],
+            "rejected": recipients["rejected"],
+            "callable": len(callable_numbers),
+            "dnd": len(dnd_numbers),
+            "no_consent": len(no_consent)
+        }
+    )
+    
+    return {
+        "success": True,
+        "callable": callable_numbers,
+        "dnd": dnd_numbers,
+        "no_consent": no_consent,
+        "duplicates": recipients["duplicates"],
+        "rejected": recipients["rejected"],
+        "rejects": recipients["rejects"]
+    }
+
+
 @router.post("/tts")
 async def text_to_speech(
     text: str,
@@ -269,22 +362,50 @@ async def process_voice_query(request: VoiceQueryRequest):
     try:
         # Get or create session
         session_id = request.session_id or str(uuid.uuid4())
+        memory = conversation_store.get(session_id)
+        history = memory.context_messages()
+        
+        # Repeated questions skip the LLM (and TTS when audio is cached).
+        # Follow-ups depend on the conversation, so only first turns are cached.
+        use_cache = settings.RESPONSE_CACHE_ENABLED and not history
+        cached = None
+        if use_cache:
+            cached = response_cache.get(request.text, request.sector, request.language)
+        
+        if cached:
+            response_text = cached["text"]
+            cache_key = cached["key"]
+            logger.info(f"⚡ Response cache {cached['match']} hit (similarity {cached['similarity']:.2f})")
+        else:
+            # Ground the response in the knowledge base
+            context = await rag_service.get_context(request.text, request.sector)
+            response_text = await groq_service.generate_bfsi_response(
+                user_query=request.text,
+                context=context,
+                sector=request.sector,
+                language=request.language,
+                history=history
+            )
+            cache_key = None
+            if use_cache:
+                cache_key = response_cache.put(request.text, request.sector, request.language, response_text)
         
-        # Generate response (without RAG context)
-        response_text = await groq_service.generate_bfsi_response(
-            user_query=request.text,
-            context="",
-            sector=request.sector,
-            language=request.language
-        )
+        memory.add_message("user", request.text)
+        memory.add_message("assistant", response_text)
+        memory.schedule_compaction(groq_service.summarize_conversation)
         
-        # Convert to speech
-        audio_bytes = await sarvam_service.text_to_speech(
-            text=response_text,
-            language=request.language
-        )
+        if cached and cached["audio"]:
+            audio_bytes = cached["audio"]
+        else:
+            # Convert to speech
+            audio_bytes = await sarvam_service.text_to_speech(
+                text=response_text,
+                language=request.language
+            )
+            # Never cache the demo-mode placeholder audio
+            if cache_key and len(audio_bytes) >= MOCK_AUDIO_MAX_BYTES:
+                response_cache.attach_audio(cache_key, audio_bytes)
         
-        import base64
         audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
         
         return {
@@ -292,7 +413,8 @@ async def process_voice_query(request: VoiceQueryRequest):
             "session_id": session_id,
             "text_response": response_text,
             "audio_response": audio_base64,
-            "language": request.language
+            "language": request.language,
+            "cached": bool(cached)
         }
         
     except Exception as e:
@@ -300,6 +422,88 @@ async def process_voice_query(request: VoiceQueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/query/stream")
+async def stream_voice_query(request: VoiceQueryRequest):
+    """
+    Process voice query with sentence-level streaming audio
+    
+    Each sentence is sent to Sarvam TTS as soon as the LLM completes it,
+    so the first audio chunk arrives after the first sentence instead of
+    after the whole answer.
+    
+    Args:
+        request: Voice query request
+    
+    Returns:
+        Server-Sent Events stream: one `audio` event per sentence, then `done`
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+    memory = conversation_store.get(session_id)
+    history = memory.context_messages()
+    
+    use_cache = settings.RESPONSE_CACHE_ENABLED and not history
+    cached = None
+    if use_cache:
+        cached = response_cache.get(request.text, request.sector, request.language)
+    
+    if cached and cached["audio"]:
+        memory.add_message("user", request.text)
+        memory.add_message("assistant", cached["text"])
+        # Whole answer is already synthesized: a single audio event
+        return StreamingResponse(
+            _stream_cached_audio(cached, session_id, request.language),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no"
+            }
+        )
+    
+    if cached:
+        logger.info(f"⚡ Response cache {cached['match']} hit (similarity {cached['similarity']:.2f}), text only")
+        
+        def remember_cached(text_response: str):
+            memory.add_message("user", request.text)
+            memory.add_message("assistant", text_response)
+        
+        # Answer text is cached but not its audio: synthesize it sentence by sentence
+        return StreamingResponse(
+            _stream_sentence_audio(
+                _cached_sentences(cached["text"]), session_id, request.language, on_complete=remember_cached
+            ),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no"
+            }
+        )
+    
+    context = await rag_service.get_context(request.text, request.sector)
+    sentences = groq_service.stream_bfsi_response(
+        user_query=request.text,
+        context=context,
+        sector=request.sector,
+        language=request.language,
+        history=history
+    )
+    
+    def remember_response(text_response: str):
+        memory.add_message("user", request.text)
+        memory.add_message("assistant", text_response)
+        memory.schedule_compaction(groq_service.summarize_conversation)
+        if use_cache and text_response:
+            response_cache.put(request.text, request.sector, request.language, text_response)
+    
+    return StreamingResponse(
+        _stream_sentence_audio(sentences, session_id, request.language, on_complete=remember_response),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.get("/call/{call_id}")
 async def get_call_details(call_id: str):
     """
@@ -314,12 +518,40 @@ async def get_call_details(call_id: str):
     if call_id not in call_sessions:
         raise HTTPException(status_code=404, detail="Call not found")
     
+    memory = conversation_store.peek(call_id)
+    
     return {
         "success": True,
-        "data": call_sessions[call_id]
+        "data": call_sessions[call_id],
+        "conversation": memory.snapshot() if memory else None
     }
 
 
+@router.get("/call/{call_id}/trace")
+async def get_call_trace(call_id: str, format: str = "timeline"):
+    """
+    Latency timeline of a call
+    
+    Spans for greeting generation, TTS, the Twilio dial request, Twilio's
+    TwiML and audio fetches, and one event per status callback, in
+    milliseconds from the outbound request.
+    
+    Args:
+        call_id: Call ID
+        format: "timeline" or "otlp" (OpenTelemetry JSON)
+    
+    Returns:
+        Call trace
+    """
+    trace = trace_store.get(call_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    
+    if format == "otlp":
+        return otlp_payload([trace])
+    return {"success": True, "trace": trace.to_dict()}
+
+
 @router.post("/call/{call_id}/complete")
 async def complete_call(call_id: str, outcome: str):
     """
@@ -379,7 +611,8 @@ async def get_available_voices(language: str = "en"):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/twiml/{call_id}")
+@router.post("/twiml/{call_id}", dependencies=[Depends(verify_twilio_signature)])
+@timed("twiml_fetch")
 async def get_twiml_for_call(call_id: str):
     """
     TwiML endpoint for Twilio Voice calls
@@ -401,7 +634,7 @@ async def get_twiml_for_call(call_id: str):
         # Check if audio is likely the mock audio (Sarvam failed)
         # The mock audio header is very small (< 100 bytes usually)
         audio_bytes = session.get("audio_bytes", b"")
-        use_fallback_tts = len(audio_bytes) < 100
+        use_fallback_tts = len(audio_bytes) < MOCK_AUDIO_MAX_BYTES
         
         
         # Language-specific Twilio voices
@@ -458,7 +691,8 @@ async def get_twiml_for_call(call_id: str):
         return Response(content=twiml, media_type="application/xml")
 
 
-@router.get("/audio/{call_id}.wav")
+@router.get("/audio/{call_id}.wav", dependencies=[Depends(verify_twilio_signature)])
+@timed("audio_fetch")
 async def get_call_audio(call_id: str):
     """Serve the Sarvam AI audio file for a specific call session"""
     from fastapi.responses import Response
@@ -478,7 +712,7 @@ async def get_call_audio(call_id: str):
     )
 
 
-@router.post("/status/{call_id}")
+@router.post("/status/{call_id}", dependencies=[Depends(verify_twilio_signature)])
 async def handle_call_status(
     call_id: str,
     CallSid: str = Form(...),
@@ -501,11 +735,14 @@ async def handle_call_status(
         Success response
     """
     try:
-        logger.info(f"📊 Call status update for {call_id}:")
-        logger.info(f"   Twilio SID: {CallSid}")
-        logger.info(f"   Status: {CallStatus}")
-        logger.info(f"   From: {From}")
-        logger.info(f"   To: {To}")
+        logger.info(f"📊 Call status update for {call_id}: {CallStatus} (Twilio SID: {CallSid}, From: {From}, To: {To})")
+        call_status.inc(CallStatus)
+        
+        trace = trace_store.get(call_id)
+        if trace is not None:
+            trace.event(f"status:{CallStatus}")
+            if CallStatus in TERMINAL_CALL_STATUSES:
+                trace_exporter.submit(trace)
         
         if call_id in call_sessions:
             call_sessions[call_id]["twilio_status"] = CallStatus
@@ -531,6 +768,139 @@ async def handle_call_status(
 
 # ==================== HELPER FUNCTIONS ====================
 
+def _sse_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_cached_audio(
+    cached: dict,
+    session_id: str,
+    language: str
+) -> AsyncIterator[str]:
+    """Emit a cached answer as one audio event"""
+    yield _sse_event("audio", {
+        "session_id": session_id,
+        "index": 0,
+        "text": cached["text"],
+        "audio": base64.b64encode(cached["audio"]).decode('utf-8')
+    })
+    yield _sse_event("done", {
+        "session_id": session_id,
+        "text_response": cached["text"],
+        "sentences": 1,
+        "language": language,
+        "cached": True
+    })
+
+
+async def _cached_sentences(text: str) -> AsyncIterator[str]:
+    """Replay a cached answer one sentence at a time"""
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        if sentence.strip():
+            yield sentence.strip()
+
+
+async def _stream_sentence_audio(
+    sentences: AsyncIterator[str],
+    session_id: str,
+    language: str,
+    on_complete: Optional[Callable[[str], None]] = None
+) -> AsyncIterator[str]:
+    """
+    Synthesize sentences while the LLM is still generating
+    
+    A producer task starts TTS for every sentence the moment it completes;
+    the consumer emits the audio events strictly in sentence order.
+    `on_complete` receives the full text once the answer finished cleanly.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def produce():
+        try:
+            async for sentence in sentences:
+                tts_task = asyncio.create_task(
+                    sarvam_service.text_to_speech(text=sentence, language=language)
+                )
+                await queue.put((sentence, tts_task))
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await queue.put(None)
+    
+    producer = asyncio.create_task(produce())
+    text_parts = []
+    
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            
+            if isinstance(item, Exception):
+                logger.error(f"❌ Streaming voice query failed: {str(item)}")
+                yield _sse_event("error", {"session_id": session_id, "detail": str(item)})
+                return
+            
+            sentence, tts_task = item
+            try:
+                audio_bytes = await tts_task
+                # Sarvam falls back to a placeholder WAV instead of raising
+                if len(audio_bytes) < MOCK_AUDIO_MAX_BYTES:
+                    raise RuntimeError("text-to-speech returned no audio")
+            except Exception as e:
+                # The finally block cancels the sentences still queued
+                logger.error(f"❌ Streaming TTS failed at sentence {len(text_parts)}: {str(e)}")
+                yield _sse_event("error", {"session_id": session_id, "index": len(text_parts), "detail": str(e)})
+                return
+            
+            yield _sse_event("audio", {
+                "session_id": session_id,
+                "index": len(text_parts),
+                "text": sentence,
+                "audio": base64.b64encode(audio_bytes).decode('utf-8')
+            })
+            text_parts.append(sentence)
+        
+        text_response = " ".join(text_parts)
+        if on_complete:
+            on_complete(text_response)
+        
+        yield _sse_event("done", {
+            "session_id": session_id,
+            "text_response": text_response,
+            "sentences": len(text_parts),
+            "language": language
+        })
+        
+    finally:
+        # Client disconnected or stream finished: stop outstanding work
+        producer.cancel()
+        while not queue.empty():
+            item = queue.get_nowait()
+            if isinstance(item, tuple):
+                item[1].cancel()
+
+
+def _create_call_session(request: OutboundCallRequest) -> str:
+    """Register a new outbound call session and start its trace"""
+    call_id = str(uuid.uuid4())
+    trace_store.start(call_id)
+    call_sessions[call_id] = {
+        "call_id": call_id,
+        "phone_number": request.phone_number,
+        "purpose": request.purpose,
+        "sector": request.sector,
+        "language": request.language,
+        "customer_data": request.customer_data,
+        "status": "initiated",
+        "created_at": datetime.utcnow().isoformat(),
+        "public_url": request.public_url
+    }
+    return call_id
+
+
+@timed("greeting")
 async def _generate_call_greeting(request: OutboundCallRequest) -> str:
     """Generate personalized call greeting"""
     
@@ -15,6 +15,25 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
     LOG_LEVEL: str = "INFO"
+    LOG_DIR: str = "logs"
+    LOG_REDACT_PII: bool = True  # Mask PII in log messages before they reach disk
+    LOG_CONSOLE_JSON: bool = False  # JSON lines on stdout instead of text
+    # Keep-rate for high-volume INFO lines, "module:function=rate,..."
+    LOG_SAMPLE_RATES: str = (
+        "app.api.voice:get_call_audio=0.1,"
+        "app.api.voice:get_twiml_for_call=0.25,"
+        "app.api.voice:handle_call_status=0.25"
+    )
+    # Keep-rate of per-request access lines by longest matching path prefix, "prefix=rate,..."
+    REQUEST_LOG_SAMPLE_RATES: str = (
+        "/health=0,"
+        "/api/voice/audio/=0.02,"
+        "/api/voice/twiml/=0.25,"
+        "/api/voice/status/=0.25,"
+        "/=0.1"
+    )
+    REQUEST_LOG_SLOW_SECONDS: float = 2.0  # Slower requests and 5xx are always logged
+    REQUEST_TIMING_EXCLUDE_PATHS: str = "/metrics"  # Not timed, counted or logged
     
     # ==================== API SERVICES ====================
     # Groq LLM
@@ -22,6 +41,26 @@ class Settings(BaseSettings):
     GROQ_MODEL: str = "mixtral-8x7b-32768"
     GROQ_TEMPERATURE: float = 0.3
     GROQ_MAX_TOKENS: int = 2048
+    GROQ_BASE_URL: str = ""  # Empty uses the Groq default; set to a local stand-in for load tests
+    GROQ_TIMEOUT_SECONDS: float = 30.0
+    GROQ_MAX_RETRIES: int = 3  # Retries with backoff on 429/5xx/timeouts
+    GROQ_MAX_CONCURRENCY: int = 32  # In-flight completions per worker
+    GROQ_POOL_CONNECTIONS: int = 64
+    
+    # Intent classification fast path (keyword/trie tier before the LLM)
+    INTENT_FAST_PATH_ENABLED: bool = True
+    INTENT_FAST_PATH_MIN_CONFIDENCE: float = 0.85
+    INTENT_CACHE_SIZE: int = 2048
+    
+    # Micro-batching of concurrent LLM intent classifications
+    INTENT_BATCHING_ENABLED: bool = True
+    INTENT_BATCH_MAX_SIZE: int = 16
+    INTENT_BATCH_MAX_WAIT_MS: float = 20.0
+    
+    # Conversation memory (per-turn prompt budget for chat history)
+    CONVERSATION_RECENT_TOKEN_BUDGET: int = 800  # Verbatim recent turns
+    CONVERSATION_SUMMARY_TOKEN_BUDGET: int = 250  # Rolling summary of older turns
+    CONVERSATION_MAX_SESSIONS: int = 10000
     
     # Sarvam AI
     SARVAM_API_KEY: str
@@ -33,6 +72,9 @@ class Settings(BaseSettings):
     TWILIO_ACCOUNT_SID: str
     TWILIO_AUTH_TOKEN: str
     TWILIO_PHONE_NUMBER: str
+    TWILIO_WHATSAPP_NUMBER: str = ""  # e.g. whatsapp:+14155238886 (WhatsApp service only)
+    TWILIO_API_BASE_URL: str = ""  # Empty uses api.twilio.com; set to a local stand-in for load tests
+    TWILIO_VALIDATE_SIGNATURES: bool = True  # Reject webhook requests without a valid X-Twilio-Signature
     
 
     
@@ -47,12 +89,43 @@ class Settings(BaseSettings):
     # ==================== EMBEDDINGS ====================
     EMBEDDING_MODEL: str = "BAAI/bge-base-en-v1.5"
     EMBEDDING_DIMENSION: int = 768
+    EMBEDDING_PROVIDER: str = "hashing"  # hashing | sentence_transformers (uses EMBEDDING_MODEL)
+    
+    # ==================== RETRIEVAL (RAG) ====================
+    VECTOR_INDEX_DIR: str = "./data/vector_index"
+    VECTOR_INDEX_IVF_MIN_CHUNKS: int = 1_000_000  # Cluster-pruned search from this corpus size
+    VECTOR_INDEX_IVF_NPROBE: int = 32  # Clusters scanned per query in IVF mode
+    RAG_TOP_K: int = 4
+    RAG_MIN_SCORE: float = 0.3
+    RAG_CONTEXT_TOKEN_BUDGET: int = 600
+    RAG_RETRIEVAL_MODE: str = "hybrid"  # vector | lexical | hybrid (BM25 + vector, RRF-fused)
+    RAG_RRF_K: int = 60
+    RAG_BM25_MIN_SCORE: float = 2.0  # Drops matches on common terms only
+    
+    # Knowledge base ingestion
+    KNOWLEDGE_BASE_DIR: str = "./data/knowledge_base"  # API ingestion is limited to this tree
+    INGESTION_CHUNK_TOKENS: int = 300
+    INGESTION_CHUNK_OVERLAP_TOKENS: int = 40
+    INGESTION_BATCH_SIZE: int = 256  # Chunks per sanitize/embed batch
+    INGESTION_WORKERS: int = 0  # Sanitization processes (0 = CPU count)
+    
+    # ==================== RESPONSE CACHE ====================
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 3600
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Text + audio + embeddings
+    RESPONSE_CACHE_SIMILARITY: float = 0.92  # Cosine threshold for the semantic tier
     
     # ==================== SECURITY ====================
     JWT_SECRET_KEY: str = "your-super-secret-jwt-key-change-in-production"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_MINUTES: int = 1440
     
+    AUTH_ENABLED: bool = False  # Require a bearer JWT on the API routes
+    AUTH_TOKEN_CACHE_SIZE: int = 10_000  # Verified tokens kept until their exp (0 disables)
+    AUTH_ADMIN_ROLE: str = "admin"  # "role" claim required by /api/admin
+    # Twilio webhooks carry no token; they are checked by signature instead
+    AUTH_EXEMPT_PATHS: str = "/api/voice/twiml/,/api/voice/status/,/api/voice/audio/"
+    
     ENCRYPTION_KEY: str = "your-32-byte-encryption-key-here"
     
     # ==================== APPLICATION ====================
@@ -69,6 +142,21 @@ class Settings(BaseSettings):
         """Parse CORS origins from comma-separated string"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
     
+    @property
+    def auth_exempt_paths(self) -> List[str]:
+        """Parse auth exempt path prefixes from comma-separated string"""
+        return [path.strip() for path in self.AUTH_EXEMPT_PATHS.split(",") if path.strip()]
+    
+    @property
+    def rate_limit_exempt_paths(self) -> List[str]:
+        """Parse rate limit exempt path prefixes from comma-separated string"""
+        return [path.strip() for path in self.RATE_LIMIT_EXEMPT_PATHS.split(",") if path.strip()]
+    
+    @property
+    def request_timing_exclude_paths(self) -> List[str]:
+        """Parse request timing exclusions from comma-separated string"""
+        return [path.strip() for path in self.REQUEST_TIMING_EXCLUDE_PATHS.split(",") if path.strip()]
+    
     # ==================== COMPLIANCE ====================
     ENABLE_PII_MASKING: bool = True
     PII_PATTERNS: str = "phone,email,aadhaar,pan,account"
@@ -76,16 +164,42 @@ class Settings(BaseSettings):
     CALL_RECORDING_ENABLED: bool = True
     CALL_RECORDING_CONSENT_REQUIRED: bool = True
     
+    # Consent store (SQLite, warmed into memory at startup)
+    CONSENT_DB_PATH: str = "./data/consent.db"
+    CONSENT_CACHE_ENABLED: bool = True
+    CONSENT_CACHE_MAX_ENTRIES: int = 5_000_000
+    
+    # Phone number normalization (E.164)
+    PHONE_DEFAULT_REGION: str = "IN"  # For numbers without a country code
+    PHONE_NORMALIZE_CACHE_SIZE: int = 1_000_000
+    PHONE_REJECT_REPORT_LIMIT: int = 1000  # Rejected inputs echoed back per list
+    
+    # DND / do-not-call registry (national scrub lists)
+    DND_REGISTRY_ENABLED: bool = True
+    DND_REGISTRY_DIR: str = "./data/dnd"
+    DND_BLOOM_FILTER: bool = True
+    DND_BLOOM_BITS_PER_NUMBER: int = 10  # ~1% false positives, resolved by binary search
+    DND_DEFAULT_COUNTRY_CODE: str = "91"  # Applied to 10-digit national numbers
+    DND_RELOAD_INTERVAL_SECONDS: float = 60.0  # Pointer poll for generations loaded by the CLI; 0 = never
+    
     DATA_RETENTION_DAYS: int = 90
     AUDIT_LOG_RETENTION_DAYS: int = 365
+    AUDIT_STORE_DIR: str = "./data/audit"
+    AUDIT_SEGMENT_MAX_EVENTS: int = 1_000_000  # Segments also roll over at UTC midnight
+    AUDIT_FSYNC: bool = True  # One fsync per group-committed batch
     
     # ==================== CELERY ====================
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
     
     # ==================== RATE LIMITING ====================
+    RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_PER_HOUR: int = 1000
+    RATE_LIMIT_BACKEND: str = "memory"  # memory (per worker) | redis (shared, uses REDIS_URL)
+    RATE_LIMIT_MAX_CLIENTS: int = 100_000  # Clients tracked per worker (memory backend); oldest evicted
+    # Twilio webhooks, health checks and Prometheus scrapes are never limited
+    RATE_LIMIT_EXEMPT_PATHS: str = "/health,/metrics,/api/voice/twiml/,/api/voice/status/,/api/voice/audio/"
     
     # ==================== BFSI ====================
     SUPPORTED_SECTORS: str = "banking,insurance,nbfc,mutual_funds"
@@ -96,6 +210,23 @@ class Settings(BaseSettings):
     
     # ==================== MONITORING ====================
     ENABLE_METRICS: bool = True
+    
+    # Per-call span timelines (GET /api/voice/call/{call_id}/trace)
+    TRACE_MAX_CALLS: int = 10_000
+    TRACE_MAX_SPANS_PER_CALL: int = 256
+    # OpenTelemetry export of finished calls (OTLP/HTTP JSON)
+    OTEL_EXPORT_ENABLED: bool = False
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    OTEL_SERVICE_NAME: str = "bfsi-voice-backend"
+    OTEL_EXPORT_INTERVAL_SECONDS: float = 5.0
+    
+    # Event-loop stall watchdog: logs the blocking stack when the loop is stuck past the threshold
+    LOOP_WATCHDOG_ENABLED: bool = True
+    LOOP_STALL_THRESHOLD_MS: float = 100.0
+    # Admin diagnostics (/api/admin): role=admin token when AUTH_ENABLED, else localhost only
+    ADMIN_API_ENABLED: bool = False
+    PROFILER_INTERVAL_MS: float = 10.0  # 100 samples/s
+    PROFILER_MAX_SECONDS: int = 120
     SENTRY_DSN: str = ""
     
     model_config = {
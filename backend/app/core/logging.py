@@ -1,83 +1,400 @@
 """
 Logging Configuration
 Enterprise-grade logging with audit trail
+
+Log calls only enqueue the loguru record. A background writer thread
+redacts PII, serializes JSON and writes the console and daily-rotated
+files, so request handlers never block on disk I/O.
 """
 
-import logging
+import json
+import queue
+import random
 import sys
+import threading
+import traceback
+import zipfile
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Optional, Dict, Any, List
 from loguru import logger
 from app.core.config import settings
 
 
+# Records drained and written per batch by the writer thread
+WRITE_BATCH_SIZE = 512
+
+# Records waiting for the writer thread. When it falls this far behind
+# (stalled disk or stdout), DEBUG/INFO lines are dropped and counted;
+# warnings, errors and audit records block the logging thread instead
+QUEUE_MAX_RECORDS = 100_000
+
+
+class DailyRotatingFile:
+    """
+    JSON-lines file rotated at midnight, zipped and pruned after rotation
+
+    Rotation work runs on the writer thread like all other file I/O.
+    """
+
+    def __init__(self, directory: Path, prefix: str, retention_days: int, compress: bool = True):
+        self.directory = directory
+        self.prefix = prefix
+        self.retention_days = retention_days
+        self.compress = compress
+        self._date = None
+        self._file = None
+
+    def _path(self, date: str) -> Path:
+        return self.directory / f"{self.prefix}_{date}.jsonl"
+
+    def write(self, lines: List[str], date: str):
+        """Append lines to the file for `date`, rotating if the day changed"""
+        if date != self._date:
+            self._rotate(date)
+        self._file.write("".join(lines))
+        self._file.flush()
+
+    def _rotate(self, date: str):
+        previous = self._date
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._path(date), "a", encoding="utf-8")
+        self._date = date
+
+        if previous and self.compress:
+            path = self._path(previous)
+            if path.exists():
+                with zipfile.ZipFile(f"{path}.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+                    archive.write(path, path.name)
+                path.unlink()
+        self._prune()
+
+    def _prune(self):
+        cutoff = (datetime.utcnow() - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        for path in self.directory.glob(f"{self.prefix}_*.jsonl*"):
+            date = path.name[len(self.prefix) + 1:len(self.prefix) + 11]
+            if date < cutoff:
+                path.unlink(missing_ok=True)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LogPipeline:
+    """
+    Loguru sink that hands records to a background writer thread
+
+    `write()` runs on the logging thread and only puts the record on a
+    queue. The writer thread drains records in batches, masks PII in all
+    messages of a batch at once (PIIMasker.mask_many), and writes:
+
+        console         human-readable (or JSON) lines on stdout
+        app_*.jsonl     every record at LOG_LEVEL or above
+        error_*.jsonl   ERROR and above
+        audit store     audit_log() records; user ids are stored hashed
+
+    `await logger.complete()` waits until everything queued was written
+    and audit events are durable; `logger.remove()` drains the queue and
+    stops the thread.
+
+    The queue holds at most QUEUE_MAX_RECORDS. A full queue drops
+    non-audit DEBUG/INFO records (counted in `dropped` and reported on
+    stderr) and blocks on anything else, so audit events are never lost
+    to back-pressure. A record that fails to format is written with its
+    message only; its audit event is still appended.
+    """
+
+    def __init__(self, log_dir: Path, redact: bool = True, console_json: bool = False):
+        self.redact = redact
+        self.console_json = console_json
+        self.app_file = DailyRotatingFile(log_dir, "app", retention_days=30)
+        self.error_file = DailyRotatingFile(log_dir, "error", retention_days=90)
+
+        self.min_level = logger.level(settings.LOG_LEVEL.upper()).no
+        self.error_level = logger.level("ERROR").no
+        self._mask_many = None
+        self._hash = None
+        self._audit_store = None
+
+        self.sampled_max_level = logger.level("INFO").no
+        self.dropped = 0
+        self._reported = 0
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=QUEUE_MAX_RECORDS)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    # ==================== LOGGING THREAD ====================
+
+    def write(self, message):
+        """Called by loguru for each record that passed the filter"""
+        record = message.record
+        if record["level"].no > self.sampled_max_level or record["extra"].get("AUDIT"):
+            self._queue.put(record)
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Records waiting for the writer and records dropped on a full queue"""
+        return {"queued": self._queue.qsize(), "dropped": self.dropped}
+
+    async def complete(self):
+        """Wait until all queued records are written (logger.complete())"""
+        import asyncio
+        await asyncio.to_thread(self._drain)
+
+    def _drain(self):
+        self._queue.join()
+        if self._audit_store is not None:
+            self._audit_store.flush()
+
+    def stop(self):
+        """Drain and stop the writer (called by logger.remove())"""
+        self._queue.put(None)
+        self._thread.join()
+        if self._audit_store is not None:
+            self._audit_store.flush()
+        for target in (self.app_file, self.error_file):
+            target.close()
+
+    # ==================== WRITER THREAD ====================
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            records = [record for record in batch if record is not None]
+            try:
+                if records:
+                    self._write_batch(records)
+            except Exception:
+                # Never let a bad record kill the writer
+                traceback.print_exc(file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if self.dropped != self._reported:
+                sys.stderr.write(f"log queue full: {self.dropped - self._reported} DEBUG/INFO records dropped\n")
+                self._reported = self.dropped
+            if stop:
+                return
+
+    def _masker(self):
+        if self._mask_many is None:
+            # Imported lazily: both modules import this one
+            from app.core.security import PIIMasker
+            from app.services.audit_store import audit_store
+            self._mask_many = PIIMasker.mask_many if self.redact else (lambda texts: list(texts))
+            self._hash = PIIMasker.hash_pii
+            self._audit_store = audit_store
+        return self._mask_many
+
+    def _write_batch(self, records: List[Dict[str, Any]]):
+        mask_many = self._masker()
+        messages = mask_many([record["message"] for record in records])
+
+        console, app, error = [], [], []
+        date = None
+        for record, message in zip(records, messages):
+            try:
+                entry = self._entry(record, message)
+                line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+            except Exception:
+                # One bad record must not cost the rest of the batch
+                traceback.print_exc(file=sys.stderr)
+                entry = self._bare_entry(record, message)
+                entry["format_error"] = True
+                line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+            date = entry["time"][:10]
+
+            if record["extra"].get("AUDIT"):
+                try:
+                    self._append_audit(entry, record)
+                except Exception:
+                    traceback.print_exc(file=sys.stderr)
+            if record["level"].no >= self.min_level:
+                app.append(line)
+                console.append(line if self.console_json else self._console_line(entry))
+            if record["level"].no >= self.error_level:
+                error.append(line)
+
+        if console:
+            sys.stdout.write("".join(console))
+            sys.stdout.flush()
+        for target, lines in ((self.app_file, app), (self.error_file, error)):
+            if lines:
+                target.write(lines, date)
+
+    def _append_audit(self, entry: Dict[str, Any], record: Dict[str, Any]):
+        # Masked metadata, or none if the record failed to format
+        metadata = entry.get("extra", {}).get("metadata") or {}
+        # Ids come from the raw record: the masker can mistake parts of a
+        # UUID for PII (a 12-digit last group reads as an Aadhaar number)
+        raw = record["extra"]
+        call_id = (raw.get("metadata") or {}).get("call_id")
+        if call_id is not None:
+            metadata = {**metadata, "call_id": call_id}
+        user_id = raw.get("user_id")
+        self._audit_store.append(
+            event=raw.get("event"),
+            user_hash=self._hash(str(user_id)) if user_id else None,
+            call_id=call_id,
+            metadata=metadata,
+            timestamp=record["time"]
+        )
+
+    @staticmethod
+    def _bare_entry(record: Dict[str, Any], message: str) -> Dict[str, Any]:
+        return {
+            "time": record["time"].astimezone().isoformat(timespec="milliseconds"),
+            "level": record["level"].name,
+            "logger": record["name"],
+            "function": record["function"],
+            "line": record["line"],
+            "message": message
+        }
+
+    def _entry(self, record: Dict[str, Any], message: str) -> Dict[str, Any]:
+        """Structured JSON record with PII redacted"""
+        entry = self._bare_entry(record, message)
+
+        extra = {key: value for key, value in record["extra"].items() if key != "AUDIT"}
+        if extra:
+            if "user_id" in extra:
+                user_id = extra.pop("user_id")
+                extra["user_hash"] = self._hash(str(user_id)) if user_id else None
+            entry["extra"] = self._mask_value(extra)
+
+        if record["exception"] is not None:
+            exc_type, exc_value, exc_traceback = record["exception"]
+            formatted = "".join(traceback.format_exception(exc_type, exc_value, exc_traceback))
+            entry["exception"] = self._mask_many([formatted])[0]
+        return entry
+
+    def _mask_value(self, value):
+        """
+        Mask PII in the strings of a JSON-like value, keeping its structure
+
+        Numbers that read as PII (a phone or account number logged as an
+        int) become their masked string; other numbers, booleans and None
+        stay as they are, and other objects are masked as str(value).
+        """
+        if isinstance(value, str):
+            return self._mask_many([value])[0]
+        if isinstance(value, dict):
+            return {str(key): self._mask_value(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple, set)):
+            return [self._mask_value(item) for item in value]
+        if value is None or isinstance(value, (bool, float)):
+            return value
+        if isinstance(value, int):
+            text = str(value)
+            masked = self._mask_many([text])[0]
+            return value if masked == text else masked
+        return self._mask_many([str(value)])[0]
+
+    @staticmethod
+    def _console_line(entry: Dict[str, Any]) -> str:
+        line = (
+            f"{entry['time'][:19].replace('T', ' ')} | {entry['level']: <8} | "
+            f"{entry['logger']}:{entry['function']} - {entry['message']}\n"
+        )
+        if "exception" in entry:
+            line += entry["exception"]
+        return line
+
+
+def _parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse "module:function=rate,..." into a lookup table"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, _, rate = item.partition("=")
+        rates[key.strip()] = float(rate)
+    return rates
+
+
+def _make_filter(min_level: int):
+    """
+    Level filter plus sampling of high-volume INFO lines
+
+    Runs on the logging thread, so it is kept to a couple of dict lookups.
+    Audit records, warnings and errors are never sampled.
+    """
+    rates = _parse_sample_rates(settings.LOG_SAMPLE_RATES)
+    sampled_max_level = logger.level("INFO").no
+    rand = random.random
+
+    def log_filter(record) -> bool:
+        if record["extra"].get("AUDIT"):
+            return True
+        level = record["level"].no
+        if level < min_level:
+            return False
+        if rates and level <= sampled_max_level:
+            rate = rates.get(f"{record['name']}:{record['function']}")
+            if rate is not None and rand() >= rate:
+                return False
+        return True
+
+    return log_filter
+
+
+_pipeline: Optional[LogPipeline] = None
+
+
 def setup_logging():
     """Setup application logging"""
-    
-    # Remove default handler
+    global _pipeline
+
+    # Remove default handler (and drain a previous pipeline)
     logger.remove()
-    
-    # Console handler
-    logger.add(
-        sys.stdout,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
-        level=settings.LOG_LEVEL,
-        colorize=True
-    )
-    
-    # File handler - General logs
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    
-    logger.add(
-        log_dir / "app_{time:YYYY-MM-DD}.log",
-        rotation="00:00",
-        retention="30 days",
-        level=settings.LOG_LEVEL,
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} - {message}",
-        compression="zip"
-    )
-    
-    # File handler - Error logs
-    logger.add(
-        log_dir / "error_{time:YYYY-MM-DD}.log",
-        rotation="00:00",
-        retention="90 days",
-        level="ERROR",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} - {message}",
-        compression="zip"
-    )
-    
-    # File handler - Audit logs (compliance)
+
+    log_dir = Path(settings.LOG_DIR)
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    _pipeline = LogPipeline(log_dir, redact=settings.LOG_REDACT_PII, console_json=settings.LOG_CONSOLE_JSON)
+    min_level = logger.level(settings.LOG_LEVEL.upper()).no
+
+    # Audit records are INFO and must pass even when LOG_LEVEL is higher
     logger.add(
-        log_dir / "audit_{time:YYYY-MM-DD}.log",
-        rotation="00:00",
-        retention=f"{settings.AUDIT_LOG_RETENTION_DAYS} days",
-        level="INFO",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} - {message}",
-        compression="zip",
-        filter=lambda record: "AUDIT" in record["extra"]
+        _pipeline,
+        level=min(min_level, logger.level("INFO").no),
+        format="{message}",
+        filter=_make_filter(min_level),
+        catch=True
     )
-    
+
     logger.info("✅ Logging configured successfully")
 
 
+def log_stats() -> Dict[str, int]:
+    """Writer queue depth and DEBUG/INFO records dropped on a full queue"""
+    return _pipeline.stats() if _pipeline is not None else {"queued": 0, "dropped": 0}
+
+
 def audit_log(event: str, user_id: str = None, metadata: dict = None):
     """
     Create audit log entry for compliance
-    
+
     Args:
         event: Event description
-        user_id: User identifier
+        user_id: User identifier (stored hashed)
         metadata: Additional metadata
     """
-    log_data = {
-        "event": event,
-        "user_id": user_id,
-        "metadata": metadata or {}
-    }
-    
-    logger.bind(AUDIT=True).info(f"AUDIT: {log_data}")
+    logger.bind(AUDIT=True, event=event, user_id=user_id, metadata=metadata or {}).opt(depth=1).info(f"AUDIT: {event}")
 
 
 # Export logger
-__all__ = ["logger", "setup_logging", "audit_log"]
+__all__ = ["logger", "setup_logging", "audit_log", "log_stats", "LogPipeline"]
@@ -0,0 +1,339 @@
+"""
+Metrics
+Prometheus counters, gauges and latency histograms for the voice pipeline
+"""
+
+import asyncio
+import math
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from app.core.tracing import current_trace, trace_store
+
+
+# Provider calls take 50 ms to 30 s; webhook handlers a few milliseconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    """Named metric with a fixed label schema and one series per label tuple"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        registry.register(self)
+
+    def _labels(self, labels: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        # Unlabeled counters are exported from the start, at zero
+        self._values: Dict[tuple, float] = {} if self.labelnames else {(): 0}
+
+    def inc(self, *labels: str, amount: float = 1):
+        """Add to the series for the given label values"""
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{self._labels(labels)} {_format_value(value)}" for labels, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a function at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Report function() at each scrape (unlabeled gauges only)"""
+        self._function = function
+
+    def value(self, *labels: str) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> List[str]:
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self._function())}"]
+        return [f"{self.name}{self._labels(labels)} {_format_value(value)}" for labels, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """
+    Latency distribution over fixed buckets
+
+    Each series is one flat list of per-bucket counts plus the sum, so an
+    observation is a bisect over the bucket bounds and two list updates.
+    Counts are made cumulative only when rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        """Record one observation (seconds for latency histograms)"""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        """Context manager observing the elapsed time of its block"""
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{self._labels(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class Registry:
+    """All metrics of the process, rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global instance
+registry = Registry()
+
+
+# ==================== VOICE PIPELINE METRICS ====================
+
+stage_latency = Histogram(
+    "voice_stage_duration_seconds",
+    "Latency of call pipeline stages (greeting, tts, stt, llm, twilio_call_create, twiml_fetch, audio_fetch)",
+    ["stage"]
+)
+provider_errors = Counter(
+    "voice_provider_errors_total",
+    "Failed provider requests",
+    ["provider", "operation"]
+)
+provider_inflight = Gauge(
+    "voice_provider_inflight_requests",
+    "Provider requests currently awaiting a response",
+    ["provider"]
+)
+mock_audio_fallbacks = Counter(
+    "voice_tts_mock_fallback_total",
+    "Sarvam TTS failures answered with placeholder audio (Twilio TTS is used instead)"
+)
+call_status = Counter(
+    "voice_call_status_total",
+    "Twilio call status callbacks received",
+    ["status"]
+)
+live_sessions = Gauge(
+    "voice_live_sessions",
+    "Call sessions not yet in a terminal Twilio status"
+)
+
+
+# ==================== HTTP METRICS ====================
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template (unmatched for unknown paths)",
+    ["method", "route", "status"]
+)
+
+
+# ==================== RUNTIME METRICS ====================
+
+loop_stalls = Histogram(
+    "event_loop_stall_seconds",
+    "Event loop blocked longer than LOOP_STALL_THRESHOLD_MS",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+
+class provider_call:
+    """
+    Instrument one provider request
+
+    Observes the stage latency and tracks the in-flight gauge; an exception
+    leaving the block counts as a provider error. Callers that swallow a
+    failure inside the block call failed() instead. The request is also
+    recorded as a span of the current call trace, if any.
+
+        with provider_call("sarvam", "tts") as call:
+            ...
+    """
+
+    __slots__ = ("provider", "stage", "start", "_failed", "_trace", "_trace_start")
+
+    def __init__(self, provider: str, stage: str):
+        self.provider = provider
+        self.stage = stage
+        self._failed = False
+
+    def __enter__(self):
+        provider_inflight.inc(self.provider)
+        self._trace = current_trace.get()
+        if self._trace is not None:
+            self._trace_start = self._trace.now()
+        self.start = time.perf_counter()
+        return self
+
+    def failed(self):
+        """Count an error handled inside the block"""
+        if not self._failed:
+            self._failed = True
+            provider_errors.inc(self.provider, self.stage)
+
+    def __exit__(self, exc_type, exc, traceback):
+        stage_latency.observe(time.perf_counter() - self.start, self.stage)
+        provider_inflight.dec(self.provider)
+        # A cancelled request or an abandoned stream is not a provider failure
+        if exc_type is not None and not issubclass(exc_type, (asyncio.CancelledError, GeneratorExit)):
+            self.failed()
+        if self._trace is not None:
+            self._trace.add(self.stage, self._trace_start, self._trace.now(), self._failed)
+        return False
+
+
+def timed(stage: str):
+    """
+    Decorator observing the latency of an async function as a pipeline stage
+
+    The stage is also recorded in the call trace named by a call_id
+    keyword argument (webhook routes) or else the current one.
+    functools.wraps keeps the signature, so it can sit under a FastAPI
+    route decorator.
+    """
+    def decorator(function):
+        @wraps(function)
+        async def wrapper(*args, **kwargs):
+            call_id = kwargs.get("call_id")
+            trace = trace_store.get(call_id) if call_id else current_trace.get()
+            trace_start = trace.now() if trace is not None else 0
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = await function(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                stage_latency.observe(time.perf_counter() - start, stage)
+                if trace is not None:
+                    trace.add(stage, trace_start, trace.now(), failed)
+        return wrapper
+    return decorator
+
+
+# Export
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "registry",
+    "stage_latency",
+    "provider_errors",
+    "provider_inflight",
+    "mock_audio_fallbacks",
+    "call_status",
+    "live_sessions",
+    "http_request_duration",
+    "loop_stalls",
+    "provider_call",
+    "timed"
+]
@@ -0,0 +1,356 @@
+"""
+Profiler
+On-demand sampling profiles, event-loop stall detection and memory
+snapshots for the running process
+"""
+
+import asyncio
+import gc
+import os
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import loop_stalls
+
+
+# Loop-thread frames included in a stall warning, innermost last
+STALL_STACK_FRAMES = 12
+
+_labels: Dict[object, str] = {}
+_cwd = os.getcwd() + os.sep
+_stdlib = sysconfig.get_paths()["stdlib"] + os.sep
+
+
+def _short_path(path: str) -> str:
+    """Source path relative to site-packages, the working directory or the stdlib"""
+    if "site-packages" + os.sep in path:
+        return path.rsplit("site-packages" + os.sep, 1)[1]
+    if path.startswith(_cwd):
+        return path[len(_cwd):]
+    if path.startswith(_stdlib):
+        return path[len(_stdlib):]
+    return path
+
+
+def _label(code) -> str:
+    """Flamegraph frame name for a code object: function (path:first line)"""
+    label = _labels.get(code)
+    if label is None:
+        label = _labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+    return label
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler over sys._current_frames()
+
+    A sampler thread snapshots the Python stack of every other thread at a
+    fixed interval; nothing is installed in the profiled code, so the
+    overhead is one stack walk per thread per sample (well under 1% of a
+    core at 100 Hz) and only while a profile runs.
+
+    Modes:
+        wall    every sample counts once: where threads spend wall time,
+                waiting included (a stalled event loop shows its blocking
+                call, an idle one sits in the selector)
+        cpu     samples are weighted by the CPU time (µs) the thread used
+                since its previous sample, read from its per-thread CPU
+                clock, so waits drop out
+
+    Output is the collapsed-stack format of flamegraph.pl, speedscope and
+    Grafana Pyroscope: "thread;outer;...;inner weight" per line.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(
+        self,
+        seconds: float,
+        mode: str = "wall",
+        interval: float = None,
+        thread_id: int = None
+    ) -> Tuple[str, int]:
+        """
+        Sample for `seconds` (blocking; run it in a worker thread)
+
+        Args:
+            seconds: Profile duration
+            mode: "wall" or "cpu"
+            interval: Seconds between samples (default PROFILER_INTERVAL_MS)
+            thread_id: Only sample this thread (e.g. the event loop's)
+
+        Returns:
+            Collapsed stacks and the number of samples taken
+
+        Raises:
+            RuntimeError: If a profile is already running
+        """
+        if mode not in ("wall", "cpu"):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            interval = interval or settings.PROFILER_INTERVAL_MS / 1000
+            stacks, samples = self._sample(seconds, mode == "cpu", interval, thread_id)
+        finally:
+            self._lock.release()
+        return self._collapse(stacks), samples
+
+    def _sample(self, seconds: float, cpu: bool, interval: float, only: Optional[int]):
+        own = threading.get_ident()
+        stacks: Dict[tuple, int] = {}
+        clocks: Dict[int, int] = {}
+        cpu_seen: Dict[int, int] = {}
+        samples = 0
+        deadline = time.perf_counter() + seconds
+
+        while True:
+            started = time.perf_counter()
+            if started >= deadline:
+                break
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (only is not None and thread_id != only):
+                    continue
+                weight = 1
+                if cpu:
+                    try:
+                        clock = clocks.get(thread_id)
+                        if clock is None:
+                            clock = clocks[thread_id] = time.pthread_getcpuclockid(thread_id)
+                        used = time.clock_gettime_ns(clock)
+                    except OSError:
+                        continue  # Thread exited between the snapshot and the clock read
+                    previous = cpu_seen.get(thread_id)
+                    cpu_seen[thread_id] = used
+                    if previous is None:
+                        continue
+                    weight = (used - previous) // 1000
+                    if weight <= 0:
+                        continue
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                key = (thread_id, tuple(codes))
+                stacks[key] = stacks.get(key, 0) + weight
+            samples += 1
+            time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+        return stacks, samples
+
+    @staticmethod
+    def _collapse(stacks: Dict[tuple, int]) -> str:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        lines = []
+        for (thread_id, codes), weight in sorted(stacks.items(), key=lambda item: item[1], reverse=True):
+            frames = ";".join(_label(code) for code in reversed(codes))
+            lines.append(f"{names.get(thread_id, f'thread-{thread_id}')};{frames} {weight}")
+        return "\n".join(lines) + "\n"
+
+
+class LoopStallWatchdog:
+    """
+    Reports callbacks that block the event loop
+
+    A heartbeat task on the loop sleeps for half the threshold and measures
+    how late it wakes up; a watchdog thread checks the heartbeat and, while
+    the loop is stuck, captures the loop thread's stack. Each stall longer
+    than the threshold is logged once with that stack, which points at the
+    blocking line itself (a synchronous SDK call, CPU-heavy parsing) rather
+    than only the task running it, and observed in event_loop_stall_seconds.
+    """
+
+    def __init__(self):
+        self.threshold = settings.LOOP_STALL_THRESHOLD_MS / 1000
+        self.stalls = 0
+        self.worst = 0.0
+        self.peak_lag = 0.0
+        self._excused = False
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stack: Optional[List[traceback.FrameSummary]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self, threshold_ms: float = None):
+        """Start watching the running loop (restarts with a new threshold)"""
+        if self._task is not None:
+            await self.stop()
+        if threshold_ms is not None:
+            self.threshold = threshold_ms / 1000
+        self._interval = max(0.005, self.threshold / 2)
+        self._loop_thread = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stack = None
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"🐕 Event loop watchdog on, threshold {self.threshold * 1000:.0f} ms")
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.perf_counter() + self._interval
+            await asyncio.sleep(self._interval)
+            self._beat = now = time.perf_counter()
+            if self._excused:
+                self._excused = False
+                self._stack = None
+                continue
+            lag = now - expected
+            if lag > self.peak_lag:
+                self.peak_lag = lag
+            if lag >= self.threshold:
+                self._report(lag)
+
+    @contextmanager
+    def excused(self):
+        """Neither count nor report the stall caused by deliberate blocking work (diagnostics)"""
+        try:
+            yield
+        finally:
+            self._excused = True
+
+    def take_peak_lag(self) -> float:
+        """Worst heartbeat lag (seconds) since the previous call"""
+        peak, self.peak_lag = self.peak_lag, 0.0
+        return peak
+
+    def _watch(self):
+        # Runs beside the loop: the only place the blocked stack can be seen
+        while not self._stop.wait(self._interval / 2):
+            if self._stack is None and time.perf_counter() - self._beat > self._interval + self.threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._stack = traceback.extract_stack(frame)[-STALL_STACK_FRAMES:]
+                    del frame
+
+    def _report(self, lag: float):
+        stack, self._stack = self._stack, None
+        self.stalls += 1
+        self.worst = max(self.worst, lag)
+        loop_stalls.observe(lag)
+        where = "".join(traceback.format_list(stack)) if stack else "  (returned before the stack was captured)\n"
+        logger.warning(f"🐌 Event loop blocked for {lag * 1000:.0f} ms, loop thread was in:\n{where.rstrip()}")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._stop.set()
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+
+
+# ==================== MEMORY ====================
+
+def read_rss() -> Dict[str, int]:
+    """Resident and peak resident memory of this process in bytes (Linux)"""
+    memory = {"rss": 0, "peak": 0}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    memory["rss"] = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    memory["peak"] = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return memory
+
+
+def object_counts(top: int = 50) -> Tuple[int, Dict[str, int]]:
+    """
+    Live gc-tracked objects per type
+
+    Walks every container the collector knows about (not str, int or
+    other atoms), which holds the GIL for tens of milliseconds on a
+    large heap.
+
+    Args:
+        top: Number of types to return, most numerous first
+
+    Returns:
+        Total tracked objects and counts for the top types
+    """
+    counts: Dict[type, int] = {}
+    objects = gc.get_objects()
+    for obj in objects:
+        kind = type(obj)
+        counts[kind] = counts.get(kind, 0) + 1
+    total = len(objects)
+    del objects
+    ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:top]
+    return total, {
+        (kind.__qualname__ if kind.__module__ == "builtins" else f"{kind.__module__}.{kind.__qualname__}"): count
+        for kind, count in ranked
+    }
+
+
+def top_allocations(top: int = 20) -> Optional[dict]:
+    """
+    Largest live allocation sites from tracemalloc
+
+    Only allocations made since tracing started are traced, so starting
+    it once the process is warm (PUT /api/admin/tracemalloc) makes the
+    top sites the ones that grew. Tracing slows every allocation; keep it
+    for soak and staging runs.
+
+    Args:
+        top: Number of source lines to return, largest first
+
+    Returns:
+        Traced current and peak bytes and the top sites, or None when
+        tracemalloc is not tracing
+    """
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "current_bytes": current,
+        "peak_bytes": peak,
+        "top": [
+            {
+                "where": f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                "bytes": stat.size,
+                "count": stat.count
+            }
+            for stat in snapshot.statistics("lineno")[:top]
+        ]
+    }
+
+
+# Global instances
+profiler = SamplingProfiler()
+loop_watchdog = LoopStallWatchdog()
+
+
+# Export
+__all__ = [
+    "SamplingProfiler", "LoopStallWatchdog", "profiler", "loop_watchdog",
+    "read_rss", "object_counts", "top_allocations"
+]
@@ -0,0 +1,283 @@
+"""
+Rate Limiting
+Sliding-window request limits per authenticated user or client IP
+"""
+
+import json
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.security import token_cache
+
+
+# (window seconds, limit) pairs enforced together
+Windows = List[Tuple[int, int]]
+
+
+def _windows_from_settings() -> Windows:
+    return [
+        (60, settings.RATE_LIMIT_PER_MINUTE),
+        (3600, settings.RATE_LIMIT_PER_HOUR),
+    ]
+
+
+def _wait(now: float, window: int, limit: int, prev: int, curr: int) -> float:
+    """Seconds until one more request fits under the sliding estimate"""
+    offset = now % window
+    if curr + 1 <= limit:
+        # Wait for the previous window's weight to decay enough
+        fraction = 1 - (limit - curr - 1) / prev if prev else 0.0
+        return max(0.0, window * fraction - offset)
+    # Current window is full: wait for it to become the previous one and decay
+    return (window - offset) + window * max(0.0, 1 - (limit - 1) / curr)
+
+
+class MemoryRateLimiter:
+    """
+    In-process sliding-window counters
+
+    Each window keeps the request counts of the current and previous fixed
+    interval; the sliding count is the current count plus the previous one
+    weighted by how much of it still overlaps the window. That is three
+    integers per window per client, whatever the request rate, and one
+    dict lookup plus a little arithmetic per request.
+
+    Counters are per worker process; use the redis backend to share them.
+    At most `max_clients` clients are tracked: past that, expired clients
+    are swept and then the longest-tracked ones dropped (their counters
+    restart), so a flood of distinct keys cannot exhaust memory.
+    """
+
+    def __init__(self, windows: Windows = None, max_clients: int = None):
+        self.windows = windows or _windows_from_settings()
+        self.max_clients = max_clients or settings.RATE_LIMIT_MAX_CLIENTS
+        self._state: Dict[str, List[float]] = {}
+        # (state offset, window, limit); state is [index, previous, current] per window
+        self._slots = [(3 * i, window, limit) for i, (window, limit) in enumerate(self.windows)]
+        # Offset of the longest window's interval index in each state list
+        longest = max(range(len(self.windows)), key=lambda i: self.windows[i][0])
+        self._longest = (self.windows[longest][0], 3 * longest)
+        self._sweep_at = 0.0
+
+    def hit(self, key: str, now: float = None) -> Optional[float]:
+        """
+        Count a request for a client
+
+        Args:
+            key: Client identity
+            now: Timestamp (defaults to time.time())
+
+        Returns:
+            None if allowed, else seconds until the client may retry
+        """
+        now = time.time() if now is None else now
+        if now >= self._sweep_at:
+            self._sweep(now)
+
+        state = self._state.get(key)
+        if state is None:
+            if len(self._state) >= self.max_clients:
+                self._evict(now)
+            state = self._state[key] = [0] * (3 * len(self.windows))
+
+        retry_after = 0.0
+        for base, window, limit in self._slots:
+            index = now // window
+            if state[base] != index:
+                # Roll over: the current interval becomes the previous one
+                state[base + 1] = state[base + 2] if state[base] == index - 1 else 0
+                state[base + 2] = 0
+                state[base] = index
+            prev, curr = state[base + 1], state[base + 2]
+            if curr >= limit or prev and prev * (1 - (now % window) / window) + curr + 1 > limit:
+                retry_after = max(retry_after, _wait(now, window, limit, prev, curr))
+
+        if retry_after:
+            return retry_after
+        for base, _, _ in self._slots:
+            state[base + 2] += 1
+        return None
+
+    def _sweep(self, now: float):
+        """Drop clients whose longest window has fully expired"""
+        window, base = self._longest
+        stale_before = int(now // window) - 1
+        stale = [key for key, state in self._state.items() if state[base] < stale_before]
+        for key in stale:
+            del self._state[key]
+        self._sweep_at = now + 60
+
+    def _evict(self, now: float):
+        """Make room for a new client: sweep, then drop the oldest entries"""
+        self._sweep(now)
+        excess = len(self._state) - self.max_clients + 1
+        if excess > 0:
+            # Dicts keep insertion order: the first keys are the longest tracked
+            for key in list(self._state)[:max(excess, self.max_clients // 100)]:
+                del self._state[key]
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+
+# Atomic check-and-increment of every window of one client.
+# KEYS[1] = client key; ARGV = window1, limit1, window2, limit2, ...
+# Returns 0 if allowed, else milliseconds until retry.
+_REDIS_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HGETALL', KEYS[1])
+local fields = {}
+for i = 1, #state, 2 do fields[state[i]] = tonumber(state[i + 1]) end
+local wait = 0
+local longest = 0
+local updates = {}
+for i = 1, #ARGV, 2 do
+  local window, limit = tonumber(ARGV[i]), tonumber(ARGV[i + 1])
+  if window > longest then longest = window end
+  local index = math.floor(now / window)
+  local stored = fields['i' .. window] or 0
+  local prev, curr = fields['p' .. window] or 0, fields['c' .. window] or 0
+  if stored ~= index then
+    if stored == index - 1 then prev = curr else prev = 0 end
+    curr = 0
+  end
+  local offset = now % window
+  if prev * (1 - offset / window) + curr + 1 > limit then
+    local w
+    if curr + 1 <= limit then
+      w = window * (1 - (limit - curr - 1) / prev) - offset
+    else
+      w = (window - offset) + window * math.max(0, 1 - (limit - 1) / curr)
+    end
+    if w > wait then wait = w end
+  end
+  table.insert(updates, {window, index, prev, curr})
+end
+if wait > 0 then return math.ceil(wait * 1000) end
+for _, u in ipairs(updates) do
+  redis.call('HSET', KEYS[1], 'i' .. u[1], u[2], 'p' .. u[1], u[3], 'c' .. u[1], u[4] + 1)
+end
+redis.call('EXPIRE', KEYS[1], 2 * longest)
+return 0
+"""
+
+
+class RedisRateLimiter:
+    """
+    Sliding-window counters shared by all workers through Redis
+
+    Same algorithm as MemoryRateLimiter, run as one Lua script per
+    request so the check and increment are atomic across workers and use
+    the Redis server clock. If Redis is unreachable the request is counted
+    by a local MemoryRateLimiter instead of failing.
+    """
+
+    def __init__(self, url: str = None, windows: Windows = None):
+        import redis.asyncio as redis
+
+        self.windows = windows or _windows_from_settings()
+        self.client = redis.from_url(url or settings.REDIS_URL)
+        self.script = self.client.register_script(_REDIS_SCRIPT)
+        self.args = [value for pair in self.windows for value in pair]
+        self.fallback = MemoryRateLimiter(self.windows)
+        self._warned_at = 0.0
+
+    async def hit(self, key: str) -> Optional[float]:
+        """Count a request for a client; returns seconds to retry or None"""
+        try:
+            wait_ms = await self.script(keys=[f"ratelimit:{key}"], args=self.args)
+        except Exception as e:
+            if time.time() - self._warned_at > 60:
+                self._warned_at = time.time()
+                logger.warning(f"⚠️ Redis rate limiter unavailable ({str(e)}), limiting per worker")
+            return self.fallback.hit(key)
+        return int(wait_ms) / 1000 or None
+
+
+def create_rate_limiter(backend: str = None):
+    """
+    Create the limiter for a backend name
+
+    Args:
+        backend: "memory" or "redis"
+
+    Returns:
+        Limiter with hit(key)
+    """
+    backend = backend or settings.RATE_LIMIT_BACKEND
+    if backend == "redis":
+        try:
+            return RedisRateLimiter()
+        except Exception as e:
+            logger.warning(f"⚠️ redis unavailable ({str(e)}), using in-process rate limiting")
+    return MemoryRateLimiter()
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware enforcing RATE_LIMIT_PER_MINUTE / RATE_LIMIT_PER_HOUR
+
+    Clients are identified by the subject of a verified bearer JWT when
+    AUTH_ENABLED, else by client IP; unverified credentials are never used
+    as keys, as sending a new one per request would dodge the limit. Paths under RATE_LIMIT_EXEMPT_PATHS (Twilio webhooks, health
+    checks) are never limited. Over-limit requests get 429 with
+    Retry-After and never reach the application.
+    """
+
+    def __init__(self, app, limiter=None, exempt_paths: Tuple[str, ...] = None):
+        self.app = app
+        self.limiter = limiter or create_rate_limiter()
+        self.exempt = tuple(exempt_paths if exempt_paths is not None else settings.rate_limit_exempt_paths)
+        self.limit_header = str(self.limiter.windows[0][1]).encode()
+        self._async = isinstance(self.limiter, RedisRateLimiter)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt):
+            await self.app(scope, receive, send)
+            return
+
+        key = self._client_key(scope)
+        retry_after = await self.limiter.hit(key) if self._async else self.limiter.hit(key)
+        if retry_after is None:
+            await self.app(scope, receive, send)
+            return
+
+        seconds = max(1, math.ceil(retry_after))
+        logger.warning(f"⛔ Rate limit exceeded: {scope['method']} {scope['path']} retry in {seconds}s")
+        body = json.dumps({
+            "error": "Rate limit exceeded",
+            "message": f"Too many requests, retry in {seconds} seconds",
+            "retry_after": seconds
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(seconds).encode()),
+                (b"x-ratelimit-limit", self.limit_header),
+                (b"x-ratelimit-remaining", b"0"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    def _client_key(scope) -> str:
+        if settings.AUTH_ENABLED:
+            for name, value in scope["headers"]:
+                if name == b"authorization" and value[:7].lower() == b"bearer ":
+                    # Verified tokens are cached, so require_auth pays nothing extra
+                    payload = token_cache.verify(value[7:].decode("latin-1"))
+                    if payload is not None and payload.get("sub"):
+                        return f"user:{payload['sub']}"
+                    break
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+
+# Export
+__all__ = ["MemoryRateLimiter", "RedisRateLimiter", "create_rate_limiter", "RateLimitMiddleware"]
@@ -0,0 +1,100 @@
+"""
+Request Timing
+Per-request latency, status and access logging as a pure ASGI middleware
+"""
+
+import random
+import time
+from typing import Dict, List, Tuple
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import http_request_duration
+
+
+def _parse_path_rates(spec: str) -> List[Tuple[str, float]]:
+    """Parse "prefix=rate,..." into (prefix, rate) pairs, longest prefix first"""
+    rates: Dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        prefix, _, rate = item.rpartition("=")
+        rates[prefix.strip()] = float(rate)
+    return sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware timing every HTTP request
+
+    Unlike a BaseHTTPMiddleware it neither runs the endpoint in a separate
+    task nor re-streams the response body: it only wraps `send` to read
+    the status and add X-Process-Time (time to response headers) to the
+    response start. When the request finishes, the latency is observed in
+    http_request_duration_seconds under the route template, so
+    /api/voice/audio/{call_id}.wav is one series rather than one per call.
+
+    Access lines are sampled by path: the rate of the longest matching
+    prefix in REQUEST_LOG_SAMPLE_RATES is applied before the message is
+    formatted. Server errors and requests slower than
+    REQUEST_LOG_SLOW_SECONDS are always logged. Paths under
+    REQUEST_TIMING_EXCLUDE_PATHS (Prometheus scrapes) pass straight through.
+    """
+
+    def __init__(
+        self,
+        app,
+        sample_rates: str = None,
+        exclude_paths: Tuple[str, ...] = None,
+        slow_seconds: float = None
+    ):
+        self.app = app
+        self.rates = _parse_path_rates(settings.REQUEST_LOG_SAMPLE_RATES if sample_rates is None else sample_rates)
+        self.exclude = tuple(settings.request_timing_exclude_paths if exclude_paths is None else exclude_paths)
+        self.slow_seconds = settings.REQUEST_LOG_SLOW_SECONDS if slow_seconds is None else slow_seconds
+        self._random = random.random
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude):
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", ()))
+                headers.append((b"x-process-time", str(time.perf_counter() - start).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        except Exception as e:
+            logger.error(f"❌ Request failed: {scope['method']} {scope['path']} {str(e)}")
+            self._record(scope, 500, time.perf_counter() - start, logged=True)
+            raise
+        self._record(scope, status, time.perf_counter() - start)
+
+    def _record(self, scope, status: int, elapsed: float, logged: bool = False):
+        # The router leaves the matched route in the scope
+        route = scope.get("route")
+        template = getattr(route, "path_format", None) or "unmatched"
+        http_request_duration.observe(elapsed, scope["method"], template, str(status))
+        if logged:
+            return
+
+        if status >= 500 or elapsed >= self.slow_seconds:
+            logger.warning(f"⚠️ {scope['method']} {scope['path']} Status: {status} Time: {elapsed:.3f}s")
+            return
+        path = scope["path"]
+        for prefix, rate in self.rates:
+            if path.startswith(prefix):
+                if rate >= 1 or self._random() < rate:
+                    logger.info(f"📤 {scope['method']} {path} Status: {status} Time: {elapsed:.3f}s")
+                return
+        logger.info(f"📤 {scope['method']} {path} Status: {status} Time: {elapsed:.3f}s")
+
+
+# Export
+__all__ = ["RequestTimingMiddleware"]
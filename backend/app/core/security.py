@@ -4,13 +4,23 @@ JWT authentication, PII masking, consent tracking
 """
 
 import re
+import hmac
+import time
+import base64
 import hashlib
-from typing import Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Callable
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings, get_pii_patterns
 from app.core.logging import logger, audit_log
+from app.services.consent_store import consent_store
 
 
 # Password hashing
@@ -44,14 +54,263 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified JWT payloads
+    
+    Entries are keyed by the SHA-256 digest of the token (the token itself
+    is never kept) and expire at the token's `exp`. A hit costs a hash and
+    a dict lookup instead of a base64 decode, JSON parse and HMAC check.
+    Only successful verifications are cached, so invalid tokens cannot
+    evict valid ones.
+    """
+    
+    def __init__(self, max_entries: int = None):
+        self.max_entries = settings.AUTH_TOKEN_CACHE_SIZE if max_entries is None else max_entries
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Verify a token, from cache when possible
+        
+        Args:
+            token: Encoded JWT
+        
+        Returns:
+            Decoded payload, or None if the token is invalid or expired
+        """
+        if self.max_entries <= 0:
+            return verify_token(token)
+        
+        digest = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(digest)
+                    return entry[1]
+                del self._entries[digest]
+        
+        payload = verify_token(token)
+        if payload is None:
+            return None
+        # Tokens without exp stay cached until evicted, as they stay valid
+        expires = payload.get("exp", float("inf"))
+        with self._lock:
+            self._entries[digest] = (expires, payload)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return payload
+    
+    def clear(self):
+        """Forget all verified tokens (e.g. after rotating JWT_SECRET_KEY)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global instance
+token_cache = VerifiedTokenCache()
+
+_bearer_scheme = HTTPBearer(auto_error=False)
+_auth_exempt_paths = tuple(settings.auth_exempt_paths)
+
+
+async def require_auth(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer_scheme)
+) -> Optional[Dict[str, Any]]:
+    """
+    FastAPI dependency requiring a valid bearer JWT when AUTH_ENABLED
+    
+    Twilio webhook paths (AUTH_EXEMPT_PATHS) are skipped; Twilio cannot
+    send our tokens and its requests are checked by signature instead.
+    The payload is also stored on request.state.user.
+    
+    Returns:
+        Token payload, or None when auth is disabled or the path is exempt
+    """
+    if not settings.AUTH_ENABLED or request.scope["path"].startswith(_auth_exempt_paths):
+        return None
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    payload = token_cache.verify(credentials.credentials)
+    if payload is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
+    request.state.user = payload
+    return payload
+
+
+_loopback_hosts = ("127.0.0.1", "::1", "localhost")
+
+
+async def require_admin(
+    request: Request,
+    payload: Optional[Dict[str, Any]] = Depends(require_auth)
+) -> Optional[Dict[str, Any]]:
+    """
+    FastAPI dependency for the admin diagnostics API
+    
+    With AUTH_ENABLED the token must carry role=AUTH_ADMIN_ROLE. Without
+    auth there is nobody to check, so only clients on localhost (an
+    operator inside the container or pod) are let through.
+    
+    Returns:
+        Token payload, or None when auth is disabled
+    """
+    if settings.AUTH_ENABLED:
+        if payload is None or payload.get("role") != settings.AUTH_ADMIN_ROLE:
+            raise HTTPException(status_code=403, detail="Admin role required")
+        return payload
+    client = request.client
+    if client is None or client.host not in _loopback_hosts:
+        raise HTTPException(status_code=403, detail="Admin API is limited to localhost while AUTH_ENABLED is off")
+    return None
+
+
+# ==================== TWILIO WEBHOOK SIGNATURES ====================
+
+class TwilioSignatureValidator:
+    """
+    X-Twilio-Signature validation for webhook requests
+    
+    Twilio signs HMAC-SHA1(auth token, URL + each form param name and value
+    in sorted order), base64-encoded. The HMAC inner and outer SHA-1 states
+    are keyed once (RFC 2104) and copied per request, and the signed string
+    is built in one join over the already-parsed form, so a callback costs
+    a few microseconds.
+    """
+    
+    def __init__(self, auth_token: str = None, public_url: str = None):
+        key = (auth_token or settings.TWILIO_AUTH_TOKEN).encode()
+        if len(key) > 64:
+            key = hashlib.sha1(key).digest()
+        key = key.ljust(64, b"\0")
+        self._inner = hashlib.sha1(bytes(b ^ 0x36 for b in key))
+        self._outer = hashlib.sha1(bytes(b ^ 0x5C for b in key))
+        public = urlsplit(public_url if public_url is not None else settings.PUBLIC_URL)
+        self._public_base = f"{public.scheme}://{public.netloc}" if public.netloc else None
+    
+    def signature(self, url: str, params=()) -> bytes:
+        """
+        Compute the signature Twilio sends for a request
+        
+        Args:
+            url: Full request URL including the query string
+            params: (name, value) form pairs of a POST body
+        
+        Returns:
+            Base64-encoded signature
+        """
+        if params:
+            url += "".join(map("".join, sorted(set(params))))
+        inner = self._inner.copy()
+        inner.update(url.encode())
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return base64.b64encode(outer.digest())
+    
+    def validate(self, signature: str, base: str, path: str, params=()) -> bool:
+        """
+        Check a signature against the URLs Twilio may have signed
+        
+        The URL as seen through proxy headers is tried first, then with the
+        default port toggled (Twilio signs what it was given), then under
+        PUBLIC_URL in case a proxy rewrote the host.
+        
+        Args:
+            signature: X-Twilio-Signature header value
+            base: Request scheme and host, e.g. https://example.ngrok.app
+            path: Path plus query string
+            params: (name, value) form pairs of a POST body
+        
+        Returns:
+            True if any candidate URL matches
+        """
+        expected = signature.encode()
+        if hmac.compare_digest(self.signature(base + path, params), expected):
+            return True
+        candidates = [_toggle_default_port(base)]
+        if self._public_base and self._public_base != base:
+            candidates.append(self._public_base)
+        return any(hmac.compare_digest(self.signature(candidate + path, params), expected) for candidate in candidates)
+
+
+def _toggle_default_port(base: str) -> str:
+    """https://host <-> https://host:443 (and :80 for http)"""
+    default = ":443" if base.startswith("https:") else ":80"
+    return base[:-len(default)] if base.endswith(default) else base + default
+
+
+twilio_validator = TwilioSignatureValidator()
+
+
+async def verify_twilio_signature(request: Request) -> None:
+    """
+    FastAPI dependency rejecting webhook requests not signed by Twilio
+    
+    Scheme and host come from X-Forwarded-Proto / X-Forwarded-Host (ngrok,
+    load balancers) or the Host header. POST forms are read through
+    request.form(), which Starlette caches for the route's own Form
+    parameters. Disabled with TWILIO_VALIDATE_SIGNATURES=False.
+    
+    Raises:
+        HTTPException: 403 if the signature is missing or wrong
+    """
+    if not settings.TWILIO_VALIDATE_SIGNATURES:
+        return
+    
+    scope = request.scope
+    signature = host = forwarded_host = forwarded_proto = None
+    for name, value in scope["headers"]:
+        if name == b"x-twilio-signature":
+            signature = value
+        elif name == b"host":
+            host = value
+        elif name == b"x-forwarded-host":
+            forwarded_host = value
+        elif name == b"x-forwarded-proto":
+            forwarded_proto = value
+    
+    if signature:
+        scheme = forwarded_proto.split(b",")[0].strip().decode("latin-1") if forwarded_proto else scope["scheme"]
+        host = (forwarded_host or host or b"").split(b",")[0].strip().decode("latin-1")
+        # raw_path keeps the percent-encoding Twilio signed (some servers include the query in it)
+        path = (scope.get("raw_path") or scope["path"].encode()).split(b"?", 1)[0].decode("latin-1")
+        if scope["query_string"]:
+            path += "?" + scope["query_string"].decode("latin-1")
+        params = ()
+        if scope["method"] == "POST":
+            params = [(name, value) for name, value in (await request.form()).multi_items() if isinstance(value, str)]
+        if twilio_validator.validate(signature.decode("latin-1"), f"{scheme}://{host}", path, params):
+            return
+    
+    logger.warning(f"⛔ Rejected unsigned Twilio webhook: {scope['method']} {scope['path']}")
+    raise HTTPException(status_code=403, detail="Invalid Twilio signature")
+
+
 # ==================== PII MASKING ====================
 
+# An opening parenthesis that starts a capturing group
+_CAPTURING_GROUP = re.compile(r'(?<!\\)\((?!\?)')
+
+# Every token (whitespace-separated run) of every PII match below contains
+# a digit or '@'. Runs of such tokens, found with a fast character-class
+# scan, are the only places a pattern can match, and they begin and end
+# at whitespace, so word boundaries inside them are unchanged.
+_PII_CANDIDATES = re.compile(r'[0-9@]\S*(?:\s+\S*?[0-9@]\S*)*')
+
+
 class PIIMasker:
     """PII masking for compliance"""
     
     # Regex patterns for Indian PII
     PATTERNS = {
-        "phone": r'\b(\+91[\-\s]?)?[6-9]\d{9}\b',
+        "phone": r'(?:\+91[\-\s]?|\b)[6-9]\d{9}\b',
         "email": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
         "aadhaar": r'\b\d{4}\s?\d{4}\s?\d{4}\b',
         "pan": r'\b[A-Z]{5}[0-9]{4}[A-Z]{1}\b',
@@ -60,11 +319,76 @@ class PIIMasker:
         "credit_card": r'\b\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}\b'
     }
     
+    # New patterns must keep the _PII_CANDIDATES invariant (a digit or '@'
+    # in each token of a match)
+    
+    # When several patterns match at the same position, the first listed
+    # wins: a 16-digit card is not an aadhaar plus digits, a 12-digit
+    # aadhaar or 10-digit mobile is not a bank account, and digits inside
+    # an email address belong to the email
+    PRECEDENCE = ["email", "credit_card", "aadhaar", "phone", "account", "pan", "ifsc"]
+    
+    @classmethod
+    @lru_cache(maxsize=32)
+    def _compile(cls, pattern_names: tuple) -> Optional[Callable[[str], str]]:
+        """
+        Compile the selected patterns into a single-pass masking function
+        
+        The patterns become one alternation of named groups in PRECEDENCE
+        order. The alternation only runs on candidate spans (see
+        _PII_CANDIDATES), so text without digits or '@' is never scanned
+        by it.
+        
+        Args:
+            pattern_names: PII pattern names (unknown names are ignored)
+        
+        Returns:
+            Masking function, or None if no pattern was selected
+        """
+        selected = [name for name in cls.PRECEDENCE if name in pattern_names]
+        if not selected:
+            return None
+        
+        # Inner groups become non-capturing so lastgroup is always a pattern name
+        regex = re.compile("|".join(
+            f"(?P<{name}>{_CAPTURING_GROUP.sub('(?:', cls.PATTERNS[name])})"
+            for name in selected
+        ))
+        replacements = {name: f"[{name.upper()}_REDACTED]" for name in selected}
+        replace = lambda match: replacements[match.lastgroup]
+        sub = regex.sub
+        
+        def mask(text: str) -> str:
+            parts = []
+            last = 0
+            for candidate in _PII_CANDIDATES.finditer(text):
+                start, end = candidate.span()
+                # Extend back to the token start (email local part, PAN letters, "+91")
+                while start > last and not text[start - 1].isspace():
+                    start -= 1
+                parts.append(text[last:start])
+                parts.append(sub(replace, text[start:end]))
+                last = end
+            if not parts:
+                return text
+            parts.append(text[last:])
+            return "".join(parts)
+        
+        return mask
+    
+    @classmethod
+    def _masker(cls, patterns: list = None) -> Optional[Callable[[str], str]]:
+        """Cached masking function for a pattern set"""
+        return cls._compile(tuple(name.strip() for name in patterns or get_pii_patterns()))
+    
     @classmethod
     def mask_text(cls, text: str, patterns: list = None) -> str:
         """
         Mask PII in text
         
+        All patterns are matched in one pass with a precompiled regex;
+        overlapping matches are resolved by PRECEDENCE.
+        
         Args:
             text: Input text
             patterns: List of PII patterns to mask (default: all)
@@ -75,15 +399,26 @@ class PIIMasker:
         if not settings.ENABLE_PII_MASKING:
             return text
         
-        masked_text = text
-        patterns_to_mask = patterns or get_pii_patterns()
+        masker = cls._masker(patterns)
+        return masker(text) if masker else text
+    
+    @classmethod
+    def mask_many(cls, texts: List[str], patterns: list = None) -> List[str]:
+        """
+        Mask PII in a batch of texts
+        
+        Args:
+            texts: Input texts
+            patterns: List of PII patterns to mask (default: all)
         
-        for pattern_name in patterns_to_mask:
-            if pattern_name in cls.PATTERNS:
-                pattern = cls.PATTERNS[pattern_name]
-                masked_text = re.sub(pattern, f"[{pattern_name.upper()}_REDACTED]", masked_text)
+        Returns:
+            Masked texts, in order
+        """
+        if not settings.ENABLE_PII_MASKING:
+            return list(texts)
         
-        return masked_text
+        masker = cls._masker(patterns)
+        return [masker(text) for text in texts] if masker else list(texts)
     
     @classmethod
     def hash_pii(cls, value: str) -> str:
@@ -96,8 +431,8 @@ class PIIMasker:
 class ConsentManager:
     """Manage user consent for calls and messages"""
     
-    # In-memory storage (use Redis/DB in production)
-    consent_records = {}
+    # Persistent store (SQLite, cached in memory once warmed)
+    store = consent_store
     
     @classmethod
     def record_consent(
@@ -116,15 +451,7 @@ class ConsentManager:
             granted: Whether consent was granted
             metadata: Additional metadata
         """
-        consent_id = f"{user_id}:{consent_type}"
-        
-        cls.consent_records[consent_id] = {
-            "user_id": user_id,
-            "consent_type": consent_type,
-            "granted": granted,
-            "timestamp": datetime.utcnow().isoformat(),
-            "metadata": metadata or {}
-        }
+        cls.store.record(user_id, consent_type, granted, metadata)
         
         # Audit log
         audit_log(
@@ -147,21 +474,26 @@ class ConsentManager:
         Returns:
             True if consent granted, False otherwise
         """
-        consent_id = f"{user_id}:{consent_type}"
-        record = cls.consent_records.get(consent_id)
+        return cls.store.check(user_id, consent_type)
+    
+    @classmethod
+    def check_consent_bulk(cls, user_ids: List[str], consent_type: str) -> List[bool]:
+        """
+        Check consent for a whole campaign list in one pass
         
-        if not record:
-            return False
+        Args:
+            user_ids: User identifiers
+            consent_type: Type of consent
         
-        return record.get("granted", False)
+        Returns:
+            Consent flags aligned with user_ids
+        """
+        return cls.store.check_bulk(user_ids, consent_type)
     
     @classmethod
     def get_consent_history(cls, user_id: str) -> list:
         """Get consent history for user"""
-        return [
-            record for record in cls.consent_records.values()
-            if record["user_id"] == user_id
-        ]
+        return cls.store.history(user_id)
 
 
 # ==================== CALL RECORDING COMPLIANCE ====================
@@ -208,12 +540,51 @@ def sanitize_for_embedding(text: str) -> str:
     return sanitized
 
 
+def sanitize_many_for_embedding(texts: List[str]) -> List[str]:
+    """
+    Sanitize a batch of texts before creating embeddings
+    
+    Args:
+        texts: Input texts
+    
+    Returns:
+        Sanitized texts, in order
+    """
+    sanitized = PIIMasker.mask_many(texts)
+    
+    logger.debug(f"{len(texts)} texts sanitized for embedding")
+    
+    return sanitized
+
+
 # Export
 __all__ = [
     "create_access_token",
     "verify_token",
+    "VerifiedTokenCache",
+    "token_cache",
+    "require_auth",
+    "require_admin",
+    "TwilioSignatureValidator",
+    "twilio_validator",
+    "verify_twilio_signature",
     "PIIMasker",
     "ConsentManager",
     "get_call_recording_disclosure",
-    "sanitize_for_embedding"
+    "sanitize_for_embedding",
+    "sanitize_many_for_embedding"
 ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mint an API access token signed with JWT_SECRET_KEY")
+    parser.add_argument("--sub", required=True, help="Token subject (client or user name)")
+    parser.add_argument("--role", default=None, help="Role claim, e.g. admin for /api/admin")
+    parser.add_argument("--minutes", type=int, default=None, help="Lifetime (default JWT_EXPIRATION_MINUTES)")
+    args = parser.parse_args()
+
+    lifetime = timedelta(minutes=args.minutes) if args.minutes else None
+    claims = {"sub": args.sub, "role": args.role} if args.role else {"sub": args.sub}
+    print(create_access_token(claims, lifetime))
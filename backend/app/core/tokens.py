@@ -0,0 +1,46 @@
+"""
+Token Estimation
+Fast tokenizer-free prompt size estimates
+"""
+
+from typing import List, Dict
+
+
+# Per-message framing tokens added by chat templates (role markers etc.)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate LLM tokens for a text without running a tokenizer
+
+    Latin-script text averages ~4 characters per token; Devanagari and
+    Tamil are split far more finely by BPE vocabularies trained mostly on
+    English, roughly 1.5 characters per token. Both counts come from
+    C-level length operations, so this costs well under a microsecond
+    per 100 characters.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    # BMP non-ASCII characters (all Indic scripts) take 2-3 UTF-8 bytes
+    extra_bytes = len(text.encode("utf-8")) - len(text)
+    non_ascii = extra_bytes // 2
+    ascii_chars = len(text) - non_ascii
+    return max(1, int(ascii_chars / 4 + non_ascii / 1.5))
+
+
+def estimate_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Estimate prompt tokens for a list of chat messages"""
+    return sum(
+        estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+__all__ = ["estimate_tokens", "estimate_message_tokens"]
@@ -0,0 +1,248 @@
+"""
+Call Tracing
+Per-call span timelines with OpenTelemetry (OTLP/HTTP JSON) export
+"""
+
+import asyncio
+import time
+from array import array
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+import httpx
+from app.core.config import settings
+from app.core.logging import logger
+
+
+# Span names are interned; a span is four int64s (name id, start, end, error)
+_names: List[str] = []
+_name_ids: Dict[str, int] = {}
+
+
+def _name_id(name: str) -> int:
+    name_id = _name_ids.get(name)
+    if name_id is None:
+        name_id = _name_ids[name] = len(_names)
+        _names.append(name)
+    return name_id
+
+
+class CallTrace:
+    """
+    Timeline of one call
+
+    Span boundaries are monotonic-clock microseconds since the trace
+    started, stored flat in one array; the wall-clock start anchors them
+    for display and export. Point events (status callbacks) are spans of
+    zero length.
+    """
+
+    __slots__ = ("call_id", "wall_ns", "mono_ns", "spans", "exported")
+
+    def __init__(self, call_id: str):
+        self.call_id = call_id
+        self.wall_ns = time.time_ns()
+        self.mono_ns = time.monotonic_ns()
+        self.spans = array("q")
+        # Set once the trace is queued for export
+        self.exported = False
+
+    def now(self) -> int:
+        """Microseconds since the trace started"""
+        return (time.monotonic_ns() - self.mono_ns) // 1000
+
+    def add(self, name: str, start: int, end: int, error: bool = False):
+        """Record a span given start and end from now()"""
+        if len(self.spans) < 4 * settings.TRACE_MAX_SPANS_PER_CALL:
+            self.spans.extend((_name_id(name), start, end, 1 if error else 0))
+
+    def event(self, name: str):
+        """Record a point event at the current time"""
+        now = self.now()
+        self.add(name, now, now)
+
+    def span(self, name: str) -> "_Span":
+        """Context manager recording its block as a span"""
+        return _Span(self, name)
+
+    def _iter_spans(self):
+        spans = self.spans
+        for i in range(0, len(spans), 4):
+            yield _names[spans[i]], spans[i + 1], spans[i + 2], bool(spans[i + 3])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Timeline for the call details API, in milliseconds from call start"""
+        spans = sorted(self._iter_spans(), key=lambda span: span[1])
+        return {
+            "call_id": self.call_id,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(self.wall_ns // 10**9))
+                + f".{self.wall_ns // 10**6 % 1000:03d}Z",
+            "duration_ms": round(max((end for _, _, end, _ in spans), default=0) / 1000, 3),
+            "spans": [
+                {
+                    "name": name,
+                    "start_ms": round(start / 1000, 3),
+                    "duration_ms": round((end - start) / 1000, 3),
+                    "error": error
+                }
+                for name, start, end, error in spans
+            ]
+        }
+
+    def to_otlp_spans(self) -> List[Dict[str, Any]]:
+        """OTLP spans: a root "call" span with one child per recorded span"""
+        trace_id = self.call_id.replace("-", "").ljust(32, "0")[:32]
+        root_id = trace_id[:16]
+        spans = list(self._iter_spans())
+        end = max((span_end for _, _, span_end, _ in spans), default=0)
+        unix = lambda offset_us: str(self.wall_ns + offset_us * 1000)
+        otlp = [{
+            "traceId": trace_id,
+            "spanId": root_id,
+            "name": "call",
+            "kind": 2,  # SERVER
+            "startTimeUnixNano": unix(0),
+            "endTimeUnixNano": unix(end),
+            "attributes": [{"key": "call.id", "value": {"stringValue": self.call_id}}]
+        }]
+        for index, (name, start, span_end, error) in enumerate(spans, 1):
+            span = {
+                "traceId": trace_id,
+                "spanId": f"{int(root_id, 16) ^ index:016x}",
+                "parentSpanId": root_id,
+                "name": name,
+                "kind": 1,  # INTERNAL
+                "startTimeUnixNano": unix(start),
+                "endTimeUnixNano": unix(span_end),
+            }
+            if error:
+                span["status"] = {"code": 2}  # ERROR
+            otlp.append(span)
+        return otlp
+
+
+class _Span:
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace: CallTrace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = self.trace.now()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.trace.add(self.name, self.start, self.trace.now(), exc_type is not None)
+        return False
+
+
+# Trace of the call the current request is working on, so provider calls
+# made on its behalf (metrics.provider_call) land in its timeline. Each
+# request runs in its own context, so nothing leaks between requests.
+current_trace: ContextVar[Optional[CallTrace]] = ContextVar("current_trace", default=None)
+
+
+class TraceStore:
+    """Traces of the most recent TRACE_MAX_CALLS calls, oldest evicted first"""
+
+    def __init__(self, max_calls: int = None):
+        self.max_calls = max_calls or settings.TRACE_MAX_CALLS
+        self._traces: "OrderedDict[str, CallTrace]" = OrderedDict()
+
+    def start(self, call_id: str) -> CallTrace:
+        """Create the trace for a new call and make it current"""
+        trace = self._traces[call_id] = CallTrace(call_id)
+        if len(self._traces) > self.max_calls:
+            self._traces.popitem(last=False)
+        current_trace.set(trace)
+        return trace
+
+    def get(self, call_id: str) -> Optional[CallTrace]:
+        return self._traces.get(call_id)
+
+    def __len__(self) -> int:
+        return len(self._traces)
+
+
+def otlp_payload(traces: List[CallTrace]) -> Dict[str, Any]:
+    """OTLP/HTTP JSON ExportTraceServiceRequest for a batch of calls"""
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": [{"key": "service.name", "value": {"stringValue": settings.OTEL_SERVICE_NAME}}]
+            },
+            "scopeSpans": [{
+                "scope": {"name": "app.core.tracing"},
+                "spans": [span for trace in traces for span in trace.to_otlp_spans()]
+            }]
+        }]
+    }
+
+
+class OTLPExporter:
+    """
+    Batched export of finished call traces to an OpenTelemetry collector
+
+    Calls are queued when they reach a terminal status and posted every
+    OTEL_EXPORT_INTERVAL_SECONDS, so export never sits on a request path.
+    """
+
+    def __init__(self):
+        self._pending: List[CallTrace] = []
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def submit(self, trace: CallTrace):
+        """
+        Queue a finished call for export
+
+        Twilio can send several terminal callbacks for one call (a
+        `completed` after `no-answer` retries); only the first queues it.
+        """
+        if settings.OTEL_EXPORT_ENABLED and not trace.exported:
+            trace.exported = True
+            self._pending.append(trace)
+
+    async def start(self):
+        if settings.OTEL_EXPORT_ENABLED and self._task is None:
+            self._client = httpx.AsyncClient(timeout=5.0)
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"📡 Exporting call traces to {settings.OTEL_EXPORTER_OTLP_ENDPOINT}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.OTEL_EXPORT_INTERVAL_SECONDS)
+            await self.flush()
+
+    async def flush(self):
+        """Post all queued traces"""
+        batch, self._pending = self._pending, []
+        if not batch or self._client is None:
+            return
+        try:
+            response = await self._client.post(settings.OTEL_EXPORTER_OTLP_ENDPOINT, json=otlp_payload(batch))
+            response.raise_for_status()
+        except Exception as e:
+            logger.warning(f"⚠️ Trace export failed for {len(batch)} calls: {str(e)}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.flush()
+            await self._client.aclose()
+            self._client = None
+
+
+# Global instances
+trace_store = TraceStore()
+trace_exporter = OTLPExporter()
+
+
+# Export
+__all__ = ["CallTrace", "current_trace", "trace_store", "trace_exporter", "otlp_payload"]
@@ -3,15 +3,25 @@ BFSI AI Platform - Main FastAPI Application
 Enterprise-grade backend for WhatsApp & Voice AI
 """
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
-import time
 
 from app.core.config import settings
 from app.core.logging import setup_logging, logger
-from app.api import voice
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.request_timing import RequestTimingMiddleware
+from app.core.security import require_auth, require_admin
+from app.core.metrics import registry
+from app.core.tracing import trace_exporter
+from app.core.profiler import loop_watchdog
+from app.api import voice, knowledge, audit, admin
+from app.services.groq_service import groq_service
+from app.services.sarvam_service import sarvam_service
+from app.services.rag_service import rag_service
+from app.services.consent_store import consent_store
+from app.services.dnd_registry import dnd_registry
 
 # Setup logging
 setup_logging()
@@ -23,11 +33,27 @@ async def lifespan(app: FastAPI):
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug Mode: {settings.DEBUG}")
     
+    rag_service.load()
+    consent_store.warm()
+    dnd_registry.load()
+    await dnd_registry.start()
+    await trace_exporter.start()
+    if settings.LOOP_WATCHDOG_ENABLED:
+        await loop_watchdog.start()
+    
     logger.info("✅ All services initialized successfully")
     
     yield
     
     logger.info("🛑 Shutting down BFSI AI Platform...")
+    await groq_service.aclose()
+    await sarvam_service.aclose()
+    await trace_exporter.stop()
+    await dnd_registry.stop()
+    await loop_watchdog.stop()
+    
+    # Flush queued log records before the process exits
+    await logger.complete()
 
 
 # Create FastAPI app
@@ -40,6 +66,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rate limiting (added before CORS, which wraps it, so 429 responses carry CORS headers)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -49,37 +79,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request timing, access logs and HTTP latency metrics (added last, so it is outermost)
+app.add_middleware(RequestTimingMiddleware)
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests"""
-    start_time = time.time()
-    
-    # Log request
-    logger.info(f"📥 {request.method} {request.url.path}")
-    
-    try:
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        
-        # Log response
-        logger.info(
-            f"📤 {request.method} {request.url.path} "
-            f"Status: {response.status_code} "
-            f"Time: {process_time:.3f}s"
-        )
-        
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
-        
-    except Exception as e:
-        logger.error(f"❌ Request failed: {str(e)}")
-        raise
-
-
-# Include routers
-app.include_router(voice.router, prefix="/api/voice", tags=["Voice AI"])
+
+# Include routers (require_auth is a no-op unless AUTH_ENABLED; Twilio webhooks are exempt)
+app.include_router(voice.router, prefix="/api/voice", tags=["Voice AI"], dependencies=[Depends(require_auth)])
+app.include_router(knowledge.router, prefix="/api/knowledge", tags=["Knowledge Base"], dependencies=[Depends(require_auth)])
+app.include_router(audit.router, prefix="/api/audit", tags=["Compliance"], dependencies=[Depends(require_auth)])
+if settings.ADMIN_API_ENABLED:
+    app.include_router(admin.router, prefix="/api/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
 
 
 # Health check
@@ -94,6 +103,14 @@ async def health_check():
     }
 
 
+# Prometheus metrics
+if settings.ENABLE_METRICS:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint"""
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -110,7 +127,7 @@ async def root():
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle all uncaught exceptions"""
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+    logger.opt(exception=exc).error(f"Unhandled exception: {str(exc)}")
     
     return JSONResponse(
         status_code=500,
@@ -0,0 +1,554 @@
+"""
+Audit Store
+Append-only audit event log with indexed compliance queries
+"""
+
+import hashlib
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from array import array
+from collections import deque
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+import numpy as np
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.security import PIIMasker
+
+
+# Indexed record fields
+INDEX_FIELDS = ("user_hash", "call_id", "event")
+
+DAY_MS = 86_400_000
+
+# Events written (and fsynced) together by the writer thread
+COMMIT_BATCH_SIZE = 4096
+
+# Failed batches remembered so flush() can report them
+FAILED_BATCHES_KEPT = 100
+
+
+def index_key(value: str) -> int:
+    """64-bit index key of a field value (collisions are filtered on read)"""
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "little")
+
+
+def _to_ms(value) -> Optional[int]:
+    """datetime or epoch seconds to epoch milliseconds"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.timestamp()
+    return int(value * 1000)
+
+
+def _read_rows(fd: int, offsets, rows: np.ndarray) -> List[Dict[str, Any]]:
+    """Read records by row number; contiguous runs are read with one pread"""
+    records = []
+    if len(rows) == 0:
+        return records
+    if rows[-1] - rows[0] + 1 == len(rows):
+        start, end = int(offsets[int(rows[0])]), int(offsets[int(rows[-1]) + 1])
+        data = os.pread(fd, end - start, start)
+        return [json.loads(line) for line in data.splitlines()]
+    for row in rows.tolist():
+        start, end = int(offsets[row]), int(offsets[row + 1])
+        records.append(json.loads(os.pread(fd, end - start, start)))
+    return records
+
+
+class _SealedSegment:
+    """
+    Immutable segment: data.log plus memory-mapped row arrays
+
+    offsets.npy / ts.npy are per row (ts ascending). Each index is a pair
+    of arrays sorted by key: {field}_keys.npy and {field}_rows.npy.
+    """
+
+    def __init__(self, path: str, meta: Dict[str, Any], fd: Optional[int] = None):
+        self.path = path
+        self.seq = meta["seq"]
+        self.count = meta["count"]
+        self.min_ts = meta["min_ts"]
+        self.max_ts = meta["max_ts"]
+        self._arrays = None
+        self._fd = fd
+
+    def _load(self):
+        if self._arrays is None:
+            names = ["offsets", "ts"] + [f"{field}_{part}" for field in INDEX_FIELDS for part in ("keys", "rows")]
+            self._arrays = {name: np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r") for name in names}
+            if self._fd is None:
+                self._fd = os.open(os.path.join(self.path, "data.log"), os.O_RDONLY)
+        return self._arrays
+
+    def rows(self, keys: Dict[str, int], start: int, end: int) -> np.ndarray:
+        arrays = self._load()
+        lo = int(np.searchsorted(arrays["ts"], start, side="left"))
+        hi = int(np.searchsorted(arrays["ts"], end, side="right"))
+
+        candidates = None
+        for field, key in keys.items():
+            sorted_keys = arrays[f"{field}_keys"]
+            key = np.uint64(key)  # A Python int would be compared as float64
+            a = int(np.searchsorted(sorted_keys, key, side="left"))
+            b = int(np.searchsorted(sorted_keys, key, side="right"))
+            rows = np.asarray(arrays[f"{field}_rows"][a:b])
+            rows = rows[(rows >= lo) & (rows < hi)]
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+        if candidates is None:
+            return np.arange(lo, hi, dtype=np.int64)
+        return candidates.astype(np.int64)
+
+    def read(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        return _read_rows(self._fd, self._load()["offsets"], rows)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._arrays = None
+
+
+class _ActiveSegment:
+    """
+    Segment being appended to
+
+    Row columns live in compact arrays (8 bytes per row per column).
+    Columns are appended after the data is fsynced, ts last, so a reader
+    that takes len(ts) only sees durable rows.
+    """
+
+    def __init__(self, path: str, seq: int):
+        self.path = path
+        self.seq = seq
+        os.makedirs(path, exist_ok=True)
+        self.offsets = array("Q", [0])
+        self.ts = array("q")
+        self.columns = {field: array("Q") for field in INDEX_FIELDS}
+        self.fd = os.open(os.path.join(path, "data.log"), os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o640)
+        self._recover()
+
+    @property
+    def count(self) -> int:
+        return len(self.ts)
+
+    @property
+    def min_ts(self) -> int:
+        return self.ts[0]
+
+    @property
+    def max_ts(self) -> int:
+        return self.ts[-1]
+
+    def _recover(self):
+        """Rebuild row columns from data.log, cutting a torn final record"""
+        size = os.fstat(self.fd).st_size
+        if not size:
+            return
+        with open(os.path.join(self.path, "data.log"), "rb") as f:
+            data = f.read()
+        position = 0
+        for line in data.splitlines(keepends=True):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("torn record")
+                self._index(json.loads(line), position + len(line))
+            except ValueError:
+                logger.warning(f"⚠️ Audit segment {self.seq}: truncating torn tail at byte {position}")
+                os.ftruncate(self.fd, position)
+                break
+            position += len(line)
+
+    def _index(self, record: Dict[str, Any], end: int):
+        self.offsets.append(end)
+        for field in INDEX_FIELDS:
+            value = record.get(field)
+            self.columns[field].append(index_key(value) if value else 0)
+        self.ts.append(record["ts"])
+
+    def append(self, records: List[Dict[str, Any]], lines: List[bytes], fsync: bool):
+        os.write(self.fd, b"".join(lines))
+        if fsync:
+            os.fsync(self.fd)
+        end = self.offsets[-1]
+        for record, line in zip(records, lines):
+            end += len(line)
+            self._index(record, end)
+
+    def rows(self, keys: Dict[str, int], start: int, end: int) -> np.ndarray:
+        n = len(self.ts)
+        lo = bisect_left(self.ts, start, 0, n)
+        hi = bisect_right(self.ts, end, lo, n)
+        mask = None
+        for field, key in keys.items():
+            column = np.frombuffer(self.columns[field][lo:hi], dtype=np.uint64)
+            matches = column == np.uint64(key)
+            mask = matches if mask is None else mask & matches
+        if mask is None:
+            return np.arange(lo, hi, dtype=np.int64)
+        return np.flatnonzero(mask).astype(np.int64) + lo
+
+    def read(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        return _read_rows(self.fd, self.offsets, rows)
+
+    def seal(self) -> _SealedSegment:
+        """Write row arrays and indexes; meta.json marks the segment sealed"""
+        np.save(os.path.join(self.path, "offsets.npy"), np.frombuffer(self.offsets, dtype=np.uint64))
+        np.save(os.path.join(self.path, "ts.npy"), np.frombuffer(self.ts, dtype=np.int64))
+        for field in INDEX_FIELDS:
+            keys = np.frombuffer(self.columns[field], dtype=np.uint64)
+            order = np.argsort(keys, kind="stable")  # Rows stay ascending per key
+            np.save(os.path.join(self.path, f"{field}_keys.npy"), keys[order])
+            np.save(os.path.join(self.path, f"{field}_rows.npy"), order.astype(np.uint32))
+
+        meta = {"seq": self.seq, "count": self.count, "min_ts": self.min_ts, "max_ts": self.max_ts}
+        meta_path = os.path.join(self.path, "meta.json")
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(meta_path + ".tmp", meta_path)
+        # The descriptor is handed over so in-flight readers keep working
+        return _SealedSegment(self.path, meta, fd=self.fd)
+
+
+class AuditStore:
+    """
+    Append-only audit event store
+
+    Events are JSON lines in segment directories (seg-00000001/data.log).
+    A segment is sealed when the UTC day changes or it reaches
+    AUDIT_SEGMENT_MAX_EVENTS; sealing writes sorted index arrays for
+    user_hash, call_id and event that are memory-mapped at query time.
+
+    Appends are queued and written by a background thread that commits
+    everything queued at once with a single fsync (group commit); call
+    flush() to wait for durability. Queries skip segments outside the
+    requested time range, binary-search the indexes of sealed segments
+    and scan the compact columns of the active one.
+
+    User identifiers are never stored, only PIIMasker.hash_pii digests.
+    Whole segments older than AUDIT_LOG_RETENTION_DAYS are deleted.
+    """
+
+    def __init__(
+        self,
+        directory: str = None,
+        retention_days: int = None,
+        segment_max_events: int = None,
+        fsync: bool = None
+    ):
+        self.directory = directory or settings.AUDIT_STORE_DIR
+        self.retention_days = retention_days or settings.AUDIT_LOG_RETENTION_DAYS
+        self.segment_max_events = segment_max_events or settings.AUDIT_SEGMENT_MAX_EVENTS
+        self.fsync = settings.AUDIT_FSYNC if fsync is None else fsync
+
+        self.sealed: List[_SealedSegment] = []
+        self.active: Optional[_ActiveSegment] = None
+        self._last_ts = 0
+        self._lock = threading.Lock()
+        self._opened = False
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._durable = threading.Condition()
+        self._enqueued = 0
+        # Writer progress by sequence number, failed batches included
+        self._written = 0
+        self._committed = 0
+        self._failed = 0
+        self._lost: "deque" = deque(maxlen=FAILED_BATCHES_KEPT)
+
+    # ==================== OPEN / CLOSE ====================
+
+    def open(self) -> "AuditStore":
+        """Load sealed segments, recover the active one, start the writer"""
+        with self._lock:
+            if self._opened:
+                return self
+            os.makedirs(self.directory, exist_ok=True)
+
+            unsealed = []
+            for name in sorted(os.listdir(self.directory)):
+                path = os.path.join(self.directory, name)
+                if not name.startswith("seg-"):
+                    continue
+                meta_path = os.path.join(path, "meta.json")
+                if os.path.exists(meta_path):
+                    with open(meta_path, "r", encoding="utf-8") as f:
+                        self.sealed.append(_SealedSegment(path, json.load(f)))
+                else:
+                    unsealed.append((path, int(name[4:])))
+
+            # Segments left unsealed by a crash mid-seal are sealed now
+            for path, seq in unsealed[:-1]:
+                segment = _ActiveSegment(path, seq)
+                if segment.count:
+                    self.sealed.append(segment.seal())
+                else:
+                    os.close(segment.fd)
+                    shutil.rmtree(path, ignore_errors=True)
+            self.sealed.sort(key=lambda segment: segment.seq)
+            if unsealed:
+                path, seq = unsealed[-1]
+                self.active = _ActiveSegment(path, seq)
+
+            segments = self.sealed + ([self.active] if self.active and self.active.count else [])
+            self._last_ts = max((segment.max_ts for segment in segments), default=0)
+            self._prune()
+
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+            self._opened = True
+            logger.info(f"🧾 Audit store opened: {sum(s.count for s in segments):,} events in {len(segments)} segments")
+        return self
+
+    def close(self):
+        """Flush pending events and stop the writer; the next open() recovers the active segment"""
+        if not self._opened:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        with self._lock:
+            if self.active is not None:
+                os.close(self.active.fd)
+                self.active = None
+            for segment in self.sealed:
+                segment.close()
+            self.sealed = []
+            self._opened = False
+
+    # ==================== APPEND ====================
+
+    def append(
+        self,
+        event: str,
+        user_id: Optional[str] = None,
+        call_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp=None,
+        user_hash: Optional[str] = None
+    ) -> int:
+        """
+        Queue an audit event
+
+        Args:
+            event: Event type
+            user_id: User identifier (stored as PIIMasker.hash_pii digest)
+            call_id: Call identifier
+            metadata: Additional JSON-serializable fields
+            timestamp: Event time (datetime or epoch seconds); default now
+            user_hash: Precomputed user digest, instead of user_id
+
+        Returns:
+            Sequence number; flush(seq) waits until it is durable
+        """
+        if not self._opened:
+            self.open()
+        if user_hash is None and user_id:
+            user_hash = PIIMasker.hash_pii(str(user_id))
+        record = {
+            "ts": _to_ms(timestamp),
+            "event": event,
+            "user_hash": user_hash,
+            "call_id": call_id,
+            "metadata": metadata or {}
+        }
+        with self._durable:
+            self._enqueued += 1
+            seq = self._enqueued
+            self._queue.put(record)
+        return seq
+
+    def flush(self, seq: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until event `seq` (default: everything queued so far) is written
+
+        Returns:
+            True if it is durable; False on timeout or if a failed write
+            lost it (or, without `seq`, lost any event still pending)
+        """
+        with self._durable:
+            target = self._enqueued if seq is None else seq
+            since = self._written if seq is None else seq - 1
+            if not self._durable.wait_for(lambda: self._written >= target, timeout):
+                return False
+            return not any(first <= target and last > since for first, last in self._lost)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < COMMIT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [record for record in batch if record is not None]
+            failed = False
+            try:
+                if records:
+                    self._commit(records)
+            except Exception as e:
+                failed = True
+                logger.error(f"❌ Audit store write failed, {len(records)} events lost: {str(e)}")
+            with self._durable:
+                first = self._written + 1
+                self._written += len(records)
+                if failed:
+                    self._failed += len(records)
+                    self._lost.append((first, self._written))
+                else:
+                    self._committed += len(records)
+                self._durable.notify_all()
+            if None in batch:
+                return
+
+    def _commit(self, records: List[Dict[str, Any]]):
+        """Write one batch: a single write and fsync per segment touched"""
+        now = int(time.time() * 1000)
+        pending, lines = [], []
+        for record in records:
+            # Timestamps never go backwards, so every segment is sorted by time
+            record["ts"] = max(record["ts"] or now, self._last_ts)
+            self._last_ts = record["ts"]
+
+            if self._needs_new_segment(record["ts"], pending):
+                if pending:
+                    self.active.append(pending, lines, self.fsync)
+                    pending, lines = [], []
+                self._roll()
+            pending.append(record)
+            lines.append((json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str) + "\n").encode())
+        if pending:
+            self.active.append(pending, lines, self.fsync)
+
+    def _needs_new_segment(self, ts: int, pending: List[Dict[str, Any]]) -> bool:
+        if self.active is None:
+            return True
+        count = self.active.count + len(pending)
+        if count == 0:
+            return False
+        first = self.active.min_ts if self.active.count else pending[0]["ts"]
+        return count >= self.segment_max_events or ts // DAY_MS != first // DAY_MS
+
+    def _roll(self):
+        """Seal the active segment and start the next one"""
+        with self._lock:
+            seq = 1
+            if self.active is not None:
+                seq = self.active.seq + 1
+                if self.active.count:
+                    self.sealed.append(self.active.seal())
+                else:
+                    seq = self.active.seq
+                    os.close(self.active.fd)
+            elif self.sealed:
+                seq = self.sealed[-1].seq + 1
+            self.active = _ActiveSegment(os.path.join(self.directory, f"seg-{seq:08d}"), seq)
+            self._prune()
+
+    def _prune(self):
+        """Delete sealed segments entirely older than the retention window"""
+        cutoff = int(time.time() * 1000) - self.retention_days * DAY_MS
+        expired = [segment for segment in self.sealed if segment.max_ts < cutoff]
+        for segment in expired:
+            segment.close()
+            shutil.rmtree(segment.path, ignore_errors=True)
+        if expired:
+            self.sealed = [segment for segment in self.sealed if segment.max_ts >= cutoff]
+            logger.info(f"🗑️ Pruned {len(expired)} audit segments past {self.retention_days}-day retention")
+
+    # ==================== QUERY ====================
+
+    def query(
+        self,
+        user_id: Optional[str] = None,
+        call_id: Optional[str] = None,
+        event: Optional[str] = None,
+        since=None,
+        until=None,
+        limit: int = 1000,
+        newest_first: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Find audit events
+
+        Filters combine with AND. Only durable events are returned.
+
+        Args:
+            user_id: User identifier (matched by hash)
+            call_id: Call identifier
+            event: Event type
+            since: Start time (datetime or epoch seconds), inclusive
+            until: End time (datetime or epoch seconds), inclusive
+            limit: Maximum events to return
+            newest_first: Return the most recent events first
+
+        Returns:
+            Event records
+        """
+        if not self._opened:
+            self.open()
+        wanted = {
+            "user_hash": PIIMasker.hash_pii(str(user_id)) if user_id else None,
+            "call_id": call_id,
+            "event": event
+        }
+        wanted = {field: value for field, value in wanted.items() if value}
+        keys = {field: index_key(value) for field, value in wanted.items()}
+        start = _to_ms(since) if since is not None else 0
+        end = _to_ms(until) if until is not None else 2 ** 62
+
+        with self._lock:
+            segments = list(self.sealed)
+            if self.active is not None and self.active.count:
+                segments.append(self.active)
+        if newest_first:
+            segments.reverse()
+
+        results = []
+        for segment in segments:
+            if segment.max_ts < start or segment.min_ts > end:
+                continue
+            rows = segment.rows(keys, start, end)
+            remaining = limit - len(results)
+            rows = rows[-remaining:] if newest_first else rows[:remaining]
+            records = segment.read(rows)
+            if newest_first:
+                records.reverse()
+            for record in records:
+                if all(record.get(field) == value for field, value in wanted.items()):
+                    results.append(record)
+            if len(results) >= limit:
+                break
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Segment and event counts"""
+        if not self._opened:
+            self.open()
+        with self._lock:
+            segments = self.sealed + ([self.active] if self.active is not None and self.active.count else [])
+            return {
+                "events": sum(segment.count for segment in segments),
+                "segments": len(segments),
+                "oldest": min((segment.min_ts for segment in segments), default=None),
+                "newest": max((segment.max_ts for segment in segments), default=None),
+                "failed_writes": self._failed,
+                "retention_days": self.retention_days
+            }
+
+
+# Global instance
+audit_store = AuditStore()
+
+
+# Export
+__all__ = ["AuditStore", "audit_store", "index_key"]
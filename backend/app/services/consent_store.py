@@ -0,0 +1,257 @@
+"""
+Consent Store
+Persistent consent records with a warm in-memory cache and bulk checks
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable
+from app.core.config import settings
+from app.core.logging import logger
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS consent_events (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    consent_type TEXT NOT NULL,
+    granted INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_consent_events_user ON consent_events (user_id, id);
+
+CREATE TABLE IF NOT EXISTS consent_state (
+    consent_type TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    granted INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (consent_type, user_id)
+) WITHOUT ROWID;
+"""
+
+# Uncached bulk checks above this size scan the consent type instead of probing
+BULK_SCAN_THRESHOLD = 50_000
+
+
+class ConsentStore:
+    """
+    SQLite (WAL) consent store
+
+    Every consent decision is appended to `consent_events` (indexed by
+    user for history lookups) and upserted into `consent_state`, the
+    current decision per (consent_type, user_id).
+
+    warm() loads consent_state into per-type dicts, after which single and
+    bulk checks never touch SQLite. If the table has more rows than
+    CONSENT_CACHE_MAX_ENTRIES, the cache stays off and bulk checks run a
+    single SQL statement: an index probe per number for short lists, one
+    range scan of the consent type for long ones. The same limit applies
+    as records are added: a cache that would outgrow it is dropped (a
+    partial cache would answer "no consent" for evicted users).
+    """
+
+    def __init__(self, path: str = None, cache_enabled: bool = None, cache_max_entries: int = None):
+        self.path = path or settings.CONSENT_DB_PATH
+        self.cache_enabled = settings.CONSENT_CACHE_ENABLED if cache_enabled is None else cache_enabled
+        self.cache_max_entries = cache_max_entries or settings.CONSENT_CACHE_MAX_ENTRIES
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._initialized = False
+
+        # consent_type -> {user_id: granted}; None until warmed
+        self._cache: Optional[Dict[str, Dict[str, bool]]] = None
+        self._cached_entries = 0
+
+    # ==================== CONNECTION ====================
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections are not shareable)"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if not self._initialized:
+                connection.executescript(SCHEMA)
+                self._initialized = True
+            self._local.connection = connection
+        return connection
+
+    def warm(self) -> "ConsentStore":
+        """Load current consent state into memory"""
+        if not self.cache_enabled:
+            return self
+
+        connection = self._connection()
+        (rows,) = connection.execute("SELECT COUNT(*) FROM consent_state").fetchone()
+        if rows > self.cache_max_entries:
+            logger.warning(f"⚠️ {rows:,} consent records exceed cache limit {self.cache_max_entries:,}; using SQLite lookups")
+            self._cache = None
+            return self
+
+        cache: Dict[str, Dict[str, bool]] = {}
+        for consent_type, user_id, granted in connection.execute(
+            "SELECT consent_type, user_id, granted FROM consent_state"
+        ):
+            cache.setdefault(consent_type, {})[user_id] = bool(granted)
+        self._cached_entries = rows
+        self._cache = cache
+        logger.info(f"✅ Consent cache warmed: {rows:,} records")
+        return self
+
+    # ==================== WRITE ====================
+
+    def record(
+        self,
+        user_id: str,
+        consent_type: str,
+        granted: bool,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Persist one consent decision and return the record"""
+        record = {
+            "user_id": user_id,
+            "consent_type": consent_type,
+            "granted": granted,
+            "timestamp": datetime.utcnow().isoformat(),
+            "metadata": metadata or {}
+        }
+        self.record_many([record])
+        return record
+
+    def record_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Persist consent decisions in one transaction (e.g. a campaign opt-in import)
+
+        Args:
+            records: Dicts with user_id, consent_type, granted and optional
+                timestamp and metadata
+
+        Returns:
+            Number of records written
+        """
+        now = datetime.utcnow().isoformat()
+        rows = [
+            (
+                record["user_id"],
+                record["consent_type"],
+                int(bool(record["granted"])),
+                record.get("timestamp") or now,
+                json.dumps(record.get("metadata") or {}, ensure_ascii=False, default=str)
+            )
+            for record in records
+        ]
+        if not rows:
+            return 0
+
+        connection = self._connection()
+        with self._write_lock, connection:
+            connection.executemany(
+                "INSERT INTO consent_events (user_id, consent_type, granted, timestamp, metadata) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            connection.executemany(
+                "INSERT INTO consent_state (user_id, consent_type, granted, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (consent_type, user_id) DO UPDATE SET granted = excluded.granted, updated_at = excluded.updated_at",
+                [row[:4] for row in rows]
+            )
+            if self._cache is not None:
+                for user_id, consent_type, granted, _, _ in rows:
+                    users = self._cache.setdefault(consent_type, {})
+                    if user_id not in users:
+                        self._cached_entries += 1
+                    users[user_id] = bool(granted)
+                if self._cached_entries > self.cache_max_entries:
+                    logger.warning(
+                        f"⚠️ Consent cache passed {self.cache_max_entries:,} records; using SQLite lookups"
+                    )
+                    self._cache = None
+                    self._cached_entries = 0
+        return len(rows)
+
+    # ==================== READ ====================
+
+    def check(self, user_id: str, consent_type: str) -> bool:
+        """Current consent decision (False if none was recorded)"""
+        if self._cache is not None:
+            return self._cache.get(consent_type, {}).get(user_id, False)
+
+        row = self._connection().execute(
+            "SELECT granted FROM consent_state WHERE consent_type = ? AND user_id = ?",
+            (consent_type, user_id)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def check_bulk(self, user_ids: List[str], consent_type: str) -> List[bool]:
+        """
+        Resolve consent for a whole list of users
+
+        Args:
+            user_ids: User identifiers (e.g. a campaign dial list)
+            consent_type: Type of consent
+
+        Returns:
+            Consent flags aligned with user_ids
+        """
+        if self._cache is not None:
+            lookup = self._cache.get(consent_type, {}).get
+            return [lookup(user_id, False) for user_id in user_ids]
+
+        connection = self._connection()
+        if len(user_ids) > BULK_SCAN_THRESHOLD:
+            # Large lists: one range scan of the type's granted users beats probing each number
+            rows = connection.execute(
+                "SELECT user_id FROM consent_state WHERE consent_type = ? AND granted = 1",
+                (consent_type,)
+            )
+        else:
+            rows = connection.execute(
+                "SELECT user_id FROM consent_state WHERE consent_type = ? AND granted = 1 "
+                "AND user_id IN (SELECT value FROM json_each(?))",
+                (consent_type, json.dumps(user_ids))
+            )
+        granted = {user_id for (user_id,) in rows}
+        return [user_id in granted for user_id in user_ids]
+
+    def history(self, user_id: str) -> List[Dict[str, Any]]:
+        """All consent decisions for a user, oldest first"""
+        rows = self._connection().execute(
+            "SELECT user_id, consent_type, granted, timestamp, metadata FROM consent_events "
+            "WHERE user_id = ? ORDER BY id",
+            (user_id,)
+        ).fetchall()
+        return [
+            {
+                "user_id": row[0],
+                "consent_type": row[1],
+                "granted": bool(row[2]),
+                "timestamp": row[3],
+                "metadata": json.loads(row[4])
+            }
+            for row in rows
+        ]
+
+    def __len__(self) -> int:
+        """Consent decisions held in the warm cache (0 when uncached)"""
+        return self._cached_entries if self._cache is not None else 0
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+# Global instance
+consent_store = ConsentStore()
+
+
+# Export
+__all__ = ["ConsentStore", "consent_store"]
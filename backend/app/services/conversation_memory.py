@@ -0,0 +1,164 @@
+"""
+Conversation Memory
+Token-budgeted chat history with incremental rolling-summary compaction
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.tokens import estimate_tokens
+
+
+Summarizer = Callable[[str, List[Dict[str, str]]], Awaitable[str]]
+
+
+class ConversationMemory:
+    """
+    Chat history that costs a constant number of prompt tokens per turn
+
+    Recent messages are kept verbatim up to `recent_budget` tokens. Older
+    messages move to a pending list and are folded into a rolling summary
+    (at most `summary_budget` tokens) by a background task, so the LLM call
+    on the hot path never waits for compaction. Messages waiting for
+    compaction are left out of the prompt rather than growing it.
+    """
+
+    def __init__(
+        self,
+        recent_budget: int = None,
+        summary_budget: int = None,
+        min_recent_messages: int = 2
+    ):
+        self.recent_budget = recent_budget or settings.CONVERSATION_RECENT_TOKEN_BUDGET
+        self.summary_budget = summary_budget or settings.CONVERSATION_SUMMARY_TOKEN_BUDGET
+        self.min_recent_messages = min_recent_messages
+
+        self.summary = ""
+        self.recent: deque = deque()
+        self.recent_tokens = 0
+        self.pending: List[Dict[str, Any]] = []
+        self.total_messages = 0
+        self._compaction: Optional[asyncio.Task] = None
+
+    def add_message(self, role: str, content: str):
+        """
+        Append a message, moving the oldest ones out of the verbatim window
+
+        Args:
+            role: user or assistant
+            content: Message text
+        """
+        tokens = estimate_tokens(content)
+        self.recent.append({
+            "role": role,
+            "content": content,
+            "tokens": tokens,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        self.recent_tokens += tokens
+        self.total_messages += 1
+
+        while self.recent_tokens > self.recent_budget and len(self.recent) > self.min_recent_messages:
+            evicted = self.recent.popleft()
+            self.recent_tokens -= evicted["tokens"]
+            self.pending.append(evicted)
+
+    def context_messages(self) -> List[Dict[str, str]]:
+        """Chat messages to place between the system prompt and the new query"""
+        messages = []
+        if self.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{self.summary}"
+            })
+        messages.extend({"role": m["role"], "content": m["content"]} for m in self.recent)
+        return messages
+
+    def context_tokens(self) -> int:
+        """Estimated prompt tokens of context_messages()"""
+        return estimate_tokens(self.summary) + self.recent_tokens
+
+    def schedule_compaction(self, summarize: Summarizer):
+        """
+        Fold pending messages into the summary in the background
+
+        Args:
+            summarize: async (previous_summary, messages) -> new summary
+        """
+        if not self.pending or (self._compaction and not self._compaction.done()):
+            return
+        self._compaction = asyncio.create_task(self._compact(summarize))
+
+    async def _compact(self, summarize: Summarizer):
+        while self.pending:
+            batch = self.pending[:]
+            turns = [{"role": m["role"], "content": m["content"]} for m in batch]
+
+            try:
+                summary = await summarize(self.summary, turns)
+            except Exception as e:
+                # Keep memory bounded even when the LLM is unavailable
+                logger.warning(f"⚠️ Conversation compaction failed, using extractive summary: {str(e)}")
+                summary = " ".join([self.summary] + [f"{t['role']}: {t['content']}" for t in turns])
+
+            self.summary = self._truncate(summary.strip())
+            del self.pending[:len(batch)]
+
+    def _truncate(self, text: str) -> str:
+        """Keep the most recent part of a summary within the summary budget"""
+        if estimate_tokens(text) <= self.summary_budget:
+            return text
+        # Token estimate is proportional to length: trim by the same ratio
+        keep = int(len(text) * self.summary_budget / estimate_tokens(text))
+        return text[-keep:]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-safe view for APIs and debugging"""
+        return {
+            "summary": self.summary,
+            "recent": [{k: m[k] for k in ("role", "content", "timestamp")} for m in self.recent],
+            "pending_compaction": len(self.pending),
+            "total_messages": self.total_messages,
+            "context_tokens": self.context_tokens()
+        }
+
+
+class ConversationStore:
+    """Bounded LRU map of session id -> ConversationMemory"""
+
+    def __init__(self, max_sessions: int = None):
+        self.max_sessions = max_sessions or settings.CONVERSATION_MAX_SESSIONS
+        self._sessions: "OrderedDict[str, ConversationMemory]" = OrderedDict()
+
+    def get(self, session_id: str) -> ConversationMemory:
+        """Get or create the memory for a session"""
+        memory = self._sessions.get(session_id)
+        if memory is None:
+            memory = self._sessions[session_id] = ConversationMemory()
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return memory
+
+    def peek(self, session_id: str) -> Optional[ConversationMemory]:
+        """Get a memory without creating or touching it"""
+        return self._sessions.get(session_id)
+
+    def drop(self, session_id: str):
+        """Forget a session"""
+        self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+# Create singleton instance
+conversation_store = ConversationStore()
+
+
+# Export
+__all__ = ["conversation_store", "ConversationStore", "ConversationMemory"]
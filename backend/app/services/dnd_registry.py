@@ -0,0 +1,399 @@
+"""
+DND Registry
+Do-not-call scrub list as a memory-mapped sorted uint64 array
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import threading
+import numpy as np
+from typing import Optional, Dict, Any, List, Iterable, Iterator, NamedTuple
+from app.core.config import settings
+from app.core.logging import logger
+
+
+POINTER_FILE = "dnd.json"
+
+# Numbers parsed per block when reading scrub files
+PARSE_BLOCK_LINES = 1_000_000
+
+# Characters dropped from numbers before parsing digits
+_STRIP = str.maketrans("", "", "+-() .")
+
+# Bloom filter double-hashing multipliers (odd 64-bit constants)
+_H1 = np.uint64(0x9E3779B97F4A7C15)
+_H2 = np.uint64(0xC2B2AE3D27D4EB4F)
+
+
+_MASK = (1 << 64) - 1
+
+
+def encode_number(number: str, country_code: str = None) -> int:
+    """Single-number form of encode_numbers(), without NumPy call overhead"""
+    digits = str(number).translate(_STRIP)
+    if not digits.isdigit() or len(digits) > 15:
+        return 0
+    key = int(digits)
+    if 10 ** 9 <= key < 10 ** 10:
+        key += int(country_code or settings.DND_DEFAULT_COUNTRY_CODE) * 10 ** 10
+    return key
+
+
+def encode_numbers(numbers: Iterable[str], country_code: str = None) -> np.ndarray:
+    """
+    Phone numbers to uint64 keys (E.164 digits without "+")
+
+    10-digit national numbers and trunk-prefixed ones ("0" + 10 digits)
+    get the default country code. Unparseable numbers map to 0, which is
+    never a registry entry.
+    """
+    country_code = int(country_code or settings.DND_DEFAULT_COUNTRY_CODE)
+    digits = [str(number).translate(_STRIP) for number in numbers]
+    try:
+        keys = np.array(digits, dtype=np.str_).astype(np.uint64) if digits else np.zeros(0, dtype=np.uint64)
+    except (ValueError, OverflowError):
+        keys = np.array(
+            [int(d) if d.isdigit() and len(d) <= 15 else 0 for d in digits],
+            dtype=np.uint64
+        )
+    national = (keys >= 10 ** 9) & (keys < 10 ** 10)
+    keys[national] += np.uint64(country_code * 10 ** 10)
+    return keys
+
+
+def _bloom_positions(keys: np.ndarray, num_bits: int, num_hashes: int) -> Iterator[np.ndarray]:
+    """Bit positions of each key, one array per hash function"""
+    with np.errstate(over="ignore"):
+        h1 = keys * _H1
+        h2 = (keys * _H2) | np.uint64(1)
+        for i in range(num_hashes):
+            yield (h1 + np.uint64(i) * h2) % np.uint64(num_bits)
+
+
+class _Snapshot(NamedTuple):
+    """One loaded generation; lookups read the array and Bloom filter from the same one"""
+    generation: int
+    numbers: np.ndarray
+    bloom: Optional[np.ndarray]
+    bloom_view: Optional[memoryview]
+    bloom_bits: int
+    bloom_hashes: int
+
+
+_EMPTY = _Snapshot(0, np.zeros(0, dtype=np.uint64), None, None, 0, 0)
+
+
+class DNDRegistry:
+    """
+    Do-not-call registry for pre-dial scrubbing
+
+    Numbers are stored once per generation as a sorted, de-duplicated
+    uint64 array (numbers.npy, 8 bytes per number) and memory-mapped, so
+    tens of millions of entries cost page cache rather than Python heap.
+    Membership is a binary search; bulk checks sort the campaign list
+    first so the searches walk the array in order.
+
+    An optional Bloom filter (bloom.npy, DND_BLOOM_BITS_PER_NUMBER bits
+    per number) answers most negatives without touching the array.
+
+    Full loads and daily deltas both write a new generation directory and
+    switch the `dnd.json` pointer atomically. A loaded generation is one
+    immutable snapshot swapped in with a single assignment, so a lookup
+    never mixes the array of one generation with the Bloom filter of
+    another. Processes that did not write the delta (the API server)
+    pick it up by polling the pointer every DND_RELOAD_INTERVAL_SECONDS
+    (start()/stop()).
+    """
+
+    def __init__(self, directory: str = None, bloom: bool = None, bloom_bits_per_number: int = None):
+        self.directory = directory or settings.DND_REGISTRY_DIR
+        self.use_bloom = settings.DND_BLOOM_FILTER if bloom is None else bloom
+        self.bloom_bits_per_number = bloom_bits_per_number or settings.DND_BLOOM_BITS_PER_NUMBER
+
+        self._snapshot = _EMPTY
+        self._write_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._snapshot.numbers)
+
+    @property
+    def numbers(self) -> np.ndarray:
+        return self._snapshot.numbers
+
+    @property
+    def bloom(self) -> Optional[np.ndarray]:
+        return self._snapshot.bloom
+
+    @property
+    def bloom_bits(self) -> int:
+        return self._snapshot.bloom_bits
+
+    @property
+    def bloom_hashes(self) -> int:
+        return self._snapshot.bloom_hashes
+
+    @property
+    def generation(self) -> int:
+        return self._snapshot.generation
+
+    # ==================== LOAD ====================
+
+    def _read_pointer(self) -> Optional[Dict[str, Any]]:
+        pointer = os.path.join(self.directory, POINTER_FILE)
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self) -> "DNDRegistry":
+        """Memory-map the current generation (a missing registry loads as empty)"""
+        with self._load_lock:
+            meta = self._read_pointer()
+            if meta is None:
+                return self
+            self._load_generation(meta)
+        return self
+
+    def reload_if_changed(self) -> bool:
+        """Load the current generation if another process switched the pointer"""
+        with self._load_lock:
+            meta = self._read_pointer()
+            if meta is None or meta["generation"] == self.generation:
+                return False
+            self._load_generation(meta)
+        return True
+
+    def _load_generation(self, meta: Dict[str, Any]):
+        path = os.path.join(self.directory, f"dnd-{meta['generation']}")
+        numbers = np.load(os.path.join(path, "numbers.npy"), mmap_mode="r")
+        bloom = None
+        if meta.get("bloom_bits") and self.use_bloom:
+            bloom = np.load(os.path.join(path, "bloom.npy"))
+        self._snapshot = _Snapshot(
+            meta["generation"], numbers, bloom, None if bloom is None else memoryview(bloom),
+            meta.get("bloom_bits", 0) if bloom is not None else 0, meta.get("bloom_hashes", 0) if bloom is not None else 0
+        )
+        logger.info(f"📵 DND registry loaded: {len(numbers):,} numbers (generation {meta['generation']})")
+
+    # ==================== RELOAD ====================
+
+    async def start(self):
+        """Poll the pointer for generations written by other processes"""
+        if settings.DND_RELOAD_INTERVAL_SECONDS > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.DND_RELOAD_INTERVAL_SECONDS)
+            try:
+                # Reading the Bloom filter is file I/O; keep it off the loop
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as e:
+                # E.g. the generation was replaced again while loading; retried next poll
+                logger.warning(f"⚠️ DND registry reload failed: {str(e)}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ==================== BUILD ====================
+
+    def load_full(self, paths: List[str]) -> Dict[str, Any]:
+        """Replace the registry with the numbers in full scrub files"""
+        keys = self._read_keys(paths)
+        with self._write_lock:
+            self._write(keys)
+        return {"generation": self.generation, "numbers": len(keys)}
+
+    def apply_delta(self, added: Optional[List[str]] = None, removed: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Merge a daily delta (new registrations and deregistrations)
+
+        Args:
+            added: Paths of files with numbers to add
+            removed: Paths of files with numbers to remove
+
+        Returns:
+            Generation and counts
+        """
+        add = self._read_keys(added or [])
+        remove = self._read_keys(removed or [])
+
+        with self._write_lock:
+            current = np.asarray(self.numbers)
+            # Both sides are sorted: locate with binary search, merge in one pass
+            positions = np.searchsorted(current, add)
+            known = self._found(current, positions, add)
+            add, positions = add[~known], positions[~known]
+            merged = np.insert(current, positions, add)
+
+            positions = np.searchsorted(merged, remove)
+            merged = np.delete(merged, positions[self._found(merged, positions, remove)])
+            removed_count = len(current) + len(add) - len(merged)
+            self._write(merged)
+        return {"generation": self.generation, "numbers": len(merged), "added": len(add), "removed": removed_count}
+
+    @staticmethod
+    def _found(numbers: np.ndarray, positions: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        """Which keys sit at their searchsorted positions"""
+        if not len(numbers):
+            return np.zeros(len(keys), dtype=bool)
+        return numbers[np.minimum(positions, len(numbers) - 1)] == keys
+
+    def _read_keys(self, paths: List[str]) -> np.ndarray:
+        blocks = [block for path in paths for block in self._read_file(path)]
+        keys = np.unique(np.concatenate(blocks)) if blocks else np.zeros(0, dtype=np.uint64)
+        return keys[keys > 0]
+
+    @staticmethod
+    def _read_file(path: str) -> Iterator[np.ndarray]:
+        """Parse a scrub file (one number per line, first CSV column) in blocks"""
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            block = []
+            for line in f:
+                block.append(line.split(",", 1)[0].strip())
+                if len(block) >= PARSE_BLOCK_LINES:
+                    yield encode_numbers(block)
+                    block = []
+            if block:
+                yield encode_numbers(block)
+
+    def _write(self, keys: np.ndarray):
+        generation = self.generation + 1
+        path = os.path.join(self.directory, f"dnd-{generation}")
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+        np.save(os.path.join(path, "numbers.npy"), keys.astype(np.uint64))
+        meta = {"generation": generation, "count": int(len(keys)), "bloom_bits": 0, "bloom_hashes": 0}
+        if self.use_bloom and len(keys):
+            bloom, meta["bloom_bits"], meta["bloom_hashes"] = self._build_bloom(keys)
+            np.save(os.path.join(path, "bloom.npy"), bloom)
+
+        pointer = os.path.join(self.directory, POINTER_FILE)
+        with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(pointer + ".tmp", pointer)
+
+        previous = self.generation
+        self.load()
+        if previous:
+            shutil.rmtree(os.path.join(self.directory, f"dnd-{previous}"), ignore_errors=True)
+
+    def _build_bloom(self, keys: np.ndarray):
+        num_bits = max(64, len(keys) * self.bloom_bits_per_number)
+        num_bits += -num_bits % 8
+        num_hashes = max(1, round(self.bloom_bits_per_number * 0.693))
+        bits = np.zeros(num_bits, dtype=bool)
+        for start in range(0, len(keys), PARSE_BLOCK_LINES):
+            for positions in _bloom_positions(keys[start:start + PARSE_BLOCK_LINES], num_bits, num_hashes):
+                bits[positions] = True
+        return np.packbits(bits, bitorder="little"), num_bits, num_hashes
+
+    # ==================== LOOKUP ====================
+
+    @staticmethod
+    def _maybe_present(snapshot: _Snapshot, keys: np.ndarray) -> np.ndarray:
+        bloom, num_bits, num_hashes = snapshot.bloom, snapshot.bloom_bits, snapshot.bloom_hashes
+        if bloom is None:
+            return np.ones(len(keys), dtype=bool)
+        present = np.ones(len(keys), dtype=bool)
+        for positions in _bloom_positions(keys, num_bits, num_hashes):
+            present &= ((bloom[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1).astype(bool)
+        return present
+
+    def contains_keys(self, keys: np.ndarray) -> np.ndarray:
+        """Membership of encoded keys"""
+        snapshot = self._snapshot
+        numbers = snapshot.numbers
+        result = np.zeros(len(keys), dtype=bool)
+        if not len(numbers) or not len(keys):
+            return result
+
+        candidates = np.flatnonzero(self._maybe_present(snapshot, keys))
+        order = candidates[np.argsort(keys[candidates], kind="stable")]
+        sorted_keys = keys[order]
+        result[order] = self._found(numbers, np.searchsorted(numbers, sorted_keys), sorted_keys)
+        return result
+
+    def contains_many(self, numbers: List[str]) -> np.ndarray:
+        """
+        Bulk DND check for a campaign list
+
+        Args:
+            numbers: Phone numbers
+
+        Returns:
+            Boolean array, True where the number is on the registry
+        """
+        return self.contains_keys(encode_numbers(numbers))
+
+    def contains(self, number: str) -> bool:
+        """Check one number"""
+        key = encode_number(number)
+        snapshot = self._snapshot
+        numbers, bits = snapshot.numbers, snapshot.bloom_view
+        if not key or not len(numbers):
+            return False
+
+        if bits is not None:
+            # Same double hashing as _bloom_positions, on Python ints
+            num_bits = snapshot.bloom_bits
+            h1 = (key * int(_H1)) & _MASK
+            h2 = ((key * int(_H2)) & _MASK) | 1
+            for i in range(snapshot.bloom_hashes):
+                position = ((h1 + i * h2) & _MASK) % num_bits
+                if not (bits[position >> 3] >> (position & 7)) & 1:
+                    return False
+
+        index = int(numbers.searchsorted(np.uint64(key)))
+        return index < len(numbers) and int(numbers[index]) == key
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "numbers": len(snapshot.numbers),
+            "generation": snapshot.generation,
+            "array_bytes": int(snapshot.numbers.nbytes),
+            "bloom_bytes": 0 if snapshot.bloom is None else int(snapshot.bloom.nbytes),
+            "bloom_hashes": snapshot.bloom_hashes
+        }
+
+
+# Global instance
+dnd_registry = DNDRegistry()
+
+
+# Export
+__all__ = ["DNDRegistry", "dnd_registry", "encode_number", "encode_numbers"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load national DND scrub files into the registry")
+    commands = parser.add_subparsers(dest="command", required=True)
+    full = commands.add_parser("full", help="Replace the registry with full scrub files")
+    full.add_argument("paths", nargs="+")
+    delta = commands.add_parser("delta", help="Apply a daily delta")
+    delta.add_argument("--add", nargs="*", default=[], help="Files of newly registered numbers")
+    delta.add_argument("--remove", nargs="*", default=[], help="Files of deregistered numbers")
+    args = parser.parse_args()
+
+    from app.core.logging import setup_logging
+
+    setup_logging()
+    dnd_registry.load()
+    if args.command == "full":
+        result = dnd_registry.load_full(args.paths)
+    else:
+        result = dnd_registry.apply_delta(args.add, args.remove)
+    print(json.dumps(result, indent=2))
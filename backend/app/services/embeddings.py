@@ -0,0 +1,140 @@
+"""
+Embedding Service
+Local text embeddings for semantic caching and retrieval
+"""
+
+import zlib
+import numpy as np
+from typing import List
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.intent_classifier import normalize_utterance
+
+
+# Function words that only add noise to near-duplicate detection
+STOPWORDS = frozenset("""
+a an the is are was be am i me my mine you your it its this that of to in on at for
+with from and or can could would should do does did please kindly tell sir madam ji
+hai ka ki ke ko mera meri mujhe
+है का की के को मेरा मेरी मुझे
+""".split())
+
+
+class HashingEmbedder:
+    """
+    Feature-hashing embedder over words and character trigrams
+
+    Needs no model download and embeds in microseconds, which suits
+    near-duplicate detection (cached questions, rephrasings). Vectors are
+    L2-normalized float32, so cosine similarity is a dot product.
+    """
+
+    def __init__(self, dimension: int = None):
+        self.dimension = dimension or settings.EMBEDDING_DIMENSION
+        self.name = f"hashing-{self.dimension}"
+
+    def _features(self, text: str) -> List[int]:
+        """Signed hashed feature ids for a text"""
+        features = []
+        for word in normalize_utterance(text).split(" "):
+            if not word or word in STOPWORDS:
+                continue
+            features.append(zlib.crc32(word.encode("utf-8")))
+            padded = f"<{word}>"
+            for i in range(len(padded) - 2):
+                features.append(zlib.crc32(padded[i:i + 3].encode("utf-8")))
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            (len(texts), dimension) float32 matrix of unit vectors
+        """
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(self._features(text), dtype=np.uint32)
+            if hashes.size == 0:
+                continue
+            # Low bits pick the bucket, top bit picks the sign
+            signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix[row], hashes % self.dimension, signs)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def embed_one(self, text: str) -> np.ndarray:
+        """Embed a single text"""
+        return self.embed([text])[0]
+
+
+class SentenceTransformerEmbedder:
+    """
+    Dense embeddings from a sentence-transformers model (EMBEDDING_MODEL)
+
+    Better semantic recall than feature hashing for retrieval, at the cost
+    of a model download and milliseconds per query. The package is
+    optional and imported on first use.
+    """
+
+    def __init__(self, model_name: str = None):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name or settings.EMBEDDING_MODEL
+        self.model = SentenceTransformer(self.name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts as (len(texts), dimension) float32 unit vectors"""
+        vectors = self.model.encode(
+            texts,
+            batch_size=64,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return vectors.astype(np.float32, copy=False)
+
+    def embed_one(self, text: str) -> np.ndarray:
+        """Embed a single text"""
+        return self.embed([text])[0]
+
+
+def create_embedder(provider: str = None):
+    """
+    Create the embedder for a provider name
+
+    Args:
+        provider: "hashing" or "sentence_transformers"
+
+    Returns:
+        Embedder with embed(), embed_one() and dimension
+    """
+    provider = provider or settings.EMBEDDING_PROVIDER
+    if provider == "sentence_transformers":
+        try:
+            return SentenceTransformerEmbedder()
+        except Exception as e:
+            logger.warning(f"⚠️ sentence-transformers unavailable ({str(e)}), using hashing embeddings")
+    return HashingEmbedder()
+
+
+# Create singleton instances
+embedder = HashingEmbedder()  # Near-duplicate detection (response cache)
+retrieval_embedder = create_embedder()  # Knowledge base retrieval
+
+
+# Export
+__all__ = [
+    "embedder",
+    "retrieval_embedder",
+    "create_embedder",
+    "HashingEmbedder",
+    "SentenceTransformerEmbedder"
+]
@@ -3,27 +3,71 @@ Groq LLM Service
 Open-source LLM integration for BFSI AI
 """
 
-from groq import Groq
-from typing import Optional, Dict, Any, List
+from groq import AsyncGroq
+from typing import Optional, Dict, Any, List, AsyncIterator
+import asyncio
+import httpx
+import json
+import re
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import provider_call
+from app.core.tokens import estimate_message_tokens
+from app.services.intent_batcher import IntentBatcher
+from app.services.intent_classifier import intent_classifier
+
+
+# Sentence terminators (Latin and Devanagari danda) followed by whitespace,
+# or a line break. Requiring whitespace keeps amounts like "₹5.50" intact.
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?।॥])\s+|\n+')
 
 
 class GroqService:
     """Groq LLM service for natural language understanding"""
     
     def __init__(self):
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
+        # Shared keep-alive pool for every completion made by this worker
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.GROQ_POOL_CONNECTIONS,
+                max_keepalive_connections=settings.GROQ_POOL_CONNECTIONS
+            ),
+            timeout=settings.GROQ_TIMEOUT_SECONDS
+        )
+        # The SDK retries 408/409/429/5xx and connection errors with
+        # exponential backoff, honouring Retry-After
+        self.client = AsyncGroq(
+            api_key=settings.GROQ_API_KEY,
+            base_url=settings.GROQ_BASE_URL or None,
+            timeout=settings.GROQ_TIMEOUT_SECONDS,
+            max_retries=settings.GROQ_MAX_RETRIES,
+            http_client=self.http_client
+        )
         self.model = settings.GROQ_MODEL
         self.temperature = settings.GROQ_TEMPERATURE
         self.max_tokens = settings.GROQ_MAX_TOKENS
+        
+        # Caps in-flight completions so bursts queue here instead of at Groq
+        self._semaphore = asyncio.Semaphore(settings.GROQ_MAX_CONCURRENCY)
+        
+        # Coalesces concurrent LLM-tier intent classifications
+        self.intent_batcher = IntentBatcher(
+            classify_batch=self._classify_intent_batch,
+            classify_single=self._classify_intent_single,
+            token_savings=self._estimate_batch_token_savings
+        )
+    
+    async def aclose(self):
+        """Close pooled connections"""
+        await self.client.close()
     
     async def generate_response(
         self,
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
-        json_mode: bool = False
+        json_mode: bool = False,
+        timeout: Optional[float] = None
     ) -> str:
         """
         Generate response from Groq LLM
@@ -33,18 +77,22 @@ class GroqService:
             temperature: Sampling temperature (0-2)
             max_tokens: Maximum tokens to generate
             json_mode: Enable JSON response mode
+            timeout: Per-request timeout in seconds (default: GROQ_TIMEOUT_SECONDS)
         
         Returns:
             Generated response text
         """
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature or self.temperature,
-                max_tokens=max_tokens or self.max_tokens,
-                response_format={"type": "json_object"} if json_mode else {"type": "text"}
-            )
+            async with self._semaphore:
+                with provider_call("groq", "llm"):
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temperature or self.temperature,
+                        max_tokens=max_tokens or self.max_tokens,
+                        response_format={"type": "json_object"} if json_mode else {"type": "text"},
+                        timeout=timeout or settings.GROQ_TIMEOUT_SECONDS
+                    )
             
             content = response.choices[0].message.content
             logger.info(f"✅ Groq response generated ({len(content)} chars)")
@@ -55,6 +103,53 @@ class GroqService:
             logger.error(f"❌ Groq API error: {str(e)}")
             raise
     
+    async def stream_response(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream response tokens from Groq LLM as they are generated
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            temperature: Sampling temperature (0-2)
+            max_tokens: Maximum tokens to generate
+            timeout: Per-request timeout in seconds (default: GROQ_TIMEOUT_SECONDS)
+        
+        Yields:
+            Content deltas in generation order
+        """
+        try:
+            total_chars = 0
+            async with self._semaphore:
+                with provider_call("groq", "llm_stream"):
+                    stream = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temperature or self.temperature,
+                        max_tokens=max_tokens or self.max_tokens,
+                        stream=True,
+                        timeout=timeout or settings.GROQ_TIMEOUT_SECONDS
+                    )
+                    
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            total_chars += len(delta)
+                            yield delta
+            
+            logger.info(f"✅ Groq stream completed ({total_chars} chars)")
+            
+        except Exception as e:
+            logger.error(f"❌ Groq streaming error: {str(e)}")
+            raise
+    
     async def classify_intent(self, user_message: str, sector: str = "banking") -> Dict[str, Any]:
         """
         Classify user intent for BFSI queries
@@ -66,24 +161,89 @@ class GroqService:
         Returns:
             Intent classification with confidence
         """
-        system_prompt = self._get_intent_classification_prompt(sector)
+        # Tier 1: recent-result cache and local keyword matcher
+        if settings.INTENT_FAST_PATH_ENABLED:
+            result = intent_classifier.classify_local(user_message, sector)
+            if result is not None:
+                return result
         
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_message}
-        ]
+        # Tier 2: LLM for low-confidence utterances
+        if settings.INTENT_BATCHING_ENABLED:
+            result = await self.intent_batcher.classify(user_message, sector)
+        else:
+            result = await self._classify_intent_single(user_message, sector)
+        
+        if settings.INTENT_FAST_PATH_ENABLED:
+            intent_classifier.remember(user_message, sector, result)
+        
+        return result
+    
+    async def _classify_intent_single(self, user_message: str, sector: str) -> Dict[str, Any]:
+        """Classify one message with its own LLM call"""
+        messages = self._build_intent_messages(user_message, sector)
         
         response = await self.generate_response(messages, json_mode=True)
         
-        import json
         return json.loads(response)
     
+    async def _classify_intent_batch(self, sector: str, user_messages: List[str]) -> Dict[int, Dict[str, Any]]:
+        """
+        Classify several messages with one LLM call
+        
+        Args:
+            sector: BFSI sector shared by the batch
+            user_messages: Messages to classify
+        
+        Returns:
+            Classifications keyed by message index; indices missing from
+            the model output are omitted
+        
+        Raises:
+            ValueError: If the response is not the expected JSON shape
+        """
+        messages = self._build_intent_batch_messages(sector, user_messages)
+        
+        response = await self.generate_response(messages, json_mode=True)
+        
+        results = {}
+        for item in json.loads(response)["results"]:
+            index = item.pop("id")
+            if isinstance(index, int) and 0 <= index < len(user_messages) and "intent" in item:
+                results[index] = item
+        
+        return results
+    
+    def _build_intent_messages(self, user_message: str, sector: str) -> List[Dict[str, str]]:
+        """Build chat messages for a single intent classification"""
+        return [
+            {"role": "system", "content": self._get_intent_classification_prompt(sector)},
+            {"role": "user", "content": user_message}
+        ]
+    
+    def _build_intent_batch_messages(self, sector: str, user_messages: List[str]) -> List[Dict[str, str]]:
+        """Build chat messages for a batched intent classification"""
+        batch = [{"id": index, "text": text} for index, text in enumerate(user_messages)]
+        return [
+            {"role": "system", "content": self._get_batch_intent_classification_prompt(sector)},
+            {"role": "user", "content": json.dumps(batch, ensure_ascii=False)}
+        ]
+    
+    def _estimate_batch_token_savings(self, sector: str, user_messages: List[str]) -> int:
+        """Prompt tokens saved by one batched call versus one call per message"""
+        single = sum(
+            estimate_message_tokens(self._build_intent_messages(text, sector))
+            for text in user_messages
+        )
+        batched = estimate_message_tokens(self._build_intent_batch_messages(sector, user_messages))
+        return single - batched
+    
     async def generate_bfsi_response(
         self,
         user_query: str,
         context: str,
         sector: str = "banking",
-        language: str = "en"
+        language: str = "en",
+        history: Optional[List[Dict[str, str]]] = None
     ) -> str:
         """
         Generate BFSI-safe response using RAG context
@@ -93,10 +253,68 @@ class GroqService:
             context: Retrieved context from RAG
             sector: BFSI sector
             language: Response language
+            history: Prior conversation messages (see ConversationMemory)
         
         Returns:
             Generated response
         """
+        messages = self._build_bfsi_messages(user_query, context, sector, language, history)
+        
+        response = await self.generate_response(messages)
+        return response
+    
+    async def stream_bfsi_response(
+        self,
+        user_query: str,
+        context: str,
+        sector: str = "banking",
+        language: str = "en",
+        history: Optional[List[Dict[str, str]]] = None,
+        min_sentence_chars: int = 20
+    ) -> AsyncIterator[str]:
+        """
+        Stream a BFSI-safe response one sentence at a time
+        
+        Args:
+            user_query: User's question
+            context: Retrieved context from RAG
+            sector: BFSI sector
+            language: Response language
+            history: Prior conversation messages (see ConversationMemory)
+            min_sentence_chars: Shorter fragments are merged into the next sentence
+        
+        Yields:
+            Complete sentences as soon as the LLM finishes each one
+        """
+        messages = self._build_bfsi_messages(user_query, context, sector, language, history)
+        
+        buffer = ""
+        async for token in self.stream_response(messages):
+            buffer += token
+            
+            # Cut every complete sentence out of the buffer
+            while True:
+                match = SENTENCE_BOUNDARY.search(buffer, min_sentence_chars)
+                if not match:
+                    break
+                sentence = buffer[:match.start()].strip()
+                buffer = buffer[match.end():]
+                if sentence:
+                    yield sentence
+        
+        # Flush the trailing sentence (may lack a terminator)
+        if buffer.strip():
+            yield buffer.strip()
+    
+    def _build_bfsi_messages(
+        self,
+        user_query: str,
+        context: str,
+        sector: str,
+        language: str,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> List[Dict[str, str]]:
+        """Build chat messages for a BFSI response"""
         system_prompt = self._get_bfsi_response_prompt(sector, language)
         
         if context:
@@ -117,13 +335,39 @@ Generate a helpful, accurate response based on your general knowledge of {sector
 Be professional and concise.
 """
         
-        messages = [
+        return [
             {"role": "system", "content": system_prompt},
+            *(history or []),
             {"role": "user", "content": user_prompt}
         ]
+    
+    async def summarize_conversation(
+        self,
+        previous_summary: str,
+        messages: List[Dict[str, str]]
+    ) -> str:
+        """
+        Fold older conversation turns into a rolling summary
         
-        response = await self.generate_response(messages)
-        return response
+        Args:
+            previous_summary: Summary so far (may be empty)
+            messages: Turns to add, oldest first
+        
+        Returns:
+            Updated summary
+        """
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        
+        prompt_messages = [
+            {"role": "system", "content": self._get_summary_prompt()},
+            {"role": "user", "content": f"Current summary:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}"}
+        ]
+        
+        return await self.generate_response(
+            prompt_messages,
+            temperature=0.1,
+            max_tokens=settings.CONVERSATION_SUMMARY_TOKEN_BUDGET
+        )
     
     def _get_intent_classification_prompt(self, sector: str) -> str:
         """Get system prompt for intent classification"""
@@ -139,6 +383,11 @@ Classify the user's intent into one of these categories:
 - complaint: User has a complaint or issue
 - general_query: General questions about products/services
 - escalation: User wants to speak to human agent
+- affirmation: User agrees or confirms (yes, okay)
+- denial: User declines or disagrees (no, not interested)
+- already_paid: User says the payment has already been made
+- callback_request: User asks to be called later
+- opt_out: User asks not to be called or contacted again
 
 Return JSON with:
 {{
@@ -150,6 +399,28 @@ Return JSON with:
 
 Be accurate and conservative. If unsure, set requires_human to true."""
     
+    def _get_batch_intent_classification_prompt(self, sector: str) -> str:
+        """Get system prompt for batched intent classification"""
+        return self._get_intent_classification_prompt(sector) + """
+
+BATCH MODE:
+The user message is a JSON array of objects with "id" and "text".
+Classify each text independently and return JSON with one result per id:
+{
+    "results": [
+        {"id": 0, "intent": "category_name", "confidence": 0.0-1.0, "entities": {}, "requires_human": true/false}
+    ]
+}"""
+    
+    def _get_summary_prompt(self) -> str:
+        """Get system prompt for conversation compaction"""
+        return """You maintain a running summary of a customer service conversation.
+
+Merge the new turns into the current summary. Keep facts the agent needs later:
+customer requests, products mentioned, amounts, dates, commitments and unresolved issues.
+Drop greetings and small talk. Never include passwords, PINs, CVV or full account numbers.
+Reply with the updated summary only, in a few short sentences."""
+    
     def _get_bfsi_response_prompt(self, sector: str, language: str) -> str:
         """Get system prompt for BFSI response generation"""
         lang_instruction = ""
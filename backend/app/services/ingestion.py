@@ -0,0 +1,450 @@
+"""
+Knowledge Base Ingestion
+Streams documents into the vector index: load, chunk, sanitize, embed, append
+
+Usage (from backend/):
+    python -m app.services.ingestion data/knowledge_base --sector banking
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.security import sanitize_many_for_embedding
+from app.core.tokens import estimate_tokens
+
+
+SUPPORTED_EXTENSIONS = (".txt", ".md", ".pdf", ".json")
+MANIFEST_FILE = "manifest.jsonl"
+
+# Sentence ends (Latin and Devanagari danda) and paragraph breaks
+CHUNK_BOUNDARY = re.compile(r'(?<=[.!?।॥])\s+|\n\s*\n')
+
+# One lock per index directory, shared by every pipeline in the process:
+# ingests into the same index must not interleave manifest and index writes
+_index_locks: Dict[str, threading.Lock] = {}
+_index_locks_guard = threading.Lock()
+
+
+def _index_lock(directory: str) -> threading.Lock:
+    with _index_locks_guard:
+        return _index_locks.setdefault(os.path.abspath(directory), threading.Lock())
+
+
+# ==================== LOADING ====================
+
+def iter_files(paths: List[str]) -> Iterator[str]:
+    """Yield supported files under the given files/directories, in sorted order"""
+    for path in paths:
+        if os.path.isfile(path):
+            if path.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield os.path.abspath(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    yield os.path.abspath(os.path.join(root, name))
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_pages(path: str, sector: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the pages of a document
+
+    Text and Markdown files split pages on form feeds; PDFs yield one page
+    per PDF page (needs pypdf); JSON files hold FAQs, either a list or
+    {"faqs": [...]} of {"question", "answer", "sector"?} objects, one page
+    each.
+
+    Args:
+        path: Document path
+        sector: Sector for pages that do not declare one
+
+    Yields:
+        {"page", "text", "sector"} dicts
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in (".txt", ".md"):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for number, text in enumerate(f.read().split("\f"), 1):
+                yield {"page": number, "text": text, "sector": sector}
+
+    elif extension == ".pdf":
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            raise ImportError("PDF ingestion needs pypdf (pip install pypdf)")
+        for number, page in enumerate(PdfReader(path).pages, 1):
+            yield {"page": number, "text": page.extract_text() or "", "sector": sector}
+
+    elif extension == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        faqs = data.get("faqs", []) if isinstance(data, dict) else data
+        for number, faq in enumerate(faqs, 1):
+            yield {
+                "page": number,
+                "text": f"Q: {faq['question']}\nA: {faq['answer']}",
+                "sector": faq.get("sector", sector)
+            }
+
+
+# ==================== CHUNKING ====================
+
+def _split_long(text: str, max_tokens: int) -> List[str]:
+    """Split a unit with no sentence boundary into word runs of max_tokens"""
+    pieces, current = [], []
+    for word in text.split():
+        current.append(word)
+        if estimate_tokens(" ".join(current)) >= max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int = None, overlap_tokens: int = None) -> List[str]:
+    """
+    Split text into chunks of at most `max_tokens` estimated tokens
+
+    Chunks end on sentence or paragraph boundaries; each chunk repeats the
+    trailing sentences of the previous one (up to `overlap_tokens`) so an
+    answer spanning a boundary is still retrievable.
+
+    Args:
+        text: Page text
+        max_tokens: Chunk size budget
+        overlap_tokens: Overlap budget
+
+    Returns:
+        Chunk strings
+    """
+    max_tokens = max_tokens or settings.INGESTION_CHUNK_TOKENS
+    overlap_tokens = settings.INGESTION_CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+
+    units = []
+    for unit in CHUNK_BOUNDARY.split(text):
+        unit = " ".join(unit.split())
+        if not unit:
+            continue
+        if estimate_tokens(unit) > max_tokens:
+            units.extend(_split_long(unit, max_tokens))
+        else:
+            units.append(unit)
+
+    chunks = []
+    current: List[Tuple[str, int]] = []
+    current_tokens = 0
+
+    for unit in units:
+        tokens = estimate_tokens(unit)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(" ".join(u for u, _ in current))
+            # Carry the tail of the chunk over as overlap
+            overlap, overlap_size = [], 0
+            for u, t in reversed(current):
+                if overlap_size + t > overlap_tokens or overlap_size + t + tokens > max_tokens:
+                    break
+                overlap.insert(0, (u, t))
+                overlap_size += t
+            current, current_tokens = overlap, overlap_size
+        current.append((unit, tokens))
+        current_tokens += tokens
+
+    if current:
+        chunks.append(" ".join(u for u, _ in current))
+    return chunks
+
+
+def chunk_hash(sector: Optional[str], text: str) -> str:
+    """Content hash identifying a sanitized chunk"""
+    return hashlib.sha256(f"{sector or ''}\0{text}".encode("utf-8")).hexdigest()[:32]
+
+
+def _sanitize_batch(texts: List[str]) -> List[str]:
+    """Process pool task: strip PII before text reaches the embedder"""
+    return sanitize_many_for_embedding(texts)
+
+
+# ==================== PIPELINE ====================
+
+class IngestionPipeline:
+    """
+    Incremental, pipelined ingestion into a VectorIndex
+
+    Files are streamed one at a time and their chunks are grouped into
+    batches of `batch_size`. Each batch is sanitized in a process pool
+    (regex PII masking is CPU-bound) while the previous batch is embedded
+    and appended to the index, so both stages stay busy.
+
+    A manifest (append-only JSON lines in the index directory) records each
+    source's file hash and chunk content hashes. Unchanged files are
+    skipped without parsing; for changed files only chunks with new hashes
+    are embedded, and rows of chunks that disappeared are tombstoned.
+    When ingesting into the served index, the BM25 index is rebuilt after
+    any change.
+    """
+
+    def __init__(
+        self,
+        index=None,
+        embedder=None,
+        workers: int = None,
+        batch_size: int = None
+    ):
+        self.rag = None
+        if index is None or embedder is None:
+            from app.services.rag_service import rag_service
+            # Ingesting into the served index also keeps its BM25 index current
+            self.rag = rag_service if index is None else None
+            index = rag_service.index if index is None else index
+            embedder = rag_service.embedder if embedder is None else embedder
+        self.index = index
+        self.embedder = embedder
+        self.workers = workers or settings.INGESTION_WORKERS or os.cpu_count() or 1
+        self.batch_size = batch_size or settings.INGESTION_BATCH_SIZE
+        self._lock = _index_lock(index.directory)
+
+    # ==================== MANIFEST ====================
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.index.directory, MANIFEST_FILE)
+
+    def _load_manifest(self) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        """Latest entry per source (later lines win) and the line count"""
+        manifest = {}
+        lines = 0
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    entry = json.loads(line)
+                    if entry.get("deleted"):
+                        manifest.pop(entry["source"], None)
+                    else:
+                        manifest[entry["source"]] = entry
+        return manifest, lines
+
+    def _append_manifest(self, entries: List[Dict[str, Any]]):
+        os.makedirs(self.index.directory, exist_ok=True)
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+
+    def _compact_manifest(self, manifest: Dict[str, Dict[str, Any]]):
+        """Rewrite the manifest with one line per live source"""
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in manifest.values()))
+        os.replace(temp_path, self.manifest_path)
+
+    # ==================== INGESTION ====================
+
+    def ingest(self, paths: List[str], sector: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Ingest files and directories into the index
+
+        Args:
+            paths: Files or directories to ingest
+            sector: Sector for documents that do not declare one
+            force: Re-process files even if unchanged
+
+        Returns:
+            Ingestion statistics
+        """
+        with self._lock:
+            start = time.perf_counter()
+            manifest, manifest_lines = self._load_manifest()
+            stats = {
+                "files": 0, "files_unchanged": 0, "files_failed": 0, "files_removed": 0,
+                "pages": 0, "chunks": 0, "embedded": 0, "reused": 0, "deleted": 0
+            }
+            seen = set()
+
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                in_flight = None
+                batch: List[Dict[str, Any]] = []
+                batch_chunks = 0
+
+                for path in iter_files(paths):
+                    seen.add(path)
+                    digest = file_hash(path)
+                    previous = manifest.get(path)
+                    if previous and previous["file_hash"] == digest and not force:
+                        stats["files_unchanged"] += 1
+                        continue
+
+                    try:
+                        items = [
+                            (page["page"], page["sector"], chunk)
+                            for page in self._count_pages(iter_pages(path, sector), stats)
+                            for chunk in chunk_text(page["text"])
+                        ]
+                    except Exception as e:
+                        logger.warning(f"⚠️ Skipping {path}: {str(e)}")
+                        stats["files_failed"] += 1
+                        continue
+
+                    stats["files"] += 1
+                    stats["chunks"] += len(items)
+                    batch.append({"source": path, "file_hash": digest, "items": items})
+                    batch_chunks += len(items)
+
+                    if batch_chunks >= self.batch_size:
+                        submitted = self._submit(pool, batch)
+                        if in_flight:
+                            self._commit(in_flight, manifest, stats)
+                        in_flight, batch, batch_chunks = submitted, [], 0
+
+                if batch:
+                    submitted = self._submit(pool, batch)
+                    if in_flight:
+                        self._commit(in_flight, manifest, stats)
+                    in_flight = submitted
+                if in_flight:
+                    self._commit(in_flight, manifest, stats)
+
+            self._remove_missing(paths, seen, manifest, stats)
+            if self.rag is not None and (stats["embedded"] or stats["deleted"] or not len(self.rag.lexical)):
+                self.rag.rebuild_lexical()
+            if manifest_lines > 2 * len(manifest) + 100:
+                self._compact_manifest(manifest)
+
+            elapsed = time.perf_counter() - start
+            stats["seconds"] = round(elapsed, 3)
+            stats["pages_per_second"] = round(stats["pages"] / elapsed, 1) if elapsed else 0.0
+            stats["index_chunks"] = self.index.live_count()
+
+            logger.info(
+                f"📚 Ingested {stats['files']} files ({stats['pages']} pages, {stats['chunks']} chunks) "
+                f"in {elapsed:.1f}s - {stats['pages_per_second']} pages/s, "
+                f"{stats['embedded']} embedded, {stats['reused']} unchanged, {stats['deleted']} deleted"
+            )
+            return stats
+
+    @staticmethod
+    def _count_pages(pages: Iterator[Dict[str, Any]], stats: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        for page in pages:
+            stats["pages"] += 1
+            yield page
+
+    def _submit(self, pool: ProcessPoolExecutor, batch: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Future]]:
+        """Start sanitizing a batch, split evenly across the workers"""
+        texts = [text for source in batch for _, _, text in source["items"]]
+        size = max(1, -(-len(texts) // self.workers))
+        futures = [pool.submit(_sanitize_batch, texts[i:i + size]) for i in range(0, len(texts), size)]
+        return batch, futures
+
+    def _commit(
+        self,
+        in_flight: Tuple[List[Dict[str, Any]], List[Future]],
+        manifest: Dict[str, Dict[str, Any]],
+        stats: Dict[str, Any]
+    ):
+        """Embed new chunks of a sanitized batch, append them and tombstone stale ones"""
+        batch, futures = in_flight
+        sanitized = iter([text for future in futures for text in future.result()])
+
+        records, pending = [], []
+        entries = []
+        stale_rows = []
+        for source in batch:
+            previous = manifest.get(source["source"], {}).get("chunks", {})
+            chunks: Dict[str, int] = {}
+            for page, sector, _ in source["items"]:
+                text = next(sanitized)
+                digest = chunk_hash(sector, text)
+                if digest in chunks:
+                    continue
+                if digest in previous:
+                    chunks[digest] = previous[digest]
+                    stats["reused"] += 1
+                    continue
+                chunks[digest] = -1
+                records.append({
+                    "text": text,
+                    "source": os.path.basename(source["source"]),
+                    "page": page,
+                    "sector": sector,
+                    "hash": digest
+                })
+                pending.append((chunks, digest))
+
+            stale_rows.extend(row for digest, row in previous.items() if digest not in chunks)
+            entries.append({"source": source["source"], "file_hash": source["file_hash"], "chunks": chunks})
+
+        if records:
+            vectors = self.embedder.embed([record["text"] for record in records])
+            rows = self.index.add(vectors, records)
+            for (chunks, digest), row in zip(pending, rows):
+                chunks[digest] = row
+            stats["embedded"] += len(records)
+
+        self.index.delete(stale_rows)
+        stats["deleted"] += len(stale_rows)
+
+        # Recorded only after the rows exist, so a crash re-ingests the batch
+        self._append_manifest(entries)
+        for entry in entries:
+            manifest[entry["source"]] = entry
+
+    def _remove_missing(self, paths: List[str], seen: set, manifest: Dict[str, Dict[str, Any]], stats: Dict[str, Any]):
+        """Tombstone chunks of files deleted from the ingested directories"""
+        roots = [os.path.abspath(path) + os.sep for path in paths if os.path.isdir(path)]
+        removed = [
+            source for source in manifest
+            if source not in seen and any(source.startswith(root) for root in roots)
+        ]
+        if not removed:
+            return
+        rows = [row for source in removed for row in manifest[source]["chunks"].values()]
+        self.index.delete(rows)
+        self._append_manifest([{"source": source, "deleted": True} for source in removed])
+        for source in removed:
+            del manifest[source]
+        stats["files_removed"] += len(removed)
+        stats["deleted"] += len(rows)
+
+
+# Export
+__all__ = ["IngestionPipeline", "iter_files", "iter_pages", "chunk_text", "chunk_hash"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest documents into the BFSI knowledge base")
+    parser.add_argument("paths", nargs="+", help="Files or directories (.txt, .md, .pdf, .json FAQs)")
+    parser.add_argument("--sector", default=None, help="Sector for documents that do not declare one")
+    parser.add_argument("--workers", type=int, default=None, help="Sanitization processes")
+    parser.add_argument("--batch-size", type=int, default=None, help="Chunks per embedding batch")
+    parser.add_argument("--force", action="store_true", help="Re-process unchanged files")
+    parser.add_argument("--build-ivf", action="store_true", help="Rebuild the IVF index afterwards")
+    args = parser.parse_args()
+
+    from app.core.logging import setup_logging
+    from app.services.rag_service import rag_service
+
+    setup_logging()
+    rag_service.load()
+    pipeline = IngestionPipeline(workers=args.workers, batch_size=args.batch_size)
+    result = pipeline.ingest(args.paths, sector=args.sector, force=args.force)
+    if args.build_ivf:
+        rag_service.index.build_ivf()
+    print(json.dumps(result, indent=2))
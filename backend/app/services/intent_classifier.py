@@ -0,0 +1,302 @@
+"""
+Fast-Path Intent Classifier
+Local keyword/trie matcher in front of the Groq intent classifier
+"""
+
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+from app.core.config import settings
+
+
+# ==================== PHRASE TABLES ====================
+
+# intent -> list of (phrase, weight). Phrases are matched on whole tokens
+# after normalization, longest match first. Covers the short replies that
+# dominate reminder campaigns in English, Hindi (Devanagari + romanized)
+# and Tamil.
+INTENT_PHRASES: Dict[str, List[Tuple[str, float]]] = {
+    "affirmation": [
+        ("yes", 0.95), ("yeah", 0.9), ("yep", 0.9), ("ok", 0.9), ("okay", 0.9),
+        ("sure", 0.9), ("correct", 0.9), ("right", 0.85), ("fine", 0.85),
+        ("haan", 0.95), ("haa", 0.9), ("ha", 0.85), ("ji haan", 0.95), ("theek hai", 0.9), ("thik hai", 0.9),
+        ("हाँ", 0.95), ("हां", 0.95), ("जी हाँ", 0.95), ("ठीक है", 0.9),
+        ("ஆமாம்", 0.95), ("சரி", 0.9), ("ஆம்", 0.95),
+    ],
+    "denial": [
+        ("no", 0.95), ("nope", 0.9), ("not interested", 0.9),
+        ("nahi", 0.95), ("nahin", 0.95), ("na", 0.85),
+        ("नहीं", 0.95), ("ना", 0.85),
+        ("இல்லை", 0.95), ("வேண்டாம்", 0.9),
+    ],
+    "already_paid": [
+        ("already paid", 0.97), ("paid already", 0.97), ("have paid", 0.95), ("i paid", 0.93),
+        ("payment done", 0.95), ("payment is done", 0.95), ("already done", 0.9),
+        ("already cleared", 0.93), ("payment made", 0.93),
+        ("pay kar diya", 0.95), ("bhar diya", 0.95), ("payment ho gaya", 0.95), ("jama kar diya", 0.95),
+        ("भुगतान कर दिया", 0.97), ("भर दिया", 0.95), ("जमा कर दिया", 0.95), ("पेमेंट हो गया", 0.95),
+        ("கட்டிவிட்டேன்", 0.97), ("செலுத்திவிட்டேன்", 0.97), ("ஏற்கனவே செலுத்தினேன்", 0.97),
+    ],
+    "callback_request": [
+        ("call me later", 0.97), ("call later", 0.95), ("call back", 0.93), ("call me back", 0.95),
+        ("call tomorrow", 0.93), ("busy", 0.85), ("i am busy", 0.93), ("not now", 0.85), ("later", 0.8),
+        ("baad mein call", 0.95), ("baad me call", 0.95), ("baad mein", 0.85), ("abhi busy", 0.93),
+        ("बाद में कॉल", 0.95), ("बाद में", 0.85), ("अभी व्यस्त", 0.93),
+        ("பிறகு அழைக்கவும்", 0.97), ("பிறகு", 0.8), ("பிஸியாக இருக்கிறேன்", 0.93),
+    ],
+    "payment_reminder": [
+        ("will pay", 0.93), ("i will pay", 0.95), ("pay today", 0.93), ("pay tomorrow", 0.93),
+        ("send payment link", 0.97), ("send link", 0.9), ("payment link", 0.93), ("how to pay", 0.9),
+        ("kar dunga", 0.9), ("kar dungi", 0.9), ("bhar dunga", 0.93), ("link bhejo", 0.93),
+        ("भुगतान कर दूंगा", 0.95), ("भर दूंगा", 0.93), ("लिंक भेजो", 0.93),
+        ("செலுத்துகிறேன்", 0.95), ("கட்டுகிறேன்", 0.95),
+    ],
+    "escalation": [
+        ("talk to agent", 0.97), ("speak to agent", 0.97), ("human", 0.9), ("real person", 0.93),
+        ("customer care", 0.9), ("manager", 0.85), ("agent", 0.85),
+        ("agent se baat", 0.95), ("insaan se baat", 0.95),
+        ("एजेंट से बात", 0.95), ("ग्राहक सेवा", 0.9),
+        ("முகவரிடம் பேச", 0.95), ("வாடிக்கையாளர் சேவை", 0.9),
+    ],
+    "complaint": [
+        ("complaint", 0.93), ("wrong amount", 0.93), ("not my loan", 0.95), ("fraud", 0.93),
+        ("wrong number", 0.95), ("harassment", 0.93),
+        ("shikayat", 0.93), ("galat", 0.85),
+        ("शिकायत", 0.93), ("गलत", 0.85), ("धोखा", 0.93),
+        ("புகார்", 0.93), ("தவறு", 0.85), ("தவறான எண்", 0.95),
+    ],
+    "opt_out": [
+        ("stop calling", 0.97), ("do not call", 0.97), ("dont call", 0.97), ("don't call", 0.97),
+        ("unsubscribe", 0.95), ("remove my number", 0.97),
+        ("call mat karo", 0.97), ("phone mat karo", 0.97),
+        ("कॉल मत करो", 0.97), ("फोन मत करो", 0.97),
+        ("அழைக்க வேண்டாம்", 0.97),
+    ],
+}
+
+# Tokens that carry no intent; ignored when measuring how much of an
+# utterance the matched phrases explain
+FILLER_TOKENS = frozenset("""
+i im i'm am is are was the a an my me it this that have has to for of and
+please sir madam maam ma'am ji bhai hello hi thanks thank you already just
+want number today tomorrow tonight yesterday
+main maine mera meri mujhe hai tha ho gaya karna karo aaj kal parso
+मैं मैंने मेरा मेरी मुझे है था जी आज कल
+நான் என் என்னுடைய ஐயா இன்று நாளை
+""".split())
+
+# Questions and negations outside a matched phrase flip or suspend its
+# meaning ("is it paid", "not paid yet"); such utterances go to the LLM
+OPEN_TOKENS = frozenset("""
+not never didnt didn't havent haven't hasnt hasn't isnt isn't wasnt wasn't dont don't cant can't wont won't
+what why how when where which who whom whether if did does do
+kya kyun kyon kab kaise kaun kahan nahi nahin mat
+क्या क्यों कब कैसे कौन कहाँ नहीं मत
+என்ன ஏன் எப்போது எப்படி யார் எங்கே இல்லை
+""".split())
+
+REQUIRES_HUMAN_INTENTS = frozenset({"escalation", "complaint"})
+
+# Entity extraction runs only on fast-path hits
+ENTITY_PATTERNS = {
+    "amount": re.compile(r'(?:₹|rs\.?|inr)\s*([\d,]+(?:\.\d+)?)', re.IGNORECASE),
+    "when": re.compile(r'\b(today|tomorrow|tonight|next week|aaj|kal|parso)\b|(आज|कल|இன்று|நாளை)', re.IGNORECASE),
+}
+
+# ASCII punctuation plus dandas and curly quotes; Indic combining marks are
+# not \w, so a [^\w] class would shred Devanagari and Tamil words
+_PUNCTUATION = re.compile(r"[!-&(-/:-@\[-`{-~।॥‘’“”]+")
+_WHITESPACE = re.compile(r'\s+')
+_NUMERIC = re.compile(r'^(?:₹|rs)?[\d.]+$')
+
+
+def _is_filler(token: str) -> bool:
+    """Fillers and bare amounts/numbers carry no intent"""
+    return token in FILLER_TOKENS or _NUMERIC.match(token) is not None
+
+
+def normalize_utterance(text: str) -> str:
+    """Normalize an utterance for matching and caching"""
+    text = unicodedata.normalize("NFC", text).casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class FastIntentMatcher:
+    """Token trie over the phrase tables with coverage-based confidence"""
+
+    _TERMINAL = "\0"
+
+    def __init__(self, phrases: Dict[str, List[Tuple[str, float]]] = None):
+        self.trie: Dict[str, Any] = {}
+        for intent, entries in (phrases or INTENT_PHRASES).items():
+            for phrase, weight in entries:
+                node = self.trie
+                for token in normalize_utterance(phrase).split(" "):
+                    node = node.setdefault(token, {})
+                node[self._TERMINAL] = (intent, weight)
+
+    def match(self, text: str, normalized: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Match an utterance against the phrase trie
+
+        Args:
+            text: Raw utterance
+            normalized: Pre-normalized form of `text`, if already computed
+
+        Returns:
+            Classification dict (same shape as the LLM tier) or None if
+            no phrase matched, or the utterance is a question or has a
+            negation outside the matched phrases
+        """
+        if normalized is None:
+            normalized = normalize_utterance(text)
+        tokens = normalized.split(" ")
+        if not tokens or tokens == [""]:
+            return None
+
+        if "?" in text:
+            return None
+
+        scores: Dict[str, float] = {}
+        matched_tokens = 0
+        i = 0
+        n = len(tokens)
+
+        while i < n:
+            # Longest phrase starting at token i
+            node = self.trie
+            best = None
+            j = i
+            while j < n and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if self._TERMINAL in node:
+                    best = (node[self._TERMINAL], j)
+
+            if best:
+                (intent, weight), end = best
+                scores[intent] = max(scores.get(intent, 0.0), weight)
+                matched_tokens += sum(1 for token in tokens[i:end] if not _is_filler(token))
+                i = end
+            elif tokens[i] in OPEN_TOKENS:
+                return None
+            else:
+                i += 1
+
+        if not scores:
+            return None
+
+        # Share of the meaningful tokens explained by matched phrases
+        content_tokens = sum(1 for token in tokens if not _is_filler(token))
+        coverage = matched_tokens / content_tokens if content_tokens else 1.0
+
+        intent, weight = max(scores.items(), key=lambda item: item[1])
+        confidence = weight * coverage
+
+        # Conflicting intents ("yes but I already paid") lower confidence
+        if len(scores) > 1:
+            runner_up = sorted(scores.values())[-2]
+            confidence *= 1.0 - 0.5 * runner_up
+
+        return {
+            "intent": intent,
+            "confidence": round(confidence, 3),
+            "entities": self.extract_entities(text),
+            "requires_human": intent in REQUIRES_HUMAN_INTENTS
+        }
+
+    def extract_entities(self, text: str) -> Dict[str, str]:
+        """Extract simple entities (amount, relative date)"""
+        entities = {}
+        for name, pattern in ENTITY_PATTERNS.items():
+            match = pattern.search(text)
+            if match:
+                entities[name] = next(group for group in match.groups() if group)
+        return entities
+
+
+class IntentClassifier:
+    """
+    First classification tier: recent-result cache + fast matcher
+
+    Only utterances that neither hit the cache nor match with at least
+    `min_confidence` are left for the LLM tier.
+    """
+
+    def __init__(
+        self,
+        min_confidence: float = None,
+        cache_size: int = None,
+        matcher: FastIntentMatcher = None
+    ):
+        self.matcher = matcher or FastIntentMatcher()
+        self.min_confidence = min_confidence if min_confidence is not None else settings.INTENT_FAST_PATH_MIN_CONFIDENCE
+        self.cache_size = cache_size if cache_size is not None else settings.INTENT_CACHE_SIZE
+        self._cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+
+        self.total = 0
+        self.cache_hits = 0
+        self.fast_path_hits = 0
+
+    def classify_local(self, user_message: str, sector: str = "banking") -> Optional[Dict[str, Any]]:
+        """
+        Classify without calling the LLM
+
+        Args:
+            user_message: User's message
+            sector: BFSI sector
+
+        Returns:
+            Classification, or None when the LLM tier is needed
+        """
+        self.total += 1
+        key = (sector, normalize_utterance(user_message))
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return dict(cached)
+
+        result = self.matcher.match(user_message, normalized=key[1])
+        if result and result["confidence"] >= self.min_confidence:
+            result["source"] = "fast_path"
+            self.fast_path_hits += 1
+            self._remember(key, result)
+            return dict(result)
+
+        return None
+
+    def remember(self, user_message: str, sector: str, result: Dict[str, Any]):
+        """Cache an LLM-tier classification"""
+        self._remember((sector, normalize_utterance(user_message)), result)
+
+    def _remember(self, key: Tuple[str, str], result: Dict[str, Any]):
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Fast-path hit rate and counters"""
+        local_hits = self.cache_hits + self.fast_path_hits
+        return {
+            "total": self.total,
+            "cache_hits": self.cache_hits,
+            "fast_path_hits": self.fast_path_hits,
+            "llm_calls": self.total - local_hits,
+            "hit_rate": local_hits / self.total if self.total else 0.0,
+            "cache_entries": len(self._cache)
+        }
+
+
+# Create singleton instance
+intent_classifier = IntentClassifier()
+
+
+# Export
+__all__ = ["intent_classifier", "IntentClassifier", "FastIntentMatcher", "normalize_utterance"]
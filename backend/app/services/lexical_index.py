@@ -0,0 +1,281 @@
+"""
+Lexical Index
+BM25 inverted index with array-backed, memory-mappable posting lists
+"""
+
+import json
+import os
+import re
+import shutil
+import unicodedata
+import numpy as np
+from collections import Counter
+from typing import Optional, Dict, Any, List, Tuple, Iterable, NamedTuple
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.embeddings import STOPWORDS
+
+
+POINTER_FILE = "lexical.json"
+
+# Runs of one script: Latin letters/digits, Devanagari (without the danda
+# punctuation) or Tamil. Vowel signs and viramas are combining marks, not
+# \w characters, so a generic \w+ would cut Indic words apart.
+TOKEN = re.compile(r'[a-z0-9]+|[\u0900-\u0963\u0966-\u097F]+|[\u0B80-\u0BFF]+')
+
+TAMIL_STOPWORDS = frozenset("என் எனது நான் நீங்கள் உங்கள் இது அது ஒரு மற்றும் என்ன எப்படி".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Script-aware tokenization for English, Hindi and Tamil
+
+    Text is NFC-normalized and casefolded, then split into single-script
+    runs, so "ECS-mandate", "SBIN0001234" and "ईएमआई" each yield whole
+    terms. English plurals are folded ("loans" -> "loan"); Indic tokens
+    are kept as written. Stopwords are dropped.
+    """
+    tokens = []
+    for token in TOKEN.findall(unicodedata.normalize("NFC", text).casefold()):
+        if token in STOPWORDS or token in TAMIL_STOPWORDS:
+            continue
+        if token.isascii() and len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = None) -> List[Tuple[int, float]]:
+    """
+    Fuse ranked id lists with Reciprocal Rank Fusion
+
+    Each id scores sum(1 / (k + rank)) over the lists it appears in. RRF
+    needs no score calibration between BM25 and cosine similarity.
+
+    Args:
+        rankings: Ranked id lists, best first
+        k: Rank smoothing constant (RAG_RRF_K)
+
+    Returns:
+        (id, fused score) pairs, best first
+    """
+    k = k or settings.RAG_RRF_K
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            fused[doc] = fused.get(doc, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+class _Generation(NamedTuple):
+    """One loaded index generation; searches read all arrays from the same one"""
+    number: int
+    vocabulary: Dict[str, int]
+    offsets: np.ndarray
+    docs: np.ndarray
+    tfs: np.ndarray
+    doc_norms: np.ndarray
+    documents: int  # Non-empty rows at build time, the N of BM25's IDF
+
+
+_EMPTY = _Generation(0, {}, np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32),
+                     np.zeros(0, dtype=np.uint16), np.zeros(0, dtype=np.float32), 0)
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over the vector index's chunk rows
+
+    Postings are stored CSR-style in flat NumPy arrays: term t's documents
+    are docs[offsets[t]:offsets[t + 1]] with term frequencies in the same
+    slice of tfs. Per-document BM25 length normalization is precomputed.
+    Document ids are vector index row ids, so lexical and vector results
+    fuse directly and vector index tombstones apply to both.
+
+    Each build writes a new generation directory and then atomically
+    switches the `lexical.json` pointer to it, so readers never see a half
+    written index. Loading memory-maps the arrays; nothing is rebuilt. The
+    loaded generation is swapped in as a single object, so a search in a
+    worker thread never mixes the arrays of two generations.
+    """
+
+    def __init__(self, directory: str = None, k1: float = 1.2, b: float = 0.75):
+        self.directory = directory or settings.VECTOR_INDEX_DIR
+        self.k1 = k1
+        self.b = b
+
+        self._current = _EMPTY
+
+    @property
+    def vocabulary(self) -> Dict[str, int]:
+        return self._current.vocabulary
+
+    @property
+    def num_docs(self) -> int:
+        """Documents with text when the index was built (empty and deleted rows excluded)"""
+        return self._current.documents
+
+    @property
+    def generation(self) -> int:
+        return self._current.number
+
+    def __len__(self) -> int:
+        return self.num_docs
+
+    # ==================== BUILD ====================
+
+    def build(self, documents: Iterable[Tuple[int, str]], num_rows: int):
+        """
+        Build and persist the index
+
+        Args:
+            documents: (row id, text) pairs
+            num_rows: Total rows in the vector index (rows without text stay empty)
+        """
+        vocabulary: Dict[str, int] = {}
+        term_parts, doc_parts, tf_parts = [], [], []
+        lengths = np.zeros(num_rows, dtype=np.float32)
+
+        terms, docs, tfs = [], [], []
+        for row, text in documents:
+            counts = Counter(tokenize(text))
+            lengths[row] = sum(counts.values())
+            for term, tf in counts.items():
+                terms.append(vocabulary.setdefault(term, len(vocabulary)))
+                docs.append(row)
+                tfs.append(tf)
+            # Flush to compact arrays so Python lists stay small
+            if len(terms) > 1_000_000:
+                term_parts.append(np.array(terms, dtype=np.int32))
+                doc_parts.append(np.array(docs, dtype=np.int32))
+                tf_parts.append(np.array(tfs, dtype=np.uint16))
+                terms, docs, tfs = [], [], []
+        term_parts.append(np.array(terms, dtype=np.int32))
+        doc_parts.append(np.array(docs, dtype=np.int32))
+        tf_parts.append(np.array(tfs, dtype=np.uint16))
+
+        all_terms = np.concatenate(term_parts)
+        order = np.argsort(all_terms, kind="stable")  # Keeps doc ids ascending per term
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(all_terms, minlength=len(vocabulary)))])
+
+        non_empty = lengths > 0
+        average_length = float(lengths[non_empty].mean()) if non_empty.any() else 1.0
+        doc_norms = (self.k1 * (1 - self.b + self.b * lengths / average_length)).astype(np.float32)
+
+        self._write(
+            vocabulary,
+            offsets.astype(np.int64),
+            np.concatenate(doc_parts)[order],
+            np.concatenate(tf_parts)[order],
+            doc_norms,
+            int(non_empty.sum())
+        )
+        logger.info(f"🔤 Lexical index built: {len(vocabulary):,} terms over {int(non_empty.sum()):,} chunks")
+
+    def _write(self, vocabulary, offsets, docs, tfs, doc_norms, documents: int):
+        generation = self.generation + 1
+        path = os.path.join(self.directory, f"lexical-{generation}")
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+        np.save(os.path.join(path, "offsets.npy"), offsets)
+        np.save(os.path.join(path, "docs.npy"), docs)
+        np.save(os.path.join(path, "tfs.npy"), tfs)
+        np.save(os.path.join(path, "doc_norms.npy"), doc_norms)
+        with open(os.path.join(path, "vocabulary.json"), "w", encoding="utf-8") as f:
+            json.dump(sorted(vocabulary, key=vocabulary.get), f, ensure_ascii=False)
+
+        pointer = os.path.join(self.directory, POINTER_FILE)
+        with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"generation": generation, "documents": documents}, f)
+        os.replace(pointer + ".tmp", pointer)
+
+        previous = self.generation
+        self.load()
+        if previous:
+            shutil.rmtree(os.path.join(self.directory, f"lexical-{previous}"), ignore_errors=True)
+
+    # ==================== LOAD ====================
+
+    def load(self) -> "LexicalIndex":
+        """Memory-map the current generation (a missing index loads as empty)"""
+        pointer = os.path.join(self.directory, POINTER_FILE)
+        if not os.path.exists(pointer):
+            return self
+
+        with open(pointer, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        generation = meta["generation"]
+        path = os.path.join(self.directory, f"lexical-{generation}")
+
+        with open(os.path.join(path, "vocabulary.json"), "r", encoding="utf-8") as f:
+            terms = json.load(f)
+        current = _Generation(
+            number=generation,
+            vocabulary={term: term_id for term_id, term in enumerate(terms)},
+            offsets=np.load(os.path.join(path, "offsets.npy")),
+            docs=np.load(os.path.join(path, "docs.npy"), mmap_mode="r"),
+            tfs=np.load(os.path.join(path, "tfs.npy"), mmap_mode="r"),
+            doc_norms=np.load(os.path.join(path, "doc_norms.npy"), mmap_mode="r"),
+            documents=0
+        )
+        # Generations written before the count was stored fall back to all rows
+        self._current = current._replace(documents=meta.get("documents", len(current.doc_norms)))
+        return self
+
+    # ==================== SEARCH ====================
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        deleted: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 top-k search
+
+        Args:
+            query: Query text
+            k: Results to return
+            deleted: Boolean mask of tombstoned rows to exclude
+
+        Returns:
+            (scores, rows) arrays, best first
+        """
+        index = self._current
+        vocabulary = index.vocabulary
+        term_ids = [vocabulary[t] for t in set(tokenize(query)) if t in vocabulary]
+        if not term_ids:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+
+        num_docs = index.documents
+        doc_parts, score_parts = [], []
+        for term_id in term_ids:
+            start, end = index.offsets[term_id], index.offsets[term_id + 1]
+            docs = index.docs[start:end]
+            tfs = index.tfs[start:end].astype(np.float32)
+            df = end - start
+            idf = np.log(1.0 + (num_docs - df + 0.5) / (df + 0.5))
+            doc_parts.append(docs)
+            score_parts.append(idf * tfs * (self.k1 + 1) / (tfs + index.doc_norms[docs]))
+
+        all_docs = np.concatenate(doc_parts)
+        rows, inverse = np.unique(all_docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts)).astype(np.float32)
+
+        if deleted is not None and deleted.any():
+            # Rows newer than the mask (appended since it was read) are live
+            live = np.ones(len(rows), dtype=bool)
+            known = rows < len(deleted)
+            live[known] = ~deleted[rows[known]]
+            rows, scores = rows[live], scores[live]
+
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores)
+        return scores[order], rows[order].astype(np.int64)
+
+
+# Export
+__all__ = ["LexicalIndex", "tokenize", "reciprocal_rank_fusion"]
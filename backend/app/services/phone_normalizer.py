@@ -0,0 +1,152 @@
+"""
+Phone Number Normalization
+E.164 canonicalization and bounded-memory dedupe of recipient lists
+"""
+
+import re
+from functools import lru_cache
+from itertools import islice
+from typing import Optional, Dict, Any, Iterable, Iterator
+import numpy as np
+import phonenumbers
+from app.core.config import settings
+
+
+# Separators dropped before matching
+_STRIP = str.maketrans("", "", "-() .\t")
+
+# Indian mobile in the ways it shows up in CRM exports:
+# 98xxxxxxxx, 098xxxxxxxx, 9198xxxxxxxx, 09198xxxxxxxx, 009198xxxxxxxx, +9198xxxxxxxx
+_INDIAN_MOBILE = re.compile(r'(?:\+91|0091|091|91|0)?([6-9]\d{9})')
+
+# Numbers normalized per block by iter_unique()
+DEDUPE_BLOCK_SIZE = 50_000
+
+
+def _fallback(number: str, region: str) -> Optional[str]:
+    """Full libphonenumber parse for anything the fast path does not cover"""
+    try:
+        parsed = phonenumbers.parse(number, region)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(parsed):
+        return None
+    return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+
+
+def _normalize(number: str, region: str) -> Optional[str]:
+    compact = number.translate(_STRIP)
+    if region == "IN":
+        match = _INDIAN_MOBILE.fullmatch(compact)
+        if match:
+            return "+91" + match.group(1)
+    return _fallback(number, region) if compact else None
+
+
+_normalize_cached = lru_cache(maxsize=settings.PHONE_NORMALIZE_CACHE_SIZE)(_normalize)
+
+
+def normalize(number: str, region: str = None) -> Optional[str]:
+    """
+    Canonicalize a phone number to E.164
+
+    Well-formed Indian mobiles are matched by one regex; everything else
+    goes through `phonenumbers`. Results are memoized, so repeated
+    customers in a list cost a dict lookup.
+
+    Args:
+        number: Free-form phone number
+        region: Default region for numbers without a country code
+
+    Returns:
+        E.164 string, or None if the number is not valid
+    """
+    if not number:
+        return None
+    return _normalize_cached(str(number).strip(), region or settings.PHONE_DEFAULT_REGION)
+
+
+def iter_unique(
+    numbers: Iterable[str],
+    region: str = None,
+    report: Optional[Dict[str, Any]] = None
+) -> Iterator[str]:
+    """
+    Stream the distinct valid numbers of a list, first occurrence first
+
+    Seen numbers are kept as one sorted uint64 array (8 bytes per
+    distinct number) instead of a set of strings; each block of input is
+    deduplicated against it with vectorized binary search. Memory does
+    not depend on how many duplicates or rejects the list contains.
+
+    Args:
+        numbers: Recipient numbers in any format
+        region: Default region for numbers without a country code
+        report: Optional dict filled with total / duplicates / rejected
+            counts and up to PHONE_REJECT_REPORT_LIMIT rejected inputs
+
+    Yields:
+        E.164 numbers
+    """
+    region = region or settings.PHONE_DEFAULT_REGION
+    report = report if report is not None else {}
+    report.update({"total": 0, "unique": 0, "duplicates": 0, "rejected": 0, "rejects": []})
+    reject_limit = settings.PHONE_REJECT_REPORT_LIMIT
+
+    seen = np.zeros(0, dtype=np.uint64)
+    iterator = iter(numbers)
+    while True:
+        # Blocks grow with the seen array so merging it stays amortized
+        block = list(islice(iterator, max(DEDUPE_BLOCK_SIZE, len(seen) // 4)))
+        if not block:
+            return
+
+        valid, keys = [], []
+        for number in block:
+            canonical = normalize(number, region)
+            if canonical is None:
+                report["rejected"] += 1
+                if len(report["rejects"]) < reject_limit:
+                    report["rejects"].append(number)
+                continue
+            valid.append(canonical)
+            keys.append(int(canonical[1:]))
+        report["total"] += len(block)
+        if not valid:
+            continue
+
+        keys = np.array(keys, dtype=np.uint64)
+        _, first = np.unique(keys, return_index=True)
+        first.sort()
+        positions = np.searchsorted(seen, keys[first])
+        known = np.zeros(len(first), dtype=bool)
+        if len(seen):
+            known = seen[np.minimum(positions, len(seen) - 1)] == keys[first]
+        fresh = first[~known]
+
+        new_keys = np.sort(keys[fresh])
+        seen = np.insert(seen, np.searchsorted(seen, new_keys), new_keys)
+        report["unique"] += len(fresh)
+        report["duplicates"] += len(valid) - len(fresh)
+        for index in fresh.tolist():
+            yield valid[index]
+
+
+def normalize_recipients(numbers: Iterable[str], region: str = None) -> Dict[str, Any]:
+    """
+    Normalize and dedupe a recipient list
+
+    Args:
+        numbers: Recipient numbers in any format
+        region: Default region for numbers without a country code
+
+    Returns:
+        Distinct E.164 numbers in input order plus the iter_unique() report
+    """
+    report: Dict[str, Any] = {}
+    unique = list(iter_unique(numbers, region, report))
+    return {"numbers": unique, **report}
+
+
+# Export
+__all__ = ["normalize", "iter_unique", "normalize_recipients"]
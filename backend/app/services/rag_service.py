@@ -0,0 +1,177 @@
+"""
+RAG Service
+Retrieves knowledge base passages to ground BFSI responses
+"""
+
+import asyncio
+from typing import Optional, Dict, Any, List
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.tokens import estimate_tokens
+from app.services.embeddings import retrieval_embedder
+from app.services.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from app.services.vector_index import VectorIndex
+
+
+class RAGService:
+    """
+    Knowledge base retrieval over the in-process vector and lexical indexes
+
+    In hybrid mode (RAG_RETRIEVAL_MODE) dense and BM25 results are fused by
+    reciprocal rank: exact terms such as scheme names, IFSC codes and form
+    numbers are found by BM25 even when their embeddings are unremarkable.
+    Lexical mode skips the embedder entirely.
+
+    Embedding and search are CPU-bound (NumPy releases the GIL during the
+    matrix multiplies), so they run in a worker thread to keep the event
+    loop responsive.
+    """
+
+    def __init__(self, index: VectorIndex = None, embedder=None, lexical: LexicalIndex = None):
+        self.embedder = embedder or retrieval_embedder
+        self.index = index if index is not None else VectorIndex(
+            dimension=self.embedder.dimension,
+            embedder_name=self.embedder.name
+        )
+        self.lexical = lexical if lexical is not None else LexicalIndex(directory=self.index.directory)
+
+    def load(self):
+        """Load the indexes from disk; retrieval is disabled if they are unusable"""
+        try:
+            self.index.load()
+            self.lexical.load()
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Knowledge base index unavailable, answering without RAG: {str(e)}")
+            self.index = VectorIndex(
+                directory=self.index.directory,
+                dimension=self.embedder.dimension,
+                embedder_name=self.embedder.name
+            )
+            self.lexical = LexicalIndex(directory=self.index.directory)
+
+    def rebuild_lexical(self):
+        """Rebuild the BM25 index from the live chunks of the vector index"""
+        self.lexical.build(
+            ((row, record["text"]) for row, record in self.index.iter_records()),
+            num_rows=len(self.index)
+        )
+
+    def retrieve_sync(
+        self,
+        query: str,
+        sector: Optional[str] = None,
+        top_k: int = None,
+        min_score: float = None,
+        mode: str = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve the passages most relevant to a query
+
+        Args:
+            query: User query
+            sector: Keep only passages for this sector (or sector-agnostic ones)
+            top_k: Passages to return
+            min_score: Minimum cosine similarity for vector hits
+            mode: vector, lexical or hybrid (default RAG_RETRIEVAL_MODE)
+
+        Returns:
+            Chunk records with "score" (fused, cosine or BM25 depending on
+            mode) plus "vector_score"/"bm25_score" when available, best first
+        """
+        if not len(self.index):
+            return []
+
+        top_k = top_k or settings.RAG_TOP_K
+        min_score = settings.RAG_MIN_SCORE if min_score is None else min_score
+        mode = mode or settings.RAG_RETRIEVAL_MODE
+        # Over-fetch so fusion and the sector filter still leave top_k passages
+        fetch = top_k * 4 if sector or mode == "hybrid" else top_k
+
+        rankings = []
+        vector_scores: Dict[int, float] = {}
+        bm25_scores: Dict[int, float] = {}
+
+        if mode in ("vector", "hybrid"):
+            scores, rows = self.index.search(self.embedder.embed([query]), k=fetch)
+            vector_scores = {
+                int(row): float(score)
+                for score, row in zip(scores[0], rows[0])
+                if row >= 0 and score >= min_score
+            }
+            rankings.append(list(vector_scores))
+
+        if mode in ("lexical", "hybrid") and len(self.lexical):
+            scores, rows = self.lexical.search(query, k=fetch, deleted=self.index.deleted)
+            bm25_scores = {
+                int(row): float(score)
+                for score, row in zip(scores, rows)
+                if score >= settings.RAG_BM25_MIN_SCORE
+            }
+            rankings.append(list(bm25_scores))
+
+        if len(rankings) > 1:
+            ranked = reciprocal_rank_fusion(rankings)
+        else:
+            primary = vector_scores or bm25_scores
+            ranked = list(primary.items())
+
+        passages = []
+        for (row, score), record in zip(ranked, self.index.get_records([row for row, _ in ranked])):
+            if sector and record.get("sector") not in (None, sector):
+                continue
+            passage = {**record, "score": round(score, 4)}
+            if row in vector_scores:
+                passage["vector_score"] = round(vector_scores[row], 4)
+            if row in bm25_scores:
+                passage["bm25_score"] = round(bm25_scores[row], 4)
+            passages.append(passage)
+            if len(passages) == top_k:
+                break
+        return passages
+
+    async def retrieve(self, query: str, sector: Optional[str] = None, top_k: int = None) -> List[Dict[str, Any]]:
+        """Async wrapper for retrieve_sync"""
+        if not len(self.index):
+            return []
+        return await asyncio.to_thread(self.retrieve_sync, query, sector, top_k)
+
+    def build_context(self, passages: List[Dict[str, Any]], token_budget: int = None) -> str:
+        """
+        Format passages for the prompt within a token budget
+
+        Args:
+            passages: Retrieved chunk records, best first
+            token_budget: Maximum estimated context tokens
+
+        Returns:
+            Context string (empty when nothing was retrieved)
+        """
+        token_budget = token_budget or settings.RAG_CONTEXT_TOKEN_BUDGET
+        parts = []
+        used = 0
+        for number, passage in enumerate(passages, 1):
+            source = passage.get("source")
+            text = f"[{number}] {passage['text']}" + (f" (source: {source})" if source else "")
+            tokens = estimate_tokens(text)
+            if parts and used + tokens > token_budget:
+                break
+            parts.append(text)
+            used += tokens
+        return "\n\n".join(parts)
+
+    async def get_context(self, query: str, sector: Optional[str] = None) -> str:
+        """Retrieve and format the prompt context for a query"""
+        try:
+            return self.build_context(await self.retrieve(query, sector))
+        except Exception as e:
+            # Retrieval problems must not fail the call; answer without context
+            logger.error(f"❌ Retrieval failed: {str(e)}")
+            return ""
+
+
+# Create singleton instance
+rag_service = RAGService()
+
+
+# Export
+__all__ = ["rag_service", "RAGService"]
@@ -0,0 +1,229 @@
+"""
+Response Cache
+Exact + semantic cache of BFSI answers and their synthesized audio
+"""
+
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+from app.core.config import settings
+from app.services.embeddings import embedder as default_embedder, STOPWORDS
+from app.services.intent_classifier import normalize_utterance
+
+
+# Fixed per-entry overhead estimate (dict, key tuple, bookkeeping)
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def content_terms(normalized_query: str) -> frozenset:
+    """Words of a normalized query that carry meaning (stopwords dropped)"""
+    return frozenset(word for word in normalized_query.split(" ") if word and word not in STOPWORDS)
+
+
+class _SemanticBucket:
+    """Growable matrix of cached query embeddings for one sector/language"""
+
+    def __init__(self, dimension: int, capacity: int = 64):
+        self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self.keys: list = [None] * capacity
+        self.free_rows: list = []
+        self.size = 0
+
+    def add(self, key: Tuple[str, str, str], vector: np.ndarray) -> int:
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            if self.size == len(self.keys):
+                self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+                self.keys.extend([None] * len(self.keys))
+            row = self.size
+            self.size += 1
+        self.vectors[row] = vector
+        self.keys[row] = key
+        return row
+
+    def remove(self, row: int):
+        # A zero vector never clears the similarity threshold
+        self.vectors[row] = 0.0
+        self.keys[row] = None
+        self.free_rows.append(row)
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[Tuple[str, str, str]], float]:
+        if self.size == 0:
+            return None, 0.0
+        similarities = self.vectors[:self.size] @ vector
+        row = int(np.argmax(similarities))
+        return self.keys[row], float(similarities[row])
+
+
+class ResponseCache:
+    """
+    Two-tier response cache keyed on (normalized query, sector, language)
+
+    Tier 1 is an exact dict lookup on the normalized query. Tier 2 finds
+    the most similar cached query in the same sector/language by embedding
+    dot product, and only answers if both queries also have the same
+    content words: embeddings (bag-of-words hashing especially) score
+    "enable auto-debit" and "disable auto-debit" as near-identical, so
+    the tier only absorbs differences in word order, filler and
+    stopwords. Entries expire after `ttl_seconds` and the cache evicts
+    least-recently-used entries to stay under `max_bytes`, counting text,
+    audio and embedding sizes.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = None,
+        max_bytes: int = None,
+        similarity_threshold: float = None,
+        embedder=None
+    ):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.RESPONSE_CACHE_TTL_SECONDS
+        self.max_bytes = max_bytes if max_bytes is not None else settings.RESPONSE_CACHE_MAX_BYTES
+        self.similarity_threshold = (
+            similarity_threshold if similarity_threshold is not None else settings.RESPONSE_CACHE_SIMILARITY
+        )
+        self.embedder = embedder or default_embedder
+
+        self._entries: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, str], _SemanticBucket] = {}
+        self.total_bytes = 0
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def get(self, query: str, sector: str, language: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+
+        Args:
+            query: User's question
+            sector: BFSI sector
+            language: Response language
+
+        Returns:
+            Dict with key, text, audio (None if not synthesized yet), match
+            ("exact" or "semantic") and similarity; None on a miss
+        """
+        key = (normalize_utterance(query), sector, language)
+        now = time.monotonic()
+
+        entry = self._live_entry(key, now)
+        if entry is not None:
+            self.exact_hits += 1
+            return self._hit(entry, "exact", 1.0)
+
+        bucket = self._buckets.get((sector, language))
+        if bucket is not None:
+            nearest_key, similarity = bucket.nearest(self.embedder.embed_one(key[0]))
+            if nearest_key is not None and similarity >= self.similarity_threshold:
+                entry = self._live_entry(nearest_key, now)
+                if entry is not None and entry["terms"] == content_terms(key[0]):
+                    self.semantic_hits += 1
+                    return self._hit(entry, "semantic", similarity)
+
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        query: str,
+        sector: str,
+        language: str,
+        text: str,
+        audio: Optional[bytes] = None
+    ) -> Tuple[str, str, str]:
+        """
+        Cache a response (and optionally its audio)
+
+        Returns:
+            Cache key, usable with attach_audio
+        """
+        key = (normalize_utterance(query), sector, language)
+        self._evict(key)
+
+        vector = self.embedder.embed_one(key[0])
+        bucket = self._buckets.get((sector, language))
+        if bucket is None:
+            bucket = self._buckets[(sector, language)] = _SemanticBucket(vector.shape[0])
+
+        entry = {
+            "key": key,
+            "text": text,
+            "audio": audio,
+            "expires_at": time.monotonic() + self.ttl_seconds,
+            "row": bucket.add(key, vector),
+            "terms": content_terms(key[0]),
+            "size": 0
+        }
+        self._entries[key] = entry
+        self._resize(entry)
+        return key
+
+    def attach_audio(self, key: Tuple[str, str, str], audio: bytes):
+        """Store synthesized audio next to an already cached text"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry["audio"] = audio
+            self._resize(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit counters and memory usage"""
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0
+        }
+
+    def _hit(self, entry: Dict[str, Any], match: str, similarity: float) -> Dict[str, Any]:
+        self._entries.move_to_end(entry["key"])
+        return {
+            "key": entry["key"],
+            "text": entry["text"],
+            "audio": entry["audio"],
+            "match": match,
+            "similarity": similarity
+        }
+
+    def _live_entry(self, key: Tuple[str, str, str], now: float) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None and entry["expires_at"] <= now:
+            self._evict(key)
+            return None
+        return entry
+
+    def _resize(self, entry: Dict[str, Any]):
+        old_size = entry["size"]
+        entry["size"] = (
+            ENTRY_OVERHEAD_BYTES
+            + len(entry["key"][0].encode("utf-8"))
+            + len(entry["text"].encode("utf-8"))
+            + len(entry["audio"] or b"")
+            + self.embedder.dimension * 4
+        )
+        self.total_bytes += entry["size"] - old_size
+
+        while self.total_bytes > self.max_bytes and self._entries:
+            oldest_key = next(iter(self._entries))
+            self._evict(oldest_key)
+
+    def _evict(self, key: Tuple[str, str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry["size"]
+        self._buckets[(key[1], key[2])].remove(entry["row"])
+
+
+# Create singleton instance
+response_cache = ResponseCache()
+
+
+# Export
+__all__ = ["response_cache", "ResponseCache"]
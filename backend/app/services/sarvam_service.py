@@ -8,6 +8,7 @@ import base64
 from typing import Dict, Any, Optional, List
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import provider_call, mock_audio_fallbacks
 
 
 class SarvamVoiceService:
@@ -24,6 +25,16 @@ class SarvamVoiceService:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        
+        # Shared keep-alive pool; building a client per call costs tens of
+        # milliseconds of blocking SSL setup on the event loop
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    
+    async def aclose(self):
+        """Close pooled connections"""
+        await self.client.aclose()
     
     async def text_to_speech(
         self,
@@ -44,13 +55,13 @@ class SarvamVoiceService:
         Returns:
             Audio bytes (WAV format)
         """
-        try:
-            # Get detailed language config to ensure correct code (en-IN)
-            config = self.get_language_config(language)
-            target_language = config.get("code", "en-IN")
+        with provider_call("sarvam", "tts") as call:
+            try:
+                # Get detailed language config to ensure correct code (en-IN)
+                config = self.get_language_config(language)
+                target_language = config.get("code", "en-IN")
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
+                response = await self.client.post(
                     f"{self.api_url}/text-to-speech",
                     headers=self.headers,
                     json={
@@ -82,25 +93,29 @@ class SarvamVoiceService:
                 return audio_bytes
                 
                 
-        except httpx.HTTPStatusError as e:
-            logger.error(f"❌ Sarvam TTS HTTP Error: Status {e.response.status_code}")
-            logger.error(f"   Response body: {e.response.text[:500]}")
-            logger.warning(f"⚠️ TTS API failed, using demo mode")
-            # Return mock audio data for demo purposes
-            mock_audio = b'RIFF$\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00D\xac\x00\x00\x88X\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00'
-            logger.info(f"✅ TTS demo mode: {len(text)} chars -> mock audio")
-            return mock_audio
-                
-        except Exception as e:
-            logger.error(f"❌ Sarvam TTS Exception: {type(e).__name__}: {str(e)}")
-            if hasattr(e, '__traceback__'):
-                import traceback
-                logger.error(f"   Traceback: {traceback.format_exc()}")
-            logger.warning(f"⚠️ TTS API failed, using demo mode")
-            # Return mock audio data for demo purposes
-            mock_audio = b'RIFF$\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00D\xac\x00\x00\x88X\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00'
-            logger.info(f"✅ TTS demo mode: {len(text)} chars -> mock audio")
-            return mock_audio
+            except httpx.HTTPStatusError as e:
+                logger.error(f"❌ Sarvam TTS HTTP Error: Status {e.response.status_code}")
+                logger.error(f"   Response body: {e.response.text[:500]}")
+                logger.warning(f"⚠️ TTS API failed, using demo mode")
+                call.failed()
+                mock_audio_fallbacks.inc()
+                # Return mock audio data for demo purposes
+                mock_audio = b'RIFF$\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00D\xac\x00\x00\x88X\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00'
+                logger.info(f"✅ TTS demo mode: {len(text)} chars -> mock audio")
+                return mock_audio
+                    
+            except Exception as e:
+                logger.error(f"❌ Sarvam TTS Exception: {type(e).__name__}: {str(e)}")
+                if hasattr(e, '__traceback__'):
+                    import traceback
+                    logger.error(f"   Traceback: {traceback.format_exc()}")
+                logger.warning(f"⚠️ TTS API failed, using demo mode")
+                call.failed()
+                mock_audio_fallbacks.inc()
+                # Return mock audio data for demo purposes
+                mock_audio = b'RIFF$\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00D\xac\x00\x00\x88X\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00'
+                logger.info(f"✅ TTS demo mode: {len(text)} chars -> mock audio")
+                return mock_audio
     
     async def speech_to_text(
         self,
@@ -117,12 +132,12 @@ class SarvamVoiceService:
         Returns:
             Transcription result with text and confidence
         """
-        try:
-            # Encode audio to base64
-            audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
+        with provider_call("sarvam", "stt"):
+            try:
+                # Encode audio to base64
+                audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+                
+                response = await self.client.post(
                     f"{self.api_url}/speech-to-text",
                     headers=self.headers,
                     json={
@@ -147,9 +162,9 @@ class SarvamVoiceService:
                     "language": language
                 }
                 
-        except Exception as e:
-            logger.error(f"❌ STT failed: {str(e)}")
-            raise
+            except Exception as e:
+                logger.error(f"❌ STT failed: {str(e)}")
+                raise
     
     async def detect_language(self, audio_bytes: bytes) -> str:
         """
@@ -164,23 +179,22 @@ class SarvamVoiceService:
         try:
             audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_url}/language-detection",
-                    headers=self.headers,
-                    json={"audio": audio_base64},
-                    timeout=30.0
-                )
-                
-                response.raise_for_status()
-                
-                result = response.json()
-                language = result.get("language_code", "en")
-                
-                logger.info(f"✅ Language detected: {language}")
-                
-                return language
-                
+            response = await self.client.post(
+                f"{self.api_url}/language-detection",
+                headers=self.headers,
+                json={"audio": audio_base64},
+                timeout=30.0
+            )
+            
+            response.raise_for_status()
+            
+            result = response.json()
+            language = result.get("language_code", "en")
+            
+            logger.info(f"✅ Language detected: {language}")
+            
+            return language
+            
         except Exception as e:
             logger.error(f"❌ Language detection failed: {str(e)}")
             return "en"  # Default to English
@@ -196,22 +210,21 @@ class SarvamVoiceService:
             List of available voices
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.api_url}/voices",
-                    headers=self.headers,
-                    params={"language_code": language},
-                    timeout=10.0
-                )
-                
-                response.raise_for_status()
-                
-                voices = response.json().get("voices", [])
-                
-                logger.info(f"✅ Retrieved {len(voices)} voices for {language}")
-                
-                return voices
-                
+            response = await self.client.get(
+                f"{self.api_url}/voices",
+                headers=self.headers,
+                params={"language_code": language},
+                timeout=10.0
+            )
+            
+            response.raise_for_status()
+            
+            voices = response.json().get("voices", [])
+            
+            logger.info(f"✅ Retrieved {len(voices)} voices for {language}")
+            
+            return voices
+            
         except Exception as e:
             logger.error(f"❌ Failed to get voices: {str(e)}")
             return []
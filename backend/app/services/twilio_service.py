@@ -6,12 +6,15 @@ WhatsApp Business API integration for customer messaging
 from twilio.rest import Client
 from twilio.twiml.messaging_response import MessagingResponse
 from typing import Dict, Any, Optional
+from collections import OrderedDict
 from datetime import datetime
 import json
 
 from app.core.config import settings
 from app.core.logging import logger, audit_log
 from app.core.security import ConsentManager, PIIMasker
+from app.services.conversation_memory import conversation_store
+from app.services.groq_service import groq_service
 
 
 class TwilioWhatsAppService:
@@ -25,8 +28,9 @@ class TwilioWhatsAppService:
         self.whatsapp_number = settings.TWILIO_WHATSAPP_NUMBER
         self.sms_number = settings.TWILIO_PHONE_NUMBER
         
-        # Session storage (use Redis in production)
-        self.sessions = {}
+        # Session storage (use Redis in production); bounded LRU like conversation_store
+        self.max_sessions = settings.CONVERSATION_MAX_SESSIONS
+        self.sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
     
     async def send_sms(
         self,
@@ -179,12 +183,10 @@ class TwilioWhatsAppService:
             # Get or create session
             session = self._get_session(user_id)
             
-            # Update session
-            session["messages"].append({
-                "role": "user",
-                "content": message_body,
-                "timestamp": datetime.utcnow().isoformat()
-            })
+            # Update session (token-budgeted; older turns are summarized in the background)
+            memory = session["memory"]
+            memory.add_message("user", message_body)
+            memory.schedule_compaction(groq_service.summarize_conversation)
             
             # Check for opt-in keywords
             if self._is_opt_in_message(message_body):
@@ -220,19 +222,24 @@ class TwilioWhatsAppService:
         return str(response)
     
     def _get_session(self, user_id: str) -> Dict[str, Any]:
-        """Get or create user session"""
-        if user_id not in self.sessions:
-            self.sessions[user_id] = {
+        """Get or create user session (least recently active sessions are dropped)"""
+        session = self.sessions.get(user_id)
+        if session is None:
+            session = self.sessions[user_id] = {
                 "user_id": user_id,
-                "messages": [],
                 "context": {},
-                "created_at": datetime.utcnow().isoformat(),
-                "last_activity": datetime.utcnow().isoformat()
+                "created_at": datetime.utcnow().isoformat()
             }
+            if len(self.sessions) > self.max_sessions:
+                _, evicted = self.sessions.popitem(last=False)
+                conversation_store.drop(f"whatsapp:{evicted['user_id']}")
         else:
-            self.sessions[user_id]["last_activity"] = datetime.utcnow().isoformat()
+            self.sessions.move_to_end(user_id)
         
-        return self.sessions[user_id]
+        # History lives in the shared conversation store
+        session["memory"] = conversation_store.get(f"whatsapp:{user_id}")
+        session["last_activity"] = datetime.utcnow().isoformat()
+        return session
     
     def _is_opt_in_message(self, message: str) -> bool:
         """Check if message is opt-in"""
@@ -0,0 +1,448 @@
+"""
+Vector Index
+In-process nearest-neighbour search over a memory-mapped embedding matrix
+"""
+
+import json
+import os
+import threading
+import numpy as np
+from typing import Optional, Dict, Any, List, Tuple, Iterator, NamedTuple
+from app.core.config import settings
+from app.core.logging import logger
+
+
+VECTORS_FILE = "vectors.f32"
+CHUNKS_FILE = "chunks.jsonl"
+META_FILE = "meta.json"
+IVF_CENTROIDS_FILE = "ivf_centroids.npy"
+IVF_ORDER_FILE = "ivf_order.npy"
+IVF_OFFSETS_FILE = "ivf_offsets.npy"
+TOMBSTONES_FILE = "tombstones.i64"
+
+# Rows scored per matrix multiply; bounds the temporary score matrix
+SEARCH_BLOCK_ROWS = 65536
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows as float32 so cosine similarity is a dot product"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _merge_top_k(
+    best_scores: np.ndarray,
+    best_rows: np.ndarray,
+    scores: np.ndarray,
+    rows: np.ndarray,
+    k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge a block of (queries, block) scores into running top-k results"""
+    all_scores = np.concatenate([best_scores, scores], axis=1)
+    all_rows = np.concatenate([best_rows, np.broadcast_to(rows, scores.shape)], axis=1)
+    if all_scores.shape[1] > k:
+        keep = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+        all_scores = np.take_along_axis(all_scores, keep, axis=1)
+        all_rows = np.take_along_axis(all_rows, keep, axis=1)
+    return all_scores, all_rows
+
+
+class _Snapshot(NamedTuple):
+    """Rows searchable together: the mapped matrix and its tombstone mask"""
+    matrix: Optional[np.ndarray]
+    deleted: np.ndarray
+
+
+class VectorIndex:
+    """
+    Append-only embedding index stored as flat files
+
+    Layout of `directory`:
+        vectors.f32    row-major float32 unit vectors, memory-mapped for search
+        chunks.jsonl   one JSON record per row (text, source, sector, ...)
+        meta.json      dimension and embedder name
+        tombstones.i64 ids of deleted rows (int64, append-only)
+        ivf_*.npy      optional inverted-file (cluster) index
+
+    Exact search scores every row with blocked matrix multiplies, batching
+    all queries of a call into one BLAS operation per block. Past
+    VECTOR_INDEX_IVF_MIN_CHUNKS rows (when an IVF index has been built)
+    search only scans the rows of the `n_probe` clusters whose centroids
+    are closest to the query, plus rows appended since the IVF build.
+    Chunk records are read from disk by byte offset, so resident memory is
+    dominated by the pages of the matrix the OS keeps cached. Rows are
+    never rewritten: updates append a new row and tombstone the old one.
+
+    The matrix and tombstone mask are published together as one snapshot,
+    so a search running in a worker thread during add() or delete() sees
+    either the old rows or the new ones, never a mix.
+    """
+
+    def __init__(self, directory: str = None, dimension: int = None, embedder_name: str = None):
+        self.directory = directory or settings.VECTOR_INDEX_DIR
+        self.dimension = dimension or settings.EMBEDDING_DIMENSION
+        self.embedder_name = embedder_name
+
+        self._snapshot = _Snapshot(None, np.zeros(0, dtype=bool))
+        self._offsets: List[int] = []
+        self._chunks_fd: Optional[int] = None
+        self._write_lock = threading.Lock()
+
+        self.ivf_centroids: Optional[np.ndarray] = None
+        self.ivf_order: Optional[np.ndarray] = None
+        self.ivf_offsets: Optional[np.ndarray] = None
+
+    # ==================== STORAGE ====================
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def load(self) -> "VectorIndex":
+        """Memory-map the index files (a missing index loads as empty)"""
+        meta_path = self._path(META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if self.embedder_name and meta.get("embedder") not in (None, self.embedder_name):
+                raise ValueError(
+                    f"Index at {self.directory} was built with {meta.get('embedder')}, "
+                    f"not {self.embedder_name}; rebuild it"
+                )
+            self.dimension = meta["dimension"]
+            self.embedder_name = meta.get("embedder", self.embedder_name)
+
+        self._offsets = []
+        chunks_path = self._path(CHUNKS_FILE)
+        if os.path.exists(chunks_path):
+            position = 0
+            with open(chunks_path, "rb") as f:
+                for line in f:
+                    self._offsets.append(position)
+                    position += len(line)
+            self._offsets.append(position)
+            self._open_chunks()
+
+        matrix = self._map_vectors()
+        self._snapshot = _Snapshot(matrix, self._load_tombstones(matrix.shape[0]))
+        self._load_ivf()
+
+        if len(self):
+            logger.info(f"📚 Vector index loaded: {self.live_count():,} chunks, dim {self.dimension}")
+        return self
+
+    def _open_chunks(self):
+        if self._chunks_fd is not None:
+            os.close(self._chunks_fd)
+        self._chunks_fd = os.open(self._path(CHUNKS_FILE), os.O_RDONLY)
+
+    def _map_vectors(self) -> np.ndarray:
+        path = self._path(VECTORS_FILE)
+        rows = max(len(self._offsets) - 1, 0)
+        if rows == 0 or not os.path.exists(path):
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        # Map only rows whose metadata is complete (a crash may leave a torn tail)
+        rows = min(rows, os.path.getsize(path) // (4 * self.dimension))
+        del self._offsets[rows + 1:]
+        return np.memmap(path, dtype=np.float32, mode="r", shape=(rows, self.dimension))
+
+    def _load_tombstones(self, rows: int) -> np.ndarray:
+        deleted = np.zeros(rows, dtype=bool)
+        path = self._path(TOMBSTONES_FILE)
+        if os.path.exists(path):
+            ids = np.fromfile(path, dtype=np.int64)
+            deleted[ids[ids < rows]] = True
+        return deleted
+
+    def _load_ivf(self):
+        self.ivf_centroids = self.ivf_order = self.ivf_offsets = None
+        if not os.path.exists(self._path(IVF_CENTROIDS_FILE)):
+            return
+        order = np.load(self._path(IVF_ORDER_FILE), mmap_mode="r")
+        if len(order) > len(self):
+            logger.warning("⚠️ IVF index is newer than the vectors, ignoring it")
+            return
+        self.ivf_centroids = np.load(self._path(IVF_CENTROIDS_FILE))
+        self.ivf_order = order
+        self.ivf_offsets = np.load(self._path(IVF_OFFSETS_FILE))
+
+    def add(self, vectors: np.ndarray, records: List[Dict[str, Any]]) -> List[int]:
+        """
+        Append embeddings and their chunk records
+
+        Args:
+            vectors: (n, dimension) embeddings (normalized here if needed)
+            records: n JSON-serializable chunk records
+
+        Returns:
+            Row ids of the appended chunks
+        """
+        vectors = normalize_rows(vectors)
+        if vectors.shape[0] != len(records):
+            raise ValueError(f"{vectors.shape[0]} vectors for {len(records)} records")
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected dimension {self.dimension}, got {vectors.shape[1]}")
+
+        with self._write_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            if not os.path.exists(self._path(META_FILE)):
+                with open(self._path(META_FILE), "w", encoding="utf-8") as f:
+                    json.dump({"dimension": self.dimension, "embedder": self.embedder_name}, f)
+
+            start = len(self)
+            # Drop a torn tail from an interrupted append so rows stay aligned
+            self._truncate(VECTORS_FILE, start * 4 * self.dimension)
+            self._truncate(CHUNKS_FILE, self._offsets[-1] if self._offsets else 0)
+
+            lines = [
+                (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+                for record in records
+            ]
+            # Vectors first: rows without a metadata line are ignored on load
+            with open(self._path(VECTORS_FILE), "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._path(CHUNKS_FILE), "ab") as f:
+                f.write(b"".join(lines))
+
+            if not self._offsets:
+                self._offsets.append(0)
+            for line in lines:
+                self._offsets.append(self._offsets[-1] + len(line))
+
+            # The chunks file is append-only: an open descriptor sees new lines,
+            # and is never swapped under a concurrent get_records()
+            if self._chunks_fd is None:
+                self._open_chunks()
+            matrix = self._map_vectors()
+            deleted = self._snapshot.deleted
+            deleted = np.concatenate([deleted, np.zeros(matrix.shape[0] - len(deleted), dtype=bool)])
+            self._snapshot = _Snapshot(matrix, deleted)
+
+        return list(range(start, start + len(records)))
+
+    def delete(self, rows: List[int]):
+        """Tombstone rows so search no longer returns them"""
+        if not rows:
+            return
+        rows = np.asarray(rows, dtype=np.int64)
+        with self._write_lock:
+            with open(self._path(TOMBSTONES_FILE), "ab") as f:
+                f.write(rows.tobytes())
+            snapshot = self._snapshot
+            deleted = snapshot.deleted.copy()
+            deleted[rows] = True
+            self._snapshot = _Snapshot(snapshot.matrix, deleted)
+
+    def live_count(self) -> int:
+        """Rows that have not been deleted"""
+        snapshot = self._snapshot
+        return (0 if snapshot.matrix is None else snapshot.matrix.shape[0]) - int(snapshot.deleted.sum())
+
+    def _truncate(self, name: str, size: int):
+        path = self._path(name)
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            os.truncate(path, size)
+
+    def __len__(self) -> int:
+        matrix = self._snapshot.matrix
+        return 0 if matrix is None else matrix.shape[0]
+
+    def get_records(self, rows: List[int]) -> List[Dict[str, Any]]:
+        """Read chunk records by row id"""
+        records = []
+        for row in rows:
+            start, end = self._offsets[row], self._offsets[row + 1]
+            records.append(json.loads(os.pread(self._chunks_fd, end - start, start)))
+        return records
+
+    def iter_records(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Stream (row, record) for all live rows in row order"""
+        deleted = self._snapshot.deleted
+        if not len(deleted):
+            return
+        with open(self._path(CHUNKS_FILE), "rb") as f:
+            for row in range(len(deleted)):
+                line = f.readline()
+                if not deleted[row]:
+                    yield row, json.loads(line)
+
+    @property
+    def deleted(self) -> np.ndarray:
+        """Boolean tombstone mask by row"""
+        return self._snapshot.deleted
+
+    def close(self):
+        """Release file handles"""
+        if self._chunks_fd is not None:
+            os.close(self._chunks_fd)
+            self._chunks_fd = None
+        self._snapshot = _Snapshot(None, np.zeros(0, dtype=bool))
+
+    # ==================== SEARCH ====================
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        mode: str = "auto",
+        n_probe: int = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k inner-product search for a batch of queries
+
+        Args:
+            queries: (q, dimension) or (dimension,) query embeddings
+            k: Results per query
+            mode: "exact", "ivf" or "auto" (IVF past VECTOR_INDEX_IVF_MIN_CHUNKS)
+            n_probe: Clusters scanned per query in IVF mode
+
+        Returns:
+            (scores, rows) arrays of shape (q, k), best first; missing
+            results have row -1 and score -inf
+        """
+        queries = normalize_rows(queries)
+        snapshot = self._snapshot
+        total = 0 if snapshot.matrix is None else snapshot.matrix.shape[0]
+        k = max(1, min(k, total)) if total else k
+
+        use_ivf = self.ivf_centroids is not None and (
+            mode == "ivf" or (mode == "auto" and total >= settings.VECTOR_INDEX_IVF_MIN_CHUNKS)
+        )
+        if use_ivf:
+            scores, rows = self._search_ivf(snapshot, queries, k, n_probe or settings.VECTOR_INDEX_IVF_NPROBE)
+        else:
+            scores, rows = self._search_exact(snapshot, queries, k)
+
+        order = np.argsort(-scores, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        rows = np.take_along_axis(rows, order, axis=1)
+        rows[np.isneginf(scores)] = -1  # Padding and deleted rows
+        return scores, rows
+
+    def _empty_results(self, n_queries: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        return (
+            np.full((n_queries, k), -np.inf, dtype=np.float32),
+            np.full((n_queries, k), -1, dtype=np.int64)
+        )
+
+    def _search_exact(
+        self,
+        snapshot: _Snapshot,
+        queries: np.ndarray,
+        k: int,
+        start_row: int = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        matrix, deleted = snapshot
+        if matrix is None:
+            return self._empty_results(queries.shape[0], k)
+        any_deleted = deleted.any()
+        best_scores, best_rows = self._empty_results(queries.shape[0], 0)
+        for start in range(start_row, matrix.shape[0], SEARCH_BLOCK_ROWS):
+            block = matrix[start:start + SEARCH_BLOCK_ROWS]
+            scores = queries @ block.T
+            if any_deleted:
+                scores[:, deleted[start:start + block.shape[0]]] = -np.inf
+            rows = np.arange(start, start + block.shape[0], dtype=np.int64)
+            best_scores, best_rows = _merge_top_k(best_scores, best_rows, scores, rows, k)
+
+        if best_scores.shape[1] < k:
+            pad_scores, pad_rows = self._empty_results(queries.shape[0], k - best_scores.shape[1])
+            best_scores = np.concatenate([best_scores, pad_scores], axis=1)
+            best_rows = np.concatenate([best_rows, pad_rows], axis=1)
+        return best_scores, best_rows
+
+    def _search_ivf(
+        self,
+        snapshot: _Snapshot,
+        queries: np.ndarray,
+        k: int,
+        n_probe: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        matrix, deleted = snapshot
+        n_lists = self.ivf_centroids.shape[0]
+        n_probe = min(n_probe, n_lists)
+
+        centroid_scores = queries @ self.ivf_centroids.T
+        probes = np.argpartition(-centroid_scores, n_probe - 1, axis=1)[:, :n_probe]
+
+        # Rows appended after the IVF build are always scanned exactly
+        indexed_rows = len(self.ivf_order)
+        scores, rows = self._search_exact(snapshot, queries, k, start_row=indexed_rows)
+
+        for i, query in enumerate(queries):
+            candidates = np.concatenate([
+                self.ivf_order[self.ivf_offsets[lst]:self.ivf_offsets[lst + 1]]
+                for lst in probes[i]
+            ])
+            candidates = candidates[~deleted[candidates]]
+            if candidates.size == 0:
+                continue
+            candidates.sort()  # Sequential page access on the memory map
+            candidate_scores = matrix[candidates] @ query
+            merged_scores, merged_rows = _merge_top_k(
+                scores[i:i + 1], rows[i:i + 1],
+                candidate_scores[None, :], candidates.astype(np.int64), k
+            )
+            scores[i], rows[i] = merged_scores[0], merged_rows[0]
+        return scores, rows
+
+    # ==================== IVF BUILD ====================
+
+    def build_ivf(self, n_lists: int = None, iterations: int = 8, points_per_list: int = 32, seed: int = 0):
+        """
+        Cluster the vectors with spherical k-means and write the IVF files
+
+        Args:
+            n_lists: Number of clusters (default 4 * sqrt(rows))
+            iterations: k-means iterations on the training sample
+            points_per_list: Training sample size per cluster
+            seed: Random seed
+        """
+        rows = len(self)
+        if rows == 0:
+            raise ValueError("Cannot build IVF for an empty index")
+
+        rng = np.random.default_rng(seed)
+        n_lists = min(n_lists or max(1, int(4 * np.sqrt(rows))), rows)
+        sample_size = min(n_lists * points_per_list, rows)
+        sample_rows = np.sort(rng.choice(rows, size=sample_size, replace=False))
+        matrix = self._snapshot.matrix
+        sample = np.asarray(matrix[sample_rows])
+
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = self._assign(sample, centroids)
+            order = np.argsort(assignment, kind="stable")
+            counts = np.bincount(assignment, minlength=n_lists)
+            non_empty = counts > 0
+            sums = np.add.reduceat(sample[order], np.concatenate([[0], np.cumsum(counts)[:-1]])[non_empty])
+            centroids[non_empty] = sums
+            # Re-seed empty clusters with random sample points
+            empty = np.flatnonzero(~non_empty)
+            if empty.size:
+                centroids[empty] = sample[rng.choice(len(sample), size=empty.size, replace=False)]
+            centroids = normalize_rows(centroids)
+
+        assignment = np.concatenate([
+            self._assign(np.asarray(matrix[start:start + SEARCH_BLOCK_ROWS]), centroids)
+            for start in range(0, rows, SEARCH_BLOCK_ROWS)
+        ])
+        order = np.argsort(assignment, kind="stable").astype(np.int64)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))]).astype(np.int64)
+
+        np.save(self._path(IVF_ORDER_FILE), order)
+        np.save(self._path(IVF_OFFSETS_FILE), offsets)
+        np.save(self._path(IVF_CENTROIDS_FILE), centroids)  # Written last: marks the build complete
+        self._load_ivf()
+        logger.info(f"📚 IVF index built: {n_lists} clusters over {rows:,} chunks")
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Nearest centroid per row"""
+        return np.argmax(vectors @ centroids.T, axis=1).astype(np.int64)
+
+
+# Export
+__all__ = ["VectorIndex", "normalize_rows"]
@@ -0,0 +1,4 @@
+"""
+Benchmarks Package
+Standalone performance benchmarks for backend hot paths
+"""
@@ -0,0 +1,152 @@
+"""
+Audit Store Benchmark
+Append throughput (group commit vs fsync per event) and compliance query latency
+
+Events are synthetic call audit records spread evenly over `--days` days,
+so the store holds one sealed segment per day (more when a day exceeds
+AUDIT_SEGMENT_MAX_EVENTS). Queries run after reopening the store, i.e.
+against memory-mapped sealed segments:
+
+    user 90d       all events for one phone number in the last 90 days
+    call           all events for one call id
+    event 7d       100 newest events of one type in the last 7 days
+    full scan      the user query answered by reading every data.log,
+                   which is what grepping the old text logs amounted to
+
+100M events (the production sizing target) need ~20 GB of disk and a
+couple of hours of appends on one core:
+    python -m benchmarks.bench_audit_store --events 100000000 --days 365
+
+Usage (from backend/):
+    python -m benchmarks.bench_audit_store --events 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.core.logging import setup_logging
+from app.core.security import PIIMasker
+from app.services.audit_store import AuditStore
+
+
+EVENTS = ["outbound_call_initiated", "call_status_ringing", "call_status_in-progress",
+          "call_status_completed", "outbound_call_completed", "consent_recorded"]
+
+
+def phone(i: int) -> str:
+    return f"+91{9000000000 + i}"
+
+
+def fill(store: AuditStore, args) -> float:
+    """Append --events events; returns events/s including the final flush"""
+    rng = random.Random(0)
+    now = time.time()
+    step = args.days * 86400 / args.events
+    start = time.perf_counter()
+    for i in range(args.events):
+        call = i // len(EVENTS)
+        store.append(
+            EVENTS[i % len(EVENTS)],
+            user_id=phone(rng.randrange(args.users)),
+            call_id=f"call_{call:012x}",
+            metadata={"sector": "banking", "purpose": "emi_reminder"},
+            timestamp=now - args.days * 86400 + i * step
+        )
+    store.flush()
+    return args.events / (time.perf_counter() - start)
+
+
+def fsync_per_event(directory: str, count: int) -> float:
+    store = AuditStore(directory, retention_days=3650).open()
+    start = time.perf_counter()
+    for i in range(count):
+        store.flush(store.append("call_status_completed", user_id=phone(i), call_id=f"call_{i}"))
+    rate = count / (time.perf_counter() - start)
+    store.close()
+    return rate
+
+
+def timed(fn, repeat: int):
+    timings, sizes = [], []
+    for i in range(repeat):
+        start = time.perf_counter()
+        sizes.append(len(fn(i)))
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(0.99 * (len(timings) - 1))], statistics.mean(sizes)
+
+
+def full_scan(directory: str, user_id: str) -> list:
+    user_hash = PIIMasker.hash_pii(user_id)
+    matches = []
+    for root, _, names in os.walk(directory):
+        if "data.log" in names:
+            with open(os.path.join(root, "data.log"), "rb") as f:
+                for line in f:
+                    if user_hash.encode() in line:
+                        matches.append(json.loads(line))
+    return matches
+
+
+def main(args):
+    setup_logging()
+    base = tempfile.mkdtemp(prefix="bench-audit-")
+    directory = os.path.join(base, "store")
+    try:
+        print(f"{args.events:,} events over {args.days} days, {args.users:,} users, store in {base}")
+
+        rate = fsync_per_event(os.path.join(base, "fsync"), args.fsync_events)
+        print(f"append, fsync per event      {rate:>12,.0f} events/s")
+
+        store = AuditStore(directory, retention_days=3650)
+        rate = fill(store, args)
+        store.close()
+        size = sum(os.path.getsize(os.path.join(r, n)) for r, _, ns in os.walk(directory) for n in ns)
+        print(f"append, group commit         {rate:>12,.0f} events/s   ({size / 1e6:,.0f} MB on disk)")
+
+        start = time.perf_counter()
+        store = AuditStore(directory, retention_days=3650).open()
+        print(f"open                         {(time.perf_counter() - start) * 1000:>12.1f} ms   "
+              f"({store.stats()['segments']} segments)")
+
+        now = time.time()
+        rng = random.Random(1)
+        users = [phone(rng.randrange(args.users)) for _ in range(args.queries)]
+        calls = [f"call_{rng.randrange(args.events // len(EVENTS)):012x}" for _ in range(args.queries)]
+
+        print(f"{'query':<20} {'p50 ms':>9} {'p99 ms':>9} {'rows':>9}")
+        cases = [
+            ("user 90d", lambda i: store.query(user_id=users[i], since=now - 90 * 86400, limit=100_000)),
+            ("call", lambda i: store.query(call_id=calls[i])),
+            ("event 7d", lambda i: store.query(event=EVENTS[i % len(EVENTS)], since=now - 7 * 86400,
+                                               limit=100, newest_first=True)),
+        ]
+        for label, fn in cases:
+            p50, p99, rows = timed(fn, args.queries)
+            print(f"{label:<20} {p50:>9.2f} {p99:>9.2f} {rows:>9.1f}")
+
+        p50, p99, rows = timed(lambda i: full_scan(directory, users[i]), 3)
+        print(f"{'full scan (grep)':<20} {p50:>9.2f} {p99:>9.2f} {rows:>9.1f}")
+        store.close()
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--fsync-events", type=int, default=1000)
+    main(parser.parse_args())
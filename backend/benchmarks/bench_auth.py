@@ -0,0 +1,97 @@
+"""
+Auth Benchmark
+Cost of JWT verification with and without the verified-token cache
+
+    verify           verify_token() (python-jose decode + HMAC) against
+                     token_cache.verify() on a warm cache
+    requests/s       A FastAPI route protected by require_auth, driven
+                     straight through ASGI (no network), with the cache
+                     disabled and enabled; `--tokens` distinct clients
+
+Usage (from backend/):
+    python -m benchmarks.bench_auth --requests 20000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ["AUTH_ENABLED"] = "True"
+
+from fastapi import Depends, FastAPI
+from app.core.logging import setup_logging
+from app.core import security
+from app.core.security import VerifiedTokenCache, create_access_token, require_auth, verify_token
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/voice/call/{call_id}", dependencies=[Depends(require_auth)])
+    async def poll(call_id: str):
+        return {"call_id": call_id, "status": "in-progress"}
+
+    return app
+
+
+def drive(app, tokens: list, count: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    async def run():
+        for i in range(count):
+            token = tokens[i % len(tokens)]
+            await app({
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "GET", "scheme": "http", "path": f"/api/voice/call/{i}", "raw_path": b"",
+                "root_path": "", "query_string": b"", "server": ("api", 80), "client": ("10.0.0.1", 5000),
+                "headers": [(b"host", b"api"), (b"authorization", b"Bearer " + token.encode())],
+            }, receive, send)
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return count / (time.perf_counter() - start)
+
+
+def main(args):
+    setup_logging()
+    tokens = [create_access_token({"sub": f"client-{i}", "role": "agent"}) for i in range(args.tokens)]
+
+    n = args.verify
+    start = time.perf_counter()
+    for i in range(n):
+        verify_token(tokens[i % len(tokens)])
+    uncached = (time.perf_counter() - start) / n
+    cache = VerifiedTokenCache(max_entries=args.tokens)
+    for token in tokens:
+        cache.verify(token)
+    start = time.perf_counter()
+    for i in range(n):
+        cache.verify(tokens[i % len(tokens)])
+    cached = (time.perf_counter() - start) / n
+    print(f"{'verify_token()':<32} {uncached * 1e6:>10.1f} µs")
+    print(f"{'token_cache.verify(), warm':<32} {cached * 1e6:>10.1f} µs")
+
+    app = build_app()
+    security.token_cache = VerifiedTokenCache(max_entries=0)
+    without = drive(app, tokens, args.requests)
+    security.token_cache = VerifiedTokenCache(max_entries=args.tokens)
+    with_cache = drive(app, tokens, args.requests)
+    print(f"{'requests/s, no cache':<32} {without:>10,.0f}")
+    print(f"{'requests/s, cache':<32} {with_cache:>10,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--verify", type=int, default=50_000)
+    parser.add_argument("--tokens", type=int, default=500)
+    main(parser.parse_args())
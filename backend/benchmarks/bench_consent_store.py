@@ -0,0 +1,89 @@
+"""
+Consent Store Benchmark
+Pre-dial consent screening of a campaign list, one-by-one versus bulk
+
+The store is filled with `--users` consent decisions (70% granted). The
+campaign list holds `--numbers` numbers, 80% of which have a record.
+Compared:
+
+    per-number SQL     check() in a loop with the cache off, the cost of
+                       a persistent store queried one number at a time
+    bulk SQL           check_bulk() with the cache off (one range scan)
+    bulk cached        check_bulk() after warm()
+
+History lookups are timed against a scan of a dict shaped like the old
+class-level `consent_records`.
+
+Usage (from backend/):
+    python -m benchmarks.bench_consent_store --users 1000000 --numbers 1000000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.services.consent_store import ConsentStore
+
+
+def phone(i: int) -> str:
+    return f"+91{9000000000 + i}"
+
+
+def timed(label: str, fn, count: int = None):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    rate = f"{count / elapsed:>12,.0f} /s" if count else ""
+    print(f"{label:<34} {elapsed:>9.3f} s {rate}")
+    return result, elapsed
+
+
+def main(args):
+    rng = random.Random(0)
+    directory = tempfile.mkdtemp(prefix="bench-consent-")
+    path = os.path.join(directory, "consent.db")
+    try:
+        records = [
+            {"user_id": phone(i), "consent_type": "outbound_call", "granted": rng.random() < 0.7}
+            for i in range(args.users)
+        ]
+        store = ConsentStore(path, cache_enabled=False)
+        timed(f"import {args.users:,} records", lambda: store.record_many(records), args.users)
+
+        numbers = [phone(rng.randrange(int(args.users / 0.8))) for _ in range(args.numbers)]
+        sample = numbers[:args.sample]
+        _, elapsed = timed(f"per-number SQL ({len(sample):,} sample)",
+                           lambda: [store.check(n, "outbound_call") for n in sample], len(sample))
+        print(f"{'  extrapolated to full list':<34} {elapsed * len(numbers) / len(sample):>9.3f} s")
+        expected, _ = timed(f"bulk SQL ({len(numbers):,})",
+                            lambda: store.check_bulk(numbers, "outbound_call"), len(numbers))
+
+        cached = ConsentStore(path, cache_enabled=True, cache_max_entries=args.users * 2)
+        timed("warm cache", cached.warm, args.users)
+        flags, _ = timed(f"bulk cached ({len(numbers):,})",
+                         lambda: cached.check_bulk(numbers, "outbound_call"), len(numbers))
+        assert flags == expected
+        print(f"{'  granted':<34} {sum(flags):>11,}")
+
+        legacy = {f"{r['user_id']}:{r['consent_type']}": r for r in records}
+        users = [phone(rng.randrange(args.users)) for _ in range(20)]
+        _, elapsed = timed("history, legacy dict scan (20)",
+                           lambda: [[r for r in legacy.values() if r["user_id"] == u] for u in users])
+        _, elapsed = timed("history, indexed (20)", lambda: [cached.history(u) for u in users])
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--numbers", type=int, default=1_000_000)
+    parser.add_argument("--sample", type=int, default=50_000)
+    main(parser.parse_args())
@@ -0,0 +1,115 @@
+"""
+DND Registry Benchmark
+Memory footprint and lookup throughput of the memory-mapped registry
+
+A registry of `--registry` random Indian mobile numbers is written once
+(straight from a key array; scrub-file parsing is timed separately on
+`--parse-lines` lines). Campaign lists are half on the registry, half not.
+
+Compared with a Python set of number strings, which is measured on a 1M
+sample and extrapolated.
+
+Usage (from backend/):
+    python -m benchmarks.bench_dnd_registry --registry 20000000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.core.logging import setup_logging
+from app.services.dnd_registry import DNDRegistry
+
+
+def random_numbers(rng: np.random.Generator, count: int) -> np.ndarray:
+    return np.uint64(919_000_000_000) + rng.integers(0, 999_999_999, count, dtype=np.uint64)
+
+
+def campaign(rng, keys: np.ndarray, count: int) -> list:
+    on_list = rng.choice(keys, count // 2)
+    off_list = random_numbers(rng, count - count // 2)
+    numbers = np.concatenate([on_list, off_list])
+    rng.shuffle(numbers)
+    return [f"+{n}" for n in numbers.tolist()]
+
+
+def rate(label: str, count: int, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {count / elapsed:>14,.0f} lookups/s")
+    return result
+
+
+def main(args):
+    setup_logging()
+    rng = np.random.default_rng(0)
+    base = tempfile.mkdtemp(prefix="bench-dnd-")
+    try:
+        keys = np.unique(random_numbers(rng, args.registry))
+        start = time.perf_counter()
+        DNDRegistry(os.path.join(base, "registry"), bloom=True)._write(keys)
+        print(f"registry: {len(keys):,} numbers, written in {time.perf_counter() - start:.1f} s")
+
+        path = os.path.join(base, "scrub.csv")
+        with open(path, "w") as f:
+            f.writelines(f"{n - 910_000_000_000},2024-01-01\n" for n in keys[:args.parse_lines].tolist())
+        start = time.perf_counter()
+        DNDRegistry(os.path.join(base, "parse"), bloom=False).load_full([path])
+        print(f"scrub file parse + build: {args.parse_lines / (time.perf_counter() - start):,.0f} lines/s")
+
+        with_bloom = DNDRegistry(os.path.join(base, "registry"), bloom=True).load()
+        without_bloom = DNDRegistry(os.path.join(base, "registry"), bloom=False).load()
+        stats = with_bloom.stats()
+        print(f"registry memory: array {stats['array_bytes'] / 1e6:,.0f} MB (memory-mapped, paged in on use), "
+              f"bloom {stats['bloom_bytes'] / 1e6:,.0f} MB (resident)")
+
+        sample = keys[:1_000_000].tolist()
+        tracemalloc.start()
+        as_set = {f"+{n}" for n in sample}
+        set_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"python set of strings: {set_bytes / 1e6:,.0f} MB per 1M numbers -> "
+              f"{set_bytes * len(keys) / 1e6 / 1e6:,.0f} MB for the registry")
+
+        singles = campaign(rng, keys, args.single)
+        rate("set membership (1M sample)", len(singles), lambda: [n in as_set for n in singles])
+        a = rate("contains(), bloom", len(singles), lambda: [with_bloom.contains(n) for n in singles])
+        b = rate("contains(), no bloom", len(singles), lambda: [without_bloom.contains(n) for n in singles])
+        assert a == b == with_bloom.contains_many(singles).tolist()
+
+        bulk = campaign(rng, keys, args.bulk)
+        a = rate(f"contains_many({len(bulk):,}), bloom", len(bulk), lambda: with_bloom.contains_many(bulk))
+        b = rate(f"contains_many({len(bulk):,}), no bloom", len(bulk), lambda: without_bloom.contains_many(bulk))
+        assert (a == b).all()
+        print(f"{'  on registry':<40} {int(a.sum()):>14,}")
+
+        registry = DNDRegistry(os.path.join(base, "registry"), bloom=True).load()
+        added, removed = os.path.join(base, "added.txt"), os.path.join(base, "removed.txt")
+        with open(added, "w") as f:
+            f.writelines(f"+{n}\n" for n in random_numbers(rng, args.delta).tolist())
+        with open(removed, "w") as f:
+            f.writelines(f"+{n}\n" for n in rng.choice(keys, args.delta // 2).tolist())
+        start = time.perf_counter()
+        result = registry.apply_delta([added], [removed])
+        print(f"delta (+{result['added']:,} / -{result['removed']:,}): {time.perf_counter() - start:.1f} s")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registry", type=int, default=20_000_000)
+    parser.add_argument("--parse-lines", type=int, default=1_000_000)
+    parser.add_argument("--single", type=int, default=100_000)
+    parser.add_argument("--bulk", type=int, default=1_000_000)
+    parser.add_argument("--delta", type=int, default=200_000)
+    main(parser.parse_args())
@@ -0,0 +1,149 @@
+"""
+Intent Micro-Batching Benchmark
+Latency/throughput trade-off and prompt tokens saved versus batch window
+
+A simulated LLM replaces Groq: each call costs a fixed overhead, prefill
+time per prompt token and decode time per output token, and the provider
+serves a limited number of calls at once. Requests arrive as a Poisson
+process, which is what bursts of concurrent call sessions look like.
+
+Usage (from backend/):
+    python -m benchmarks.bench_intent_batching --rate 200 --duration 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.core.tokens import estimate_message_tokens
+from app.services.groq_service import GroqService
+from app.services.intent_batcher import IntentBatcher
+
+
+QUESTIONS = [
+    "what is the interest rate on my home loan",
+    "why was my SIP not debited this month",
+    "can I change the nominee on my policy",
+    "mera EMI kitna hai aur kab tak bharna hai",
+    "how do I get my loan statement",
+    "my claim was rejected, what can I do",
+]
+
+OUTPUT_TOKENS_PER_RESULT = 40
+
+
+class SimulatedLLM:
+    """Stand-in for GroqService.generate_response with a cost model"""
+
+    def __init__(self, overhead_ms: float, prefill_us_per_token: float, decode_ms_per_token: float, capacity: int):
+        self.overhead = overhead_ms / 1000
+        self.prefill = prefill_us_per_token / 1e6
+        self.decode = decode_ms_per_token / 1000
+        self.capacity = asyncio.Semaphore(capacity)
+        self.calls = 0
+        self.prompt_tokens = 0
+
+    async def generate_response(self, messages, json_mode=False, **kwargs):
+        payload = messages[-1]["content"]
+        batch = json.loads(payload) if payload.startswith("[") else None
+        items = len(batch) if batch else 1
+        prompt_tokens = estimate_message_tokens(messages)
+
+        async with self.capacity:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            await asyncio.sleep(
+                self.overhead + prompt_tokens * self.prefill + items * OUTPUT_TOKENS_PER_RESULT * self.decode
+            )
+
+        result = {"intent": "general_query", "confidence": 0.8, "entities": {}, "requires_human": False}
+        if batch:
+            return json.dumps({"results": [{"id": item["id"], **result} for item in batch]})
+        return json.dumps(result)
+
+
+async def run(max_wait_ms: float, args) -> dict:
+    llm = SimulatedLLM(args.overhead_ms, args.prefill_us, args.decode_ms, args.capacity)
+    service = GroqService()
+    service.generate_response = llm.generate_response
+    batcher = IntentBatcher(
+        classify_batch=service._classify_intent_batch,
+        classify_single=service._classify_intent_single,
+        max_batch=args.max_batch,
+        max_wait_ms=max_wait_ms,
+        token_savings=service._estimate_batch_token_savings
+    )
+
+    rng = random.Random(42)
+    latencies = []
+
+    async def one(text):
+        start = time.perf_counter()
+        if max_wait_ms < 0:
+            await service._classify_intent_single(text, "banking")
+        else:
+            await batcher.classify(text, "banking")
+        latencies.append(time.perf_counter() - start)
+
+    tasks = []
+    start = time.perf_counter()
+    deadline = start + args.duration
+    while time.perf_counter() < deadline:
+        tasks.append(asyncio.create_task(one(rng.choice(QUESTIONS))))
+        await asyncio.sleep(rng.expovariate(args.rate))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    await service.aclose()
+
+    latencies.sort()
+    return {
+        "window": "off" if max_wait_ms < 0 else f"{max_wait_ms:g} ms",
+        "requests": len(latencies),
+        "llm_calls": llm.calls,
+        "avg_batch": batcher.stats()["avg_batch_size"] if max_wait_ms >= 0 else 1.0,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "prompt_tokens": llm.prompt_tokens,
+        "tokens_saved": batcher.tokens_saved
+    }
+
+
+async def main(args):
+    print(
+        f"Arrivals {args.rate:g}/s for {args.duration:g}s, provider capacity {args.capacity} calls, "
+        f"max batch {args.max_batch}"
+    )
+    print(
+        f"{'window':>8} {'reqs':>6} {'calls':>6} {'batch':>6} {'rps':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'prompt tok':>11} {'saved tok':>10}"
+    )
+    for window in args.windows:
+        r = await run(window, args)
+        print(
+            f"{r['window']:>8} {r['requests']:>6} {r['llm_calls']:>6} {r['avg_batch']:>6.1f} {r['throughput']:>8.1f} "
+            f"{r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['prompt_tokens']:>11,} {r['tokens_saved']:>10,}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=200.0, help="Arrivals per second")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds of arrivals")
+    parser.add_argument("--capacity", type=int, default=16, help="Concurrent calls the provider serves")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--overhead-ms", type=float, default=150.0, help="Per-call fixed latency")
+    parser.add_argument("--prefill-us", type=float, default=50.0, help="Microseconds per prompt token")
+    parser.add_argument("--decode-ms", type=float, default=2.0, help="Milliseconds per output token")
+    parser.add_argument("--windows", default="-1,0,5,20,50,100",
+                        type=lambda v: [float(w) for w in v.split(",")],
+                        help="Batch windows in ms; -1 disables batching")
+    asyncio.run(main(parser.parse_args()))
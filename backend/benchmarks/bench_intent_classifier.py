@@ -0,0 +1,79 @@
+"""
+Intent Classifier Benchmark
+Fast-path hit rate and classifications per second on reminder-campaign replies
+
+Usage (from backend/):
+    python -m benchmarks.bench_intent_classifier --iterations 200000
+"""
+
+import argparse
+import os
+import random
+import time
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "benchmark")
+
+from app.services.intent_classifier import FastIntentMatcher, IntentClassifier
+
+
+# Representative replies; the last block needs the LLM tier
+UTTERANCES = [
+    "Yes", "yes sir", "Okay", "haan ji", "हाँ", "சரி", "ok thank you",
+    "No", "nahi", "இல்லை", "not interested",
+    "I have already paid", "already paid yesterday", "payment done", "maine pay kar diya",
+    "मैंने भुगतान कर दिया", "கட்டிவிட்டேன்",
+    "call me later", "I am busy, call back", "baad mein call karna", "பிறகு அழைக்கவும்",
+    "I will pay tomorrow", "send payment link", "kal bhar dunga",
+    "I want to talk to agent", "customer care please", "एजेंट से बात",
+    "stop calling me", "do not call this number",
+    "this is a wrong number", "wrong amount shown",
+    "what is the interest rate on my home loan?",
+    "can you tell me why my SIP failed last month",
+    "mera EMI kitna hai aur kab tak bharna hai",
+    "how do I change my nominee details",
+]
+
+
+def bench(classify, utterances, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        classify(utterances[i % len(utterances)])
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    matcher = FastIntentMatcher()
+
+    print("Fast-path decisions:")
+    classifier = IntentClassifier(cache_size=0)
+    for text in UTTERANCES:
+        result = classifier.classify_local(text)
+        label = f"{result['intent']} ({result['confidence']:.2f})" if result else "-> LLM"
+        print(f"  {text[:45]:<45} {label}")
+    stats = classifier.stats()
+    print(f"\nFast-path hit rate: {stats['hit_rate']:.1%} ({stats['fast_path_hits']}/{stats['total']})")
+
+    # Campaign-shaped stream: mostly short replies with a long tail of
+    # open questions, some repeated verbatim
+    rng = random.Random(7)
+    stream = [rng.choice(UTTERANCES) for _ in range(10_000)]
+
+    matcher_rate = bench(matcher.match, stream, args.iterations)
+    uncached_rate = bench(IntentClassifier(cache_size=0).classify_local, stream, args.iterations)
+    cached = IntentClassifier()
+    cached_rate = bench(cached.classify_local, stream, args.iterations)
+
+    print(f"\n{'tier':<28} {'classifications/s':>18}")
+    print(f"{'matcher only':<28} {matcher_rate:>18,.0f}")
+    print(f"{'classifier, no cache':<28} {uncached_rate:>18,.0f}")
+    print(f"{'classifier, LRU cache':<28} {cached_rate:>18,.0f}")
+    print(f"\nStream hit rate (cache + fast path): {cached.stats()['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
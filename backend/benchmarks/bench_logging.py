@@ -0,0 +1,155 @@
+"""
+Logging Benchmark
+Caller-thread cost of a log call: legacy synchronous sinks versus the queued pipeline
+
+The legacy setup is reproduced here as it was: a colorized stdout sink and
+three synchronous file sinks (app, error, audit), each formatting the
+record and writing to disk on the calling thread. The pipeline only
+enqueues; redaction, JSON serialization and file writes happen on the
+writer thread, whose drain time is reported separately.
+
+Log lines are representative request logs, a third of them carrying a
+phone number, email or account number. After the run the written files
+are scanned for raw PII.
+
+Usage (from backend/):
+    python -m benchmarks.bench_logging --records 20000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "benchmark")
+os.environ["LOG_DIR"] = tempfile.mkdtemp(prefix="bench-logging-")
+os.environ["AUDIT_STORE_DIR"] = os.path.join(os.environ["LOG_DIR"], "audit")
+os.environ["LOG_SAMPLE_RATES"] = ""
+
+from loguru import logger
+from app.core.config import settings
+from app.core.logging import setup_logging, audit_log
+
+
+MESSAGES = [
+    "📤 POST /api/voice/query Status: 200 Time: 0.412s",
+    "📊 Call status update for {call}: in-progress (Twilio SID: CA{sid}, From: +1415555{four}, To: +91{phone})",
+    "🔵 Initiating REAL voice call to +91{phone}",
+    "📝 Generated greeting: Namaste, this is a reminder about your EMI due on the 5th...",
+    "Customer email on file: user{four}@example.com",
+    "⚡ Response cache exact hit (similarity 1.00)",
+    "Refund initiated to account {account}",
+    "🔊 Serving audio bytes for call: {call}",
+]
+
+RAW_PII = re.compile(r'(?<![\da-f])[6-9]\d{9}(?![\da-f])|user\d{4}@example\.com|(?<![\da-f])\d{14}(?![\da-f])')
+
+
+def build_messages(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    digits = lambda n: "".join(rng.choice("0123456789") for _ in range(n))
+    return [
+        rng.choice(MESSAGES).format(
+            call=f"call_{digits(6)}", sid=digits(32), four=digits(4),
+            phone=rng.choice("6789") + digits(9), account=digits(14)
+        )
+        for _ in range(count)
+    ]
+
+
+def setup_legacy(log_dir: str, null_console: bool):
+    """The synchronous sink configuration this pipeline replaced"""
+    logger.remove()
+    logger.add(
+        open(os.devnull, "w") if null_console else sys.stdout,
+        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
+        level=settings.LOG_LEVEL,
+        colorize=True
+    )
+    file_format = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+    logger.add(os.path.join(log_dir, "app_{time:YYYY-MM-DD}.log"), rotation="00:00", retention="30 days",
+               compression="zip", format=file_format, level="INFO")
+    logger.add(os.path.join(log_dir, "error_{time:YYYY-MM-DD}.log"), rotation="00:00", retention="90 days",
+               compression="zip", format=file_format, level="ERROR")
+    logger.add(os.path.join(log_dir, "audit_{time:YYYY-MM-DD}.log"), rotation="00:00", retention="365 days",
+               compression="zip", format="{time:YYYY-MM-DD HH:mm:ss} | AUDIT | {message}", level="INFO",
+               filter=lambda record: "AUDIT" in record["extra"])
+
+
+def legacy_audit(event: str, user_id: str, metadata: dict):
+    log_data = {"event": event, "user_id": user_id, "metadata": metadata}
+    logger.bind(AUDIT=True).info(f"AUDIT: {log_data}")
+
+
+def run(label: str, messages: list, audit, drain) -> list:
+    timings = []
+    perf = time.perf_counter
+    for i, message in enumerate(messages):
+        start = perf()
+        if i % 10 == 0:
+            audit("voice_call_initiated", f"+9198765{i % 100000:05d}", {"call_id": f"call_{i}"})
+        else:
+            logger.info(message)
+        timings.append(perf() - start)
+
+    start = perf()
+    drain()
+    drained = perf() - start
+
+    timings.sort()
+    pct = lambda p: timings[min(len(timings) - 1, int(p * len(timings)))] * 1e6
+    total = sum(timings)
+    print(f"{label:<22} p50 {pct(0.50):>7.1f} µs  p99 {pct(0.99):>7.1f} µs  "
+          f"{len(timings) / total:>9,.0f} calls/s  drain {drained * 1000:>7.1f} ms", file=sys.__stderr__)
+    return timings
+
+
+def scan_for_pii(log_dir: str) -> int:
+    leaks = 0
+    for root, _, names in os.walk(log_dir):
+        for name in names:
+            if name.endswith((".log", ".jsonl")):
+                with open(os.path.join(root, name), encoding="utf-8") as f:
+                    leaks += sum(len(RAW_PII.findall(line)) for line in f)
+    return leaks
+
+
+async def complete():
+    await logger.complete()
+
+
+def main(args):
+    messages = build_messages(args.records)
+    base = settings.LOG_DIR
+    legacy_dir = os.path.join(base, "legacy")
+    os.makedirs(legacy_dir)
+    console = open(os.devnull, "w") if args.null_console else sys.stdout
+
+    print(f"{len(messages):,} log calls (every 10th an audit record), log dir {base}", file=sys.__stderr__)
+
+    setup_legacy(legacy_dir, args.null_console)
+    run("legacy (sync sinks)", messages, legacy_audit, lambda: None)
+
+    # Pipeline console output goes through sys.stdout on the writer thread
+    sys.stdout = console
+    setup_logging()
+    run("pipeline (queued)", messages, audit_log, lambda: asyncio.run(complete()))
+    logger.remove()
+    sys.stdout = sys.__stdout__
+
+    legacy_leaks = scan_for_pii(legacy_dir)
+    print(f"raw PII occurrences on disk: legacy {legacy_leaks:,}, "
+          f"pipeline {scan_for_pii(base) - legacy_leaks:,}", file=sys.__stderr__)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--console", dest="null_console", action="store_false",
+                        help="Write console output to the terminal instead of /dev/null")
+    main(parser.parse_args())
@@ -0,0 +1,126 @@
+"""
+Phone Normalizer Benchmark
+Numbers per second for E.164 normalization and recipient-list dedupe
+
+The list mimics a CRM export: customers appear several times in
+different spellings (98xxxxxxxx, +91 98xxx xxxxx, 098xxxxxxxx,
+09198xxxxxxxx, 0091-98xxxxxxxx), with a few landlines and foreign
+numbers that need the `phonenumbers` fallback and some junk.
+
+    phonenumbers      parse + is_valid + format for every number
+    normalize cold    fast path, empty memo cache
+    normalize warm    second pass over the same list
+    dedupe            iter_unique() against a set of strings, then the
+                      peak traced memory of each (traced separately, as
+                      tracemalloc slows allocation-heavy loops)
+
+Usage (from backend/):
+    python -m benchmarks.bench_phone_normalizer --numbers 1000000
+"""
+
+import argparse
+import os
+import random
+import time
+import tracemalloc
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import phonenumbers
+from app.services import phone_normalizer
+from app.services.phone_normalizer import normalize, iter_unique
+
+SPELLINGS = [
+    lambda m: m,
+    lambda m: f"+91 {m[:5]} {m[5:]}",
+    lambda m: f"0{m}",
+    lambda m: f"091{m}",
+    lambda m: f"0091-{m}",
+    lambda m: f"91{m}",
+]
+ODD = ["(022) 2345 6789", "+1 415 555 0100", "+44 20 7946 0958", "080-4123-4567", "+65 6123 4567"]
+JUNK = ["", "NA", "12345", "98765", "call back later"]
+
+
+def build_list(count: int, customers: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    mobiles = [rng.choice("6789") + "".join(rng.choice("0123456789") for _ in range(9)) for _ in range(customers)]
+    numbers = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.01:
+            numbers.append(rng.choice(JUNK))
+        elif roll < 0.04:
+            numbers.append(rng.choice(ODD))
+        else:
+            numbers.append(rng.choice(SPELLINGS)(rng.choice(mobiles)))
+    return numbers
+
+
+def legacy_normalize(number: str):
+    try:
+        parsed = phonenumbers.parse(number, "IN")
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(parsed):
+        return None
+    return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+
+
+def rate(label: str, count: int, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<28} {count / (time.perf_counter() - start):>12,.0f} numbers/s")
+    return result
+
+
+def traced_peak(fn):
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak
+
+
+def main(args):
+    numbers = build_list(args.numbers, args.customers)
+    print(f"{len(numbers):,} numbers, {args.customers:,} customers")
+
+    sample = numbers[:args.sample]
+    legacy = rate(f"phonenumbers ({len(sample):,})", len(sample), lambda: [legacy_normalize(n) for n in sample])
+    phone_normalizer._normalize_cached.cache_clear()
+    fast = rate("normalize cold", len(numbers), lambda: [normalize(n) for n in numbers])
+    rate("normalize warm", len(numbers), lambda: [normalize(n) for n in numbers])
+    # The fast path also accepts the legacy 091 prefix, which phonenumbers rejects
+    differing = sum(a != b for a, b, n in zip(legacy, fast, sample) if not n.startswith("091"))
+    print(f"{'  differs from phonenumbers':<28} {differing:>12,}")
+
+    def set_dedupe():
+        seen, unique = set(), []
+        for n in numbers:
+            canonical = normalize(n)
+            if canonical is not None and canonical not in seen:
+                seen.add(canonical)
+                unique.append(canonical)
+        return unique
+
+    def stream_dedupe():
+        return sum(1 for _ in iter_unique(numbers, report=report))
+
+    report = {}
+    expected = rate("dedupe, set of strings", len(numbers), set_dedupe)
+    assert rate("dedupe, iter_unique", len(numbers), stream_dedupe) == len(expected)
+    _, set_peak = traced_peak(set_dedupe)
+    _, peak = traced_peak(stream_dedupe)
+    print(f"{'  unique / duplicates / rejected':<28} {report['unique']:,} / {report['duplicates']:,} / {report['rejected']:,}")
+    print(f"{'  peak memory':<28} set {set_peak / 1e6:,.0f} MB, iter_unique {peak / 1e6:,.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--numbers", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=400_000)
+    parser.add_argument("--sample", type=int, default=50_000)
+    main(parser.parse_args())
@@ -0,0 +1,125 @@
+"""
+Request Timing Benchmark
+Requests per second for /health and /api/voice/audio/{call_id}.wav with
+the old BaseHTTPMiddleware request logger and with RequestTimingMiddleware
+
+    none             the routes with no request middleware at all
+    log_requests     the former @app.middleware("http") logger (endpoint run
+                     in a separate task, body re-streamed through a memory
+                     stream), with its X-Process-Time header
+    timing           RequestTimingMiddleware: X-Process-Time, the
+                     http_request_duration_seconds histogram and sampled
+                     access lines
+
+Requests are driven straight through ASGI (no network), in interleaved
+rounds keeping the best of each. Logging runs at LOG_LEVEL (WARNING by
+default, so access lines are filtered in both versions and the numbers
+compare the middleware mechanics).
+
+Usage (from backend/):
+    python -m benchmarks.bench_request_timing --requests 20000 --audio-kb 160
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ["TWILIO_VALIDATE_SIGNATURES"] = "False"
+
+from fastapi import FastAPI, Request
+from app.core.logging import setup_logging, logger
+from app.core.request_timing import RequestTimingMiddleware
+from app.api import voice
+from app.api.voice import call_sessions
+from app.main import health_check
+
+
+async def log_requests(request: Request, call_next):
+    """The request logger this benchmark replaces"""
+    start_time = time.time()
+    try:
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(f"📤 {request.method} {request.url.path} Status: {response.status_code} Time: {process_time:.3f}s")
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+    except Exception as e:
+        logger.error(f"❌ Request failed: {str(e)}")
+        raise
+
+
+def build_app(middleware: str) -> FastAPI:
+    app = FastAPI()
+    app.include_router(voice.router, prefix="/api/voice")
+    app.get("/health")(health_check)
+    if middleware == "log_requests":
+        app.middleware("http")(log_requests)
+    elif middleware == "timing":
+        app.add_middleware(RequestTimingMiddleware)
+    return app
+
+
+def drive(app, path: str, count: int) -> float:
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    async def run():
+        # Like a server: the request body once, then block until the client goes away
+        never = asyncio.Event()
+        for i in range(count):
+            request_path = path.format(i % 100)
+            sent = False
+
+            async def receive():
+                nonlocal sent
+                if sent:
+                    await never.wait()
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            await app({
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "GET", "scheme": "http", "path": request_path, "raw_path": request_path.encode(),
+                "root_path": "", "query_string": b"", "server": ("api", 80), "client": ("10.0.0.1", 5000),
+                "headers": [(b"host", b"api"), (b"user-agent", b"TwilioProxy/1.1")],
+            }, receive, send)
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return count / (time.perf_counter() - start)
+
+
+def main(args):
+    setup_logging()
+    audio = b"RIFF" + bytes(args.audio_kb * 1024 - 4)
+    for i in range(100):
+        call_sessions[f"call-{i}"] = {"audio_bytes": audio}
+
+    variants = ["none", "log_requests", "timing"]
+    apps = {variant: build_app(variant) for variant in variants}
+    paths = {"/health": "/health", "/audio/{id}.wav": "/api/voice/audio/call-{}.wav"}
+    rates = {(variant, route): 0.0 for variant in variants for route in paths}
+    for _ in range(args.rounds):
+        for route, path in paths.items():
+            for variant in variants:
+                drive(apps[variant], path, 200)  # warm up
+                rates[variant, route] = max(rates[variant, route], drive(apps[variant], path, args.requests))
+
+    print(f"{'requests/s':<16}" + "".join(f"{variant:>16}" for variant in variants))
+    for route in paths:
+        none = rates["none", route]
+        cells = [f"{rates[variant, route]:>10,.0f} {rates[variant, route] / none - 1:+5.0%}" for variant in variants]
+        print(f"{route:<16}" + "".join(f"{cell:>16}" for cell in cells))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--audio-kb", type=int, default=160)
+    parser.add_argument("--rounds", type=int, default=3)
+    main(parser.parse_args())
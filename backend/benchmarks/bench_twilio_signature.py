@@ -0,0 +1,171 @@
+"""
+Twilio Signature Benchmark
+Cost of X-Twilio-Signature validation under a status-callback storm
+
+    signature        TwilioSignatureValidator.validate() against the twilio
+                     SDK RequestValidator.validate() on the same request
+    requests/s       A status-callback route (Form parameters, like
+                     /api/voice/status) driven straight through ASGI (no
+                     network): unvalidated, with an empty dependency (the
+                     cost of FastAPI dependency resolution alone), with
+                     verify_twilio_signature, and with a naive dependency
+                     that rebuilds the URL and builds a fresh SDK validator
+                     per request; then the application's own status
+                     route, with and without validation
+
+Usage (from backend/):
+    python -m benchmarks.bench_twilio_signature --requests 20000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Optional
+from urllib.parse import urlencode
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from fastapi import Depends, FastAPI, Form, HTTPException, Request
+from twilio.request_validator import RequestValidator
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.core.security import twilio_validator, verify_twilio_signature
+
+HOST = "abc123.ngrok-free.app"
+
+
+async def empty_dependency(request: Request) -> None:
+    pass
+
+
+async def naive_signature_check(request: Request) -> None:
+    form = await request.form()
+    validator = RequestValidator(settings.TWILIO_AUTH_TOKEN)
+    url = str(request.url.replace(scheme=request.headers["x-forwarded-proto"], netloc=request.headers["x-forwarded-host"]))
+    if not validator.validate(url, dict(form), request.headers.get("x-twilio-signature", "")):
+        raise HTTPException(status_code=403)
+
+
+def build_app(dependencies: list) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/voice/status/{call_id}", dependencies=dependencies)
+    async def status(
+        call_id: str,
+        CallSid: str = Form(...),
+        CallStatus: str = Form(...),
+        From: Optional[str] = Form(None),
+        To: Optional[str] = Form(None)
+    ):
+        return {"success": True}
+
+    return app
+
+
+def callbacks(count: int) -> list:
+    statuses = ["initiated", "ringing", "answered", "completed"]
+    sdk = RequestValidator(settings.TWILIO_AUTH_TOKEN)
+    requests = []
+    for i in range(count):
+        params = {
+            "AccountSid": "AC" + "0" * 32, "ApiVersion": "2010-04-01", "CallSid": f"CA{i:032d}",
+            "CallStatus": statuses[i % 4], "Direction": "outbound-api", "From": "+15550001111",
+            "To": f"+9198765{i % 100000:05d}", "Timestamp": "Mon, 19 Oct 2026 04:31:30 +0000",
+            "SequenceNumber": str(i % 4), "CallbackSource": "call-progress-events",
+        }
+        path = f"/api/voice/status/call-{i % 1000}"
+        requests.append((path, urlencode(params).encode(), sdk.compute_signature(f"https://{HOST}{path}", params)))
+    return requests
+
+
+def drive(app, requests: list) -> float:
+    async def run():
+        for path, body, signature in requests:
+            sent = False
+
+            async def receive():
+                nonlocal sent
+                if sent:
+                    return {"type": "http.disconnect"}
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    assert message["status"] == 200, message
+
+            await app({
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+                "root_path": "", "query_string": b"", "server": ("127.0.0.1", 8000), "client": ("10.0.0.1", 5000),
+                "headers": [
+                    (b"host", b"127.0.0.1:8000"),
+                    (b"content-type", b"application/x-www-form-urlencoded"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-forwarded-proto", b"https"),
+                    (b"x-forwarded-host", HOST.encode()),
+                    (b"x-twilio-signature", signature.encode()),
+                ],
+            }, receive, send)
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return len(requests) / (time.perf_counter() - start)
+
+
+def main(args):
+    setup_logging()
+    requests = callbacks(args.requests)
+
+    from urllib.parse import parse_qsl
+    path, body, signature = requests[0]
+    params = parse_qsl(body.decode())
+    sdk = RequestValidator(settings.TWILIO_AUTH_TOKEN)
+    n = args.requests
+    start = time.perf_counter()
+    for _ in range(n):
+        assert sdk.validate(f"https://{HOST}{path}", dict(params), signature)
+    sdk_cost = (time.perf_counter() - start) / n
+    start = time.perf_counter()
+    for _ in range(n):
+        assert twilio_validator.validate(signature, f"https://{HOST}", path, params)
+    ours = (time.perf_counter() - start) / n
+    print(f"{'RequestValidator.validate()':<36} {sdk_cost * 1e6:>10.1f} µs")
+    print(f"{'TwilioSignatureValidator.validate()':<36} {ours * 1e6:>10.1f} µs")
+
+    configs = [
+        ("unvalidated", [], False),
+        ("empty dependency", [Depends(empty_dependency)], False),
+        ("verify_twilio_signature", [Depends(verify_twilio_signature)], True),
+        ("naive SDK dependency", [Depends(naive_signature_check)], True),
+    ]
+    apps = {label: build_app(dependencies) for label, dependencies, _ in configs}
+    rates = {label: 0.0 for label, _, _ in configs}
+    # Interleaved rounds, best of each, so drift affects every configuration alike
+    for _ in range(args.rounds):
+        for label, _, validate in configs:
+            settings.TWILIO_VALIDATE_SIGNATURES = validate
+            drive(apps[label], requests[:500])  # warm up
+            rates[label] = max(rates[label], drive(apps[label], requests))
+    for label, rate in rates.items():
+        print(f"{'requests/s, ' + label:<36} {rate:>10,.0f}  ({rate / rates['unvalidated'] - 1:+.1%})")
+
+    # The real /api/voice/status route behind the application's middleware stack
+    from app.main import app
+    full = {False: 0.0, True: 0.0}
+    for _ in range(args.rounds):
+        for validate in full:
+            settings.TWILIO_VALIDATE_SIGNATURES = validate
+            drive(app, requests[:500])
+            full[validate] = max(full[validate], drive(app, requests[:args.requests // 2]))
+    print(f"{'requests/s, app status route':<36} {full[False]:>10,.0f} unvalidated, "
+          f"{full[True]:,.0f} validated ({full[True] / full[False] - 1:+.1%})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,103 @@
+"""
+Vector Index Benchmark
+Queries per second and recall@k of exact and IVF search
+
+Builds a synthetic corpus in a temporary directory. Vectors come from a
+low-dimensional latent space projected to the embedding dimension: like
+real text embeddings they have low intrinsic dimension and no clean
+cluster boundaries (well-separated random clusters make IVF look perfect,
+uniform random vectors make it look useless). It then measures exact
+search with single and batched queries and IVF search at several n_probe
+values. Recall@k is measured against the exact results for the same
+queries.
+
+Usage (from backend/):
+    python -m benchmarks.bench_vector_index --rows 200000 --dim 768
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import numpy as np
+
+from app.services.vector_index import VectorIndex, normalize_rows
+
+
+def sample(rng, projection: np.ndarray, n: int, noise: float) -> np.ndarray:
+    """Unit vectors from latent factors plus isotropic noise"""
+    latent = rng.standard_normal((n, projection.shape[0]), dtype=np.float32)
+    noise_part = noise * rng.standard_normal((n, projection.shape[1]), dtype=np.float32)
+    return normalize_rows(latent @ projection + noise_part)
+
+
+def build(directory: str, args) -> tuple:
+    rng = np.random.default_rng(0)
+    projection = rng.standard_normal((args.latent, args.dim), dtype=np.float32) / np.sqrt(args.latent)
+    index = VectorIndex(directory=directory, dimension=args.dim)
+
+    start = time.perf_counter()
+    batch = 50_000
+    for offset in range(0, args.rows, batch):
+        n = min(batch, args.rows - offset)
+        index.add(sample(rng, projection, n, args.noise), [{"text": ""}] * n)
+    print(f"Appended {len(index):,} x {args.dim} vectors in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    index.build_ivf(n_lists=args.lists)
+    print(f"Built IVF ({index.ivf_centroids.shape[0]} clusters) in {time.perf_counter() - start:.1f}s")
+
+    queries = sample(rng, projection, args.queries, args.noise)
+    return index, queries
+
+
+def timed(fn, queries: np.ndarray, batch: int):
+    """Run queries in batches and return (qps, rows)"""
+    rows = []
+    start = time.perf_counter()
+    for offset in range(0, len(queries), batch):
+        rows.append(fn(queries[offset:offset + batch])[1])
+    elapsed = time.perf_counter() - start
+    return len(queries) / elapsed, np.concatenate(rows)
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(np.intersect1d(f, t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        index, queries = build(directory, args)
+        k = args.k
+
+        print(f"\n{'mode':<22} {'batch':>6} {'QPS':>10} {f'recall@{k}':>10}")
+        truth = None
+        for batch in (1, 32):
+            qps, rows = timed(lambda q: index.search(q, k=k, mode="exact"), queries, batch)
+            truth = rows if truth is None else truth
+            print(f"{'exact':<22} {batch:>6} {qps:>10,.0f} {recall(rows, truth):>10.3f}")
+
+        for n_probe in args.nprobe:
+            qps, rows = timed(lambda q: index.search(q, k=k, mode="ivf", n_probe=n_probe), queries, 32)
+            print(f"{f'ivf n_probe={n_probe}':<22} {32:>6} {qps:>10,.0f} {recall(rows, truth):>10.3f}")
+
+        index.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--latent", type=int, default=16, help="Intrinsic dimension of the synthetic corpus")
+    parser.add_argument("--noise", type=float, default=0.1, help="Per-dimension isotropic noise")
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=None, help="IVF clusters (default 4 * sqrt(rows))")
+    parser.add_argument("--nprobe", default="4,16,32,64", type=lambda v: [int(n) for n in v.split(",")])
+    main(parser.parse_args())
@@ -0,0 +1,423 @@
+"""
+Benchmark Suite
+Microbenchmarks of the call-path hot spots, with JSON baselines and a
+regression check
+
+    greeting            _generate_call_greeting() (script and disclosure)
+    pii_mask_text       PIIMasker.mask_text() on a conversational turn with PII
+    twiml_play          get_twiml_for_call() for a call with Sarvam audio
+    twiml_fallback      get_twiml_for_call() after a TTS fallback (<Say>)
+    session_create      _create_call_session() (session and call trace)
+    session_update      handle_call_status() (status, trace event, audit record)
+    session_lookup      get_call_details()
+    audio_serve         get_call_audio() for a 160 KB greeting
+    audit_log_call      audit_log() as called from a request handler
+    audit_log_format    the log writer's redaction and JSON formatting of an
+                        audit record
+
+Each benchmark runs in batches sized to take about `--target` seconds and
+reports the best and median time per call over `--repeat` batches. Route
+handlers are awaited directly, without HTTP. Each batch starts with the log
+writer idle; records a batch enqueues are written while it runs, as in
+production.
+
+Every batch is followed by a batch of a fixed calibration loop (JSON and
+string work that never changes), and comparisons use the median ratio of
+the two. A neighbour stealing the CPU or a throttled clock slows both, so
+the ratio moves far less than raw times do on shared runners. The spread
+of the ratios (interquartile range / median) is the benchmark's noise: a
+change is only a regression if it exceeds both --threshold and
+NOISE_FACTOR times the noise of the baseline or current run, and it is
+re-measured up to twice before being reported.
+
+Usage (from backend/):
+    python -m benchmarks.suite run
+    python -m benchmarks.suite save                  # benchmarks/baselines/baseline.json
+    python -m benchmarks.suite compare --threshold 0.25
+    python -m benchmarks.suite run --output current.json
+    python -m benchmarks.suite compare --results current.json
+
+compare exits with status 1 when a benchmark is slower than its baseline by
+more than the threshold. Baselines are machine specific and are not
+committed: save one on the machine that runs compare (e.g. in CI, from the
+target branch, before measuring the change).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+_scratch = tempfile.mkdtemp(prefix="bench-suite-")
+os.environ.setdefault("LOG_DIR", os.path.join(_scratch, "logs"))
+os.environ.setdefault("AUDIT_STORE_DIR", os.path.join(_scratch, "audit"))
+os.environ.setdefault("CONSENT_DB_PATH", os.path.join(_scratch, "consent.db"))
+
+from app.core import logging as log_config
+from app.core.logging import setup_logging, logger, audit_log
+from app.core.security import PIIMasker
+from app.core.tracing import trace_store
+from app.api.voice import (
+    OutboundCallRequest,
+    call_sessions,
+    _create_call_session,
+    _generate_call_greeting,
+    get_twiml_for_call,
+    handle_call_status,
+    get_call_details,
+    get_call_audio
+)
+
+BASELINE = Path(__file__).parent / "baselines" / "baseline.json"
+# Re-measurements of an apparent regression before it is reported
+CONFIRM_RUNS = 2
+# A change must exceed this many times the measured noise to count
+NOISE_FACTOR = 2.0
+
+PII_TURN = (
+    "Hi, this is Rahul Sharma. My number is 9876543210 and my email is rahul.sharma@example.com. "
+    "The EMI for loan account 123456789012 was debited twice, PAN ABCDE1234F. "
+    "Can you reverse the second debit before the 5th?"
+)
+
+BENCHMARKS: Dict[str, Callable[[], Callable]] = {}
+
+
+def benchmark(name: str):
+    """Register a setup function returning the operation to time (sync or async)"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _request(language: str = "en") -> OutboundCallRequest:
+    return OutboundCallRequest(
+        phone_number="+919876543210",
+        purpose="personal_loan_reminder",
+        language=language,
+        customer_data={"name": "Rahul", "amount": "12,500", "due_date": "5th March"},
+        public_url="https://abc123.ngrok-free.app"
+    )
+
+
+def _session(audio_bytes: bytes) -> str:
+    call_id = _create_call_session(_request())
+    call_sessions[call_id].update(audio_bytes=audio_bytes, greeting="Hello Rahul, your EMI is due.")
+    return call_id
+
+
+# ==================== BENCHMARKS ====================
+
+@benchmark("greeting")
+def bench_greeting():
+    request = _request("hi")
+    return lambda: _generate_call_greeting(request)
+
+
+@benchmark("pii_mask_text")
+def bench_pii_mask_text():
+    return lambda: PIIMasker.mask_text(PII_TURN)
+
+
+@benchmark("twiml_play")
+def bench_twiml_play():
+    call_id = _session(bytes(160 * 1024))
+    return lambda: get_twiml_for_call(call_id=call_id)
+
+
+@benchmark("twiml_fallback")
+def bench_twiml_fallback():
+    call_id = _session(b"RIFF")
+    return lambda: get_twiml_for_call(call_id=call_id)
+
+
+@benchmark("session_create")
+def bench_session_create():
+    request = _request()
+    # Removed again so the table stays the same size
+    return lambda: call_sessions.pop(_create_call_session(request))
+
+
+@benchmark("session_update")
+def bench_session_update():
+    call_id = _session(bytes(160 * 1024))
+    return lambda: handle_call_status(call_id=call_id, CallSid="CA" + "0" * 32, CallStatus="ringing",
+                                      From="+15550001111", To="+919876543210")
+
+
+@benchmark("session_lookup")
+def bench_session_lookup():
+    call_id = _session(bytes(160 * 1024))
+    return lambda: get_call_details(call_id=call_id)
+
+
+@benchmark("audio_serve")
+def bench_audio_serve():
+    call_id = _session(bytes(160 * 1024))
+    return lambda: get_call_audio(call_id=call_id)
+
+
+@benchmark("audit_log_call")
+def bench_audit_log_call():
+    metadata = {"call_id": "0" * 36, "twilio_sid": "CA" + "0" * 32, "status": "ringing"}
+    return lambda: audit_log(event="call_status_ringing", user_id="+919876543210", metadata=metadata)
+
+
+@benchmark("audit_log_format")
+def bench_audit_log_format():
+    records = []
+    sink = logger.add(lambda message: records.append(message.record), filter=lambda record: record["extra"].get("AUDIT"))
+    audit_log(event="call_status_ringing", user_id="+919876543210",
+              metadata={"call_id": "0" * 36, "twilio_sid": "CA" + "0" * 32, "status": "ringing"})
+    logger.remove(sink)
+    record = records[0]
+    pipeline = log_config._pipeline
+    mask_many = pipeline._masker()
+
+    def format_record():
+        message = mask_many([record["message"]])[0]
+        return json.dumps(pipeline._entry(record, message), ensure_ascii=False, default=str)
+
+    return format_record
+
+
+# ==================== TIMING ====================
+
+_CALIBRATION_DATA = {"call_id": "0" * 36, "status": "ringing", "turns": [{"role": "user", "text": PII_TURN}] * 4}
+
+
+def calibration():
+    """Reference work timed next to every batch: it tracks the machine, not the code"""
+    text = json.dumps(_CALIBRATION_DATA)
+    json.loads(text)
+    " ".join(word.lower() for word in PII_TURN.split()).encode()
+
+
+def settle():
+    """Wait for the log writer to go idle so earlier records don't steal time"""
+    log_config._pipeline._drain()
+
+
+def _spread(values) -> float:
+    """Interquartile range relative to the median"""
+    if len(values) < 4:
+        return 0.0
+    q1, median, q3 = statistics.quantiles(values, n=4)
+    return (q3 - q1) / median if median else 0.0
+
+
+def measure(op: Callable, repeat: int, target: float) -> dict:
+    """
+    Time `op` in calibrated batches, each followed by a calibration batch
+
+    Returns:
+        best_ns / median_ns per call, ratio (median time per call over the
+        calibration loop's), spread (noise of the ratios), loops per batch
+        and batches
+    """
+    # Route handlers come wrapped in lambdas: tell them apart by what they return
+    probe = op()
+    is_async = asyncio.iscoroutine(probe)
+    if is_async:
+        probe.close()
+    loop = asyncio.new_event_loop()
+
+    def batch(loops: int) -> int:
+        settle()
+        if is_async:
+            async def run():
+                start = time.perf_counter_ns()
+                for _ in range(loops):
+                    await op()
+                return time.perf_counter_ns() - start
+            return loop.run_until_complete(run())
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            op()
+        return time.perf_counter_ns() - start
+
+    def reference(loops: int) -> int:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            calibration()
+        return time.perf_counter_ns() - start
+
+    def size(timer) -> int:
+        loops = 1
+        while True:
+            elapsed = timer(loops)
+            if elapsed >= target * 1e9 / 5 or loops >= 10 ** 7:
+                break
+            loops *= 10
+        return max(1, int(loops * target * 1e9 / max(elapsed, 1)))
+
+    try:
+        loops = size(batch)
+        reference_loops = size(reference)
+        per_call, ratios = [], []
+        for _ in range(repeat):
+            elapsed = batch(loops) / loops
+            per_call.append(elapsed)
+            ratios.append(elapsed / (reference(reference_loops) / reference_loops))
+    finally:
+        loop.close()
+    return {
+        "best_ns": round(min(per_call), 1),
+        "median_ns": round(statistics.median(per_call), 1),
+        "ratio": round(statistics.median(ratios), 5),
+        "spread": round(_spread(ratios), 4),
+        "loops": loops,
+        "repeat": repeat
+    }
+
+
+def run_suite(names, repeat: int, target: float, verbose: bool = True) -> dict:
+    results = {}
+    for name in names:
+        results[name] = measure(BENCHMARKS[name](), repeat, target)
+        if verbose:
+            stats = results[name]
+            print(f"{name:<20} {stats['best_ns']:>12,.0f} {stats['median_ns']:>12,.0f} "
+                  f"{stats['ratio']:>10.3f} {stats['spread']:>7.1%} {stats['loops']:>10,}")
+    return results
+
+
+def report(results: dict) -> dict:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": results
+    }
+
+
+# ==================== COMMANDS ====================
+
+def select(pattern: Optional[str]) -> list:
+    names = [name for name in BENCHMARKS if not pattern or re.search(pattern, name)]
+    if not names:
+        sys.exit(f"No benchmark matches {pattern!r}")
+    return names
+
+
+HEADER = f"{'benchmark':<20} {'best ns':>12} {'median ns':>12} {'ratio':>10} {'noise':>7} {'loops':>10}"
+
+
+def cmd_run(args) -> int:
+    print(HEADER)
+    results = run_suite(select(args.filter), args.repeat, args.target)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report(results), indent=2) + "\n")
+        print(f"Results written to {args.output}")
+    return 0
+
+
+def cmd_save(args) -> int:
+    path = Path(args.baseline)
+    print(HEADER)
+    results = run_suite(select(args.filter), args.repeat, args.target)
+    if path.exists() and args.filter:
+        # Re-baselining a subset keeps the other entries
+        results = {**json.loads(path.read_text())["results"], **results}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report(results), indent=2) + "\n")
+    print(f"Baseline written to {path}")
+    return 0
+
+
+def cmd_compare(args) -> int:
+    path = Path(args.baseline)
+    if not path.exists():
+        sys.exit(f"No baseline at {path}; create one with `python -m benchmarks.suite save` on this machine")
+    baseline = json.loads(path.read_text())
+    if args.results:
+        current = json.loads(Path(args.results).read_text())["results"]
+        names = [name for name in current if not args.filter or re.search(args.filter, name)]
+    else:
+        names = select(args.filter)
+        print(f"Measuring {len(names)} benchmarks...")
+        current = run_suite(names, args.repeat, args.target, verbose=False)
+
+    print(f"Baseline: {baseline['created_at']}, Python {baseline['python']}, {baseline['platform']}")
+    print(f"{'benchmark':<20} {'baseline ns':>12} {'current ns':>12} {'change':>9} {'allowed':>9}")
+
+    def verdict(before: dict, after: dict):
+        change = after["ratio"] / before["ratio"] - 1
+        allowed = max(args.threshold, NOISE_FACTOR * max(before["spread"], after["spread"]))
+        return change, allowed
+
+    regressions = []
+    for name in names:
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<20} {'-':>12} {current[name]['median_ns']:>12,.0f} {'new':>9}")
+            continue
+        if "ratio" not in before:
+            sys.exit(f"Baseline {path} predates calibrated measurements; save it again")
+        change, allowed = verdict(before, current[name])
+        for _ in range(CONFIRM_RUNS if not args.results else 0):
+            if change <= allowed:
+                break
+            # Confirm before flagging: a slow series of batches is usually a noisy neighbour
+            again = measure(BENCHMARKS[name](), args.repeat, args.target)
+            if again["ratio"] < current[name]["ratio"]:
+                current[name] = again
+                change, allowed = verdict(before, again)
+        flag = ""
+        if change > allowed:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -allowed:
+            flag = "  faster"
+        print(f"{name:<20} {before['median_ns']:>12,.0f} {current[name]['median_ns']:>12,.0f} "
+              f"{change:>+9.1%} {allowed:>9.0%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond the allowed change: {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions beyond the allowed change")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, handler in (("run", cmd_run), ("save", cmd_save), ("compare", cmd_compare)):
+        command = commands.add_parser(name)
+        command.set_defaults(handler=handler)
+        command.add_argument("--filter", default=None, help="Regex selecting benchmarks")
+        command.add_argument("--repeat", type=int, default=15, help="Timed batches per benchmark")
+        command.add_argument("--target", type=float, default=0.05, help="Seconds per batch")
+        if name == "run":
+            command.add_argument("--output", default=None, help="Write results JSON here")
+        else:
+            command.add_argument("--baseline", default=str(BASELINE))
+        if name == "compare":
+            command.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+            command.add_argument("--results", default=None, help="Compare a saved run instead of measuring")
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        return args.handler(args)
+    finally:
+        logger.remove()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
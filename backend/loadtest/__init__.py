@@ -0,0 +1,6 @@
+"""
+Load Testing Package
+Local provider stand-ins and load drivers (no paid API calls)
+"""
+
+__all__ = ["fake_providers"]
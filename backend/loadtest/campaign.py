@@ -0,0 +1,312 @@
+"""
+Campaign Load Test
+Runs an outbound calling campaign against the app with every provider
+replaced by a local stand-in (loadtest.fake_providers), and reports
+throughput, per-stage latency percentiles and the app's memory
+
+The app runs as its own uvicorn process, as in production, pointed at fake
+Sarvam and Twilio servers in this process. The fake Twilio plays every
+call back at the app (signed status callbacks, TwiML fetch, audio
+download), so each call exercises the whole webhook path.
+
+    dialing      POST /api/voice/outbound latency and accepted calls/s
+    calls        outcomes once every call has hung up, and completed calls/s
+    webhooks     callback, TwiML and audio latencies as seen by Twilio
+    app stages   voice_stage_duration_seconds percentiles scraped from
+                 /metrics (estimated within histogram buckets)
+    memory       app RSS at start, peak and end, and growth per call
+
+Usage (from backend/):
+    python -m loadtest.campaign --calls 10000 --concurrency 50
+    python -m loadtest.campaign --calls 2000 --cps 40 --tts-latency-ms lognormal:400:2500 \\
+        --tts-error-rate 0.02 --twilio-error-rate 0.01 --no-answer-rate 0.2 --json report.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadtest.fake_providers import create_fake_app, FakeTwilio, FakeProviderServer, _free_port
+
+AUTH_TOKEN = "loadtest-auth-token"
+STAGES = ("greeting", "tts", "twilio_call_create", "twiml_fetch", "audio_fetch")
+
+
+def percentiles(values: List[float], points=(50, 95, 99)) -> Dict[str, float]:
+    """Percentiles in milliseconds of latencies in seconds"""
+    if not values:
+        return {f"p{p}": 0.0 for p in points}
+    ordered = sorted(values)
+    return {f"p{p}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000 for p in points}
+
+
+def histogram_percentiles(metrics: str, name: str, label: str, points=(50, 95, 99)) -> Dict[str, dict]:
+    """
+    Percentiles (ms) per label value from a Prometheus histogram
+
+    Linear interpolation inside the bucket holding each rank, as
+    histogram_quantile() does.
+    """
+    pattern = re.compile(rf'^{name}_bucket\{{{label}="([^"]*)",le="([^"]+)"\}} (\S+)$', re.M)
+    buckets: Dict[str, List[tuple]] = {}
+    for value, le, count in pattern.findall(metrics):
+        buckets.setdefault(value, []).append((float(le), float(count)))
+
+    result = {}
+    for value, series in buckets.items():
+        series.sort()
+        total = series[-1][1]
+        stats = {"count": int(total)}
+        for p in points:
+            rank = total * p / 100
+            lower, below = 0.0, 0.0
+            for bound, cumulative in series:
+                if cumulative >= rank:
+                    if bound == float("inf"):
+                        estimate = lower
+                    else:
+                        inside = cumulative - below
+                        estimate = lower + (bound - lower) * ((rank - below) / inside if inside else 0)
+                    break
+                lower, below = bound, cumulative
+            stats[f"p{p}"] = estimate * 1000 if total else 0.0
+        result[value] = stats
+    return result
+
+
+def read_rss(pid: int) -> Dict[str, int]:
+    """Resident and peak resident memory (bytes) of a process, from /proc"""
+    memory = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "VmHWM:")):
+                key, value = line.split(":")
+                memory[key] = int(value.split()[0]) * 1024
+    return {"rss": memory.get("VmRSS", 0), "peak": memory.get("VmHWM", 0)}
+
+
+def start_app(
+    port: int,
+    providers_url: str,
+    twilio_url: str,
+    data_dir: str,
+    extra_env: Optional[Dict[str, str]] = None
+) -> subprocess.Popen:
+    """Start the app under test in its own uvicorn process"""
+    env = dict(os.environ)
+    env.update({
+        "GROQ_API_KEY": "loadtest",
+        "SARVAM_API_KEY": "loadtest",
+        "TWILIO_ACCOUNT_SID": "AC" + "0" * 32,
+        "TWILIO_AUTH_TOKEN": AUTH_TOKEN,
+        "TWILIO_PHONE_NUMBER": "+15550001111",
+        "GROQ_BASE_URL": providers_url,
+        "SARVAM_API_URL": providers_url,
+        "TWILIO_API_BASE_URL": twilio_url,
+        "PUBLIC_URL": f"http://127.0.0.1:{port}",
+        "RATE_LIMIT_ENABLED": "False",
+        "AUTH_ENABLED": "False",
+        "DEBUG": "False",
+        "LOG_DIR": os.path.join(data_dir, "logs"),
+        "AUDIT_STORE_DIR": os.path.join(data_dir, "audit"),
+        "CONSENT_DB_PATH": os.path.join(data_dir, "consent.db"),
+        "DND_REGISTRY_DIR": os.path.join(data_dir, "dnd"),
+    })
+    env.update(extra_env or {})
+    env.setdefault("LOG_LEVEL", "WARNING")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        env=env
+    )
+
+
+async def wait_healthy(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited with code {process.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("App did not become healthy")
+
+
+async def run_campaign(args, client: httpx.AsyncClient, app_url: str, twilio: FakeTwilio, pid: int) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    memory = [read_rss(pid)]
+    purposes = ["personal_loan_reminder", "credit_card_reminder", "home_loan_reminder", "sip_debit_reminder"]
+    languages = ["en", "hi", "ta"]
+    calls = iter(range(args.calls))
+    start = time.perf_counter()
+
+    async def dialer():
+        for i in calls:
+            if args.cps:
+                delay = start + i / args.cps - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            sent = time.perf_counter()
+            try:
+                response = await client.post("/api/voice/outbound", json={
+                    "phone_number": f"+9198{i:08d}",
+                    "purpose": purposes[i % len(purposes)],
+                    "sector": "banking",
+                    "language": languages[i % len(languages)],
+                    "customer_data": {"name": f"Customer {i}", "amount": str(1000 + i % 9000)},
+                    "public_url": app_url
+                })
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - sent)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    async def sample_memory():
+        while True:
+            await asyncio.sleep(0.5)
+            memory.append(read_rss(pid))
+
+    sampler = asyncio.create_task(sample_memory())
+    await asyncio.gather(*(dialer() for _ in range(args.concurrency)))
+    dialed = time.perf_counter() - start
+
+    # Wait for every call to hang up (the fake Twilio counts them)
+    deadline = time.monotonic() + args.drain_timeout
+    while twilio.active and time.monotonic() < deadline:
+        await asyncio.sleep(0.2)
+    finished = time.perf_counter() - start
+    sampler.cancel()
+    memory.append(read_rss(pid))
+
+    metrics = (await client.get("/metrics")).text
+    accepted = statuses.get(200, 0)
+    return {
+        "calls": args.calls,
+        "concurrency": args.concurrency,
+        "cps": args.cps,
+        "dialing": {
+            "seconds": round(dialed, 2),
+            "statuses": {str(k): v for k, v in sorted(statuses.items())},
+            "accepted_per_second": round(accepted / dialed, 1),
+            "latency_ms": percentiles(latencies)
+        },
+        "calls_finished": {
+            "seconds": round(finished, 2),
+            "outcomes": dict(sorted(twilio.outcomes.items())),
+            "still_active": twilio.active,
+            "completed_per_second": round(twilio.outcomes.get("completed", 0) / finished, 1),
+            "audio_mb": round(twilio.audio_bytes / 1e6, 1)
+        },
+        "webhooks_ms": {
+            kind: {**percentiles(values), "count": len(values), "failures": twilio.failures[kind]}
+            for kind, values in twilio.latencies.items()
+        },
+        "app_stages_ms": {
+            stage: stats
+            for stage, stats in histogram_percentiles(metrics, "voice_stage_duration_seconds", "stage").items()
+            if stage in STAGES
+        },
+        "memory_mb": {
+            "start": round(memory[0]["rss"] / 1e6, 1),
+            "peak": round(max(sample["peak"] for sample in memory) / 1e6, 1),
+            "end": round(memory[-1]["rss"] / 1e6, 1),
+            "per_call_kb": round((memory[-1]["rss"] - memory[0]["rss"]) / max(1, accepted) / 1024, 2)
+        }
+    }
+
+
+def print_report(report: dict):
+    def row(label: str, stats: dict, extra: str = "") -> str:
+        return f"  {label:<22} p50 {stats['p50']:>8.1f}  p95 {stats['p95']:>8.1f}  p99 {stats['p99']:>8.1f} ms{extra}"
+
+    dialing, finished, memory = report["dialing"], report["calls_finished"], report["memory_mb"]
+    print(f"\nCampaign: {report['calls']:,} calls, concurrency {report['concurrency']}"
+          + (f", {report['cps']} calls/s" if report["cps"] else ""))
+    print(f"Dialing ({dialing['seconds']:.1f} s): statuses {dialing['statuses']}, "
+          f"{dialing['accepted_per_second']:,.1f} accepted calls/s")
+    print(row("POST /outbound", dialing["latency_ms"]))
+    print(f"Calls ({finished['seconds']:.1f} s): {finished['outcomes']}, {finished['still_active']} still active, "
+          f"{finished['completed_per_second']:,.1f} completed calls/s, {finished['audio_mb']} MB audio served")
+    print("Webhooks (seen by Twilio)")
+    for kind, stats in report["webhooks_ms"].items():
+        print(row(kind, stats, f"  {stats['count']:>7,} ok, {stats['failures']:,} failed"))
+    print("App stages (/metrics)")
+    for stage in STAGES:
+        if stage in report["app_stages_ms"]:
+            stats = report["app_stages_ms"][stage]
+            print(row(stage, stats, f"  {stats['count']:>7,}"))
+    print(f"Memory (app RSS): start {memory['start']} MB, peak {memory['peak']} MB, end {memory['end']} MB, "
+          f"{memory['per_call_kb']} KB per accepted call")
+
+
+async def main(args):
+    providers = FakeProviderServer(create_fake_app(
+        llm_latency_ms=args.llm_latency_ms,
+        tts_latency_ms=args.tts_latency_ms,
+        error_rate=args.tts_error_rate,
+        seed=args.seed
+    )).start()
+    twilio = FakeTwilio(
+        AUTH_TOKEN,
+        create_latency_ms=args.twilio_latency_ms,
+        ring_ms=args.ring_ms,
+        talk_ms=args.talk_ms,
+        error_rate=args.twilio_error_rate,
+        no_answer_rate=args.no_answer_rate,
+        seed=args.seed
+    )
+    twilio_server = FakeProviderServer(twilio.create_app()).start()
+
+    port = _free_port()
+    app_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory(prefix="campaign-") as data_dir:
+        process = start_app(port, providers.base_url, twilio_server.base_url, data_dir)
+        limits = httpx.Limits(max_connections=args.concurrency + 4)
+        try:
+            async with httpx.AsyncClient(base_url=app_url, timeout=120.0, limits=limits) as client:
+                await wait_healthy(client, process)
+                report = await run_campaign(args, client, app_url, twilio, process.pid)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            twilio_server.stop()
+            providers.stop()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=50, help="Outbound requests in flight")
+    parser.add_argument("--cps", type=float, default=0, help="Dialing pace in calls/s (0: as fast as possible)")
+    parser.add_argument("--tts-latency-ms", default="lognormal:250:1200", help="300, uniform:LO:HI or lognormal:P50:P99")
+    parser.add_argument("--llm-latency-ms", default="lognormal:300:1500")
+    parser.add_argument("--twilio-latency-ms", default="lognormal:150:600", help="Calls API create")
+    parser.add_argument("--ring-ms", default="uniform:500:3000")
+    parser.add_argument("--talk-ms", default="uniform:3000:10000")
+    parser.add_argument("--tts-error-rate", type=float, default=0.0)
+    parser.add_argument("--twilio-error-rate", type=float, default=0.0)
+    parser.add_argument("--no-answer-rate", type=float, default=0.1)
+    parser.add_argument("--drain-timeout", type=float, default=120.0, help="Seconds to wait for calls to hang up")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", default=None, help="Also write the report to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,459 @@
+"""
+Fake Provider Servers
+Local stand-ins for the Groq, Sarvam and Twilio APIs used by load tests
+
+Every route takes its latency from a distribution and can inject errors,
+so load tests see the tail latencies and failures of the real providers
+without spending credits. The Twilio stand-in also plays each call back at
+the app: signed status callbacks, the TwiML fetch and the audio download.
+"""
+
+import asyncio
+import base64
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from email.utils import formatdate
+from typing import Dict, List, Optional, Union
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from twilio.request_validator import RequestValidator
+
+
+FAKE_COMPLETION = (
+    "Your EMI is due on the 5th of every month. "
+    "You can pay through net banking, UPI or the mobile app. "
+    "Please keep sufficient balance to avoid late charges."
+)
+
+FAKE_TRANSCRIPT = "When is my EMI due this month?"
+
+# Tiny valid WAV payload (44-byte header + silence)
+FAKE_WAV = (
+    b"RIFF\x24\x01\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00"
+    b"\x40\x1f\x00\x00\x80\x3e\x00\x00\x02\x00\x10\x00data\x00\x01\x00\x00"
+    + b"\x00" * 256
+)
+
+
+# ==================== LATENCY AND FAULTS ====================
+
+class Latency:
+    """
+    Latency distribution in milliseconds, built from a spec
+
+        300                  constant
+        "uniform:20:80"      uniform between the bounds
+        "lognormal:120:600"  lognormal with median 120 and 99th percentile 600
+    """
+
+    # z-score of the 99th percentile of a standard normal
+    _Z99 = 2.3263
+
+    def __init__(self, spec: Union[str, float], rng: random.Random = None):
+        self.spec = str(spec)
+        self.rng = rng or random.Random()
+        kind, _, params = self.spec.partition(":")
+        if not params:
+            value = float(kind)
+            self._sample = lambda: value
+        elif kind == "uniform":
+            low, high = (float(p) for p in params.split(":"))
+            self._sample = lambda: self.rng.uniform(low, high)
+        elif kind == "lognormal":
+            median, p99 = (float(p) for p in params.split(":"))
+            mu, sigma = math.log(median), math.log(p99 / median) / self._Z99
+            self._sample = lambda: self.rng.lognormvariate(mu, sigma)
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.spec}")
+
+    @classmethod
+    def of(cls, value: Union["Latency", str, float], rng: random.Random = None) -> "Latency":
+        return value if isinstance(value, Latency) else cls(value, rng)
+
+    def sample(self) -> float:
+        """One latency, in seconds"""
+        return self._sample() / 1000
+
+    async def wait(self):
+        await asyncio.sleep(self.sample())
+
+    def __repr__(self) -> str:
+        return f"Latency({self.spec!r})"
+
+
+class Faults:
+    """Error injection: a fraction of requests is answered with an error status"""
+
+    def __init__(self, rate: float = 0.0, statuses=(500, 503, 429), rng: random.Random = None):
+        self.rate = rate
+        self.statuses = tuple(statuses)
+        self.rng = rng or random.Random()
+
+    def pick(self) -> Optional[int]:
+        """Error status for this request, or None to answer normally"""
+        if self.rate and self.rng.random() < self.rate:
+            return self.rng.choice(self.statuses)
+        return None
+
+
+def _retry_headers(status: int) -> dict:
+    return {"Retry-After": "1"} if status == 429 else {}
+
+
+# ==================== GROQ AND SARVAM ====================
+
+def create_fake_app(
+    llm_latency_ms: Union[Latency, str, float] = 300.0,
+    tts_latency_ms: Union[Latency, str, float] = 50.0,
+    stt_latency_ms: Union[Latency, str, float] = 200.0,
+    error_rate: float = 0.0,
+    seed: Optional[int] = None
+) -> FastAPI:
+    """
+    Create the stand-in provider app
+
+    Args:
+        llm_latency_ms: Time to produce a completion (spread over the
+            chunks when streaming)
+        tts_latency_ms: Time to synthesize speech
+        stt_latency_ms: Time to transcribe speech
+        error_rate: Fraction of requests answered with 500, 503 or 429
+        seed: Seed for latencies and faults (None for a random run)
+
+    Returns:
+        FastAPI app serving Groq- and Sarvam-compatible routes; request and
+        error counts per route are in app.state.stats
+    """
+    rng = random.Random(seed)
+    llm_latency = Latency.of(llm_latency_ms, rng)
+    tts_latency = Latency.of(tts_latency_ms, rng)
+    stt_latency = Latency.of(stt_latency_ms, rng)
+    faults = Faults(error_rate, rng=rng)
+
+    app = FastAPI(title="Fake Providers")
+    app.state.stats = stats = {"requests": {}, "errors": {}}
+
+    def fault(route: str) -> Optional[int]:
+        stats["requests"][route] = stats["requests"].get(route, 0) + 1
+        status = faults.pick()
+        if status is not None:
+            stats["errors"][route] = stats["errors"].get(route, 0) + 1
+        return status
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "fake")
+
+        status = fault("chat_completions")
+        if status is not None:
+            await asyncio.sleep(llm_latency.sample() / 10)
+            return JSONResponse(
+                {"error": {"message": "Injected fault", "type": "server_error", "code": status}},
+                status_code=status,
+                headers=_retry_headers(status)
+            )
+
+        if body.get("stream"):
+            words = FAKE_COMPLETION.split(" ")
+            total = llm_latency.sample()
+
+            async def events():
+                for word in words:
+                    await asyncio.sleep(total / len(words))
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await llm_latency.wait()
+
+        json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+        content = (
+            json.dumps({"intent": "general_query", "confidence": 0.9, "entities": {}, "requires_human": False})
+            if json_mode else FAKE_COMPLETION
+        )
+
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 200, "completion_tokens": 40, "total_tokens": 240}
+        })
+
+    @app.post("/text-to-speech")
+    async def text_to_speech(request: Request):
+        await request.body()
+        await tts_latency.wait()
+        status = fault("text_to_speech")
+        if status is not None:
+            return JSONResponse(
+                {"error": {"message": "Injected fault", "code": "internal_server_error"}},
+                status_code=status,
+                headers=_retry_headers(status)
+            )
+        return {"request_id": uuid.uuid4().hex, "audios": [base64.b64encode(FAKE_WAV).decode("utf-8")]}
+
+    @app.post("/speech-to-text")
+    async def speech_to_text(request: Request):
+        await request.body()
+        await stt_latency.wait()
+        status = fault("speech_to_text")
+        if status is not None:
+            return JSONResponse(
+                {"error": {"message": "Injected fault", "code": "internal_server_error"}},
+                status_code=status,
+                headers=_retry_headers(status)
+            )
+        return {"request_id": uuid.uuid4().hex, "transcript": FAKE_TRANSCRIPT, "language_code": "en-IN"}
+
+    return app
+
+
+# ==================== TWILIO ====================
+
+_PLAY_URL = re.compile(r"<Play[^>]*>\s*([^<\s]+)\s*</Play>")
+
+
+class FakeTwilio:
+    """
+    Stand-in for the Twilio Calls API that plays each call back at the app
+
+    POST /2010-04-01/Accounts/{sid}/Calls.json answers like Twilio (201
+    with a queued call resource) and starts the call's lifecycle:
+
+        initiated   status callback right away
+        ringing     after `ring`
+        no-answer   final status for a `no_answer_rate` fraction of calls
+        answered    the TwiML URL is fetched (POST, as requested by the
+                    app), every <Play> URL in it downloaded, then the
+                    answered (in-progress) callback
+        completed   after `talk`, with CallDuration
+
+    Callbacks and fetches carry X-Twilio-Signature computed with
+    `auth_token`, so the app's signature validation is exercised. Their
+    latencies as seen from the Twilio side and any failures are kept in
+    `latencies` and `failures`; `active` counts calls still in progress.
+    """
+
+    def __init__(
+        self,
+        auth_token: str,
+        create_latency_ms: Union[Latency, str, float] = "lognormal:150:600",
+        ring_ms: Union[Latency, str, float] = "uniform:500:3000",
+        talk_ms: Union[Latency, str, float] = "uniform:3000:10000",
+        error_rate: float = 0.0,
+        no_answer_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.rng = random.Random(seed)
+        self.validator = RequestValidator(auth_token)
+        self.create_latency = Latency.of(create_latency_ms, self.rng)
+        self.ring = Latency.of(ring_ms, self.rng)
+        self.talk = Latency.of(talk_ms, self.rng)
+        self.faults = Faults(error_rate, statuses=(500, 503, 429), rng=self.rng)
+        self.no_answer_rate = no_answer_rate
+
+        self.created = 0
+        self.rejected = 0
+        self.active = 0
+        self.outcomes: Dict[str, int] = {}
+        self.latencies: Dict[str, List[float]] = {"status_callback": [], "twiml_fetch": [], "audio_fetch": []}
+        self.failures: Dict[str, int] = {"status_callback": 0, "twiml_fetch": 0, "audio_fetch": 0}
+        self.audio_bytes = 0
+        self._tasks = set()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def create_app(self) -> FastAPI:
+        app = FastAPI(title="Fake Twilio")
+
+        @app.post("/2010-04-01/Accounts/{account_sid}/Calls.json")
+        async def create_call(account_sid: str, request: Request):
+            form = await request.form()
+            await self.create_latency.wait()
+
+            status = self.faults.pick()
+            if status is not None:
+                self.rejected += 1
+                return JSONResponse(
+                    {"code": 20429 if status == 429 else 20500, "message": "Injected fault",
+                     "more_info": "https://www.twilio.com/docs/errors/20500", "status": status},
+                    status_code=status,
+                    headers=_retry_headers(status)
+                )
+
+            sid = "CA" + uuid.uuid4().hex
+            call = {
+                "sid": sid,
+                "account_sid": account_sid,
+                "to": form.get("To"),
+                "from": form.get("From"),
+                "url": form.get("Url"),
+                "method": (form.get("Method") or "POST").upper(),
+                "status_callback": form.get("StatusCallback"),
+                "events": set(form.getlist("StatusCallbackEvent")) or {"completed"},
+            }
+            self.created += 1
+            self.active += 1
+            task = asyncio.create_task(self._play(call))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+            return JSONResponse({
+                "sid": sid,
+                "account_sid": account_sid,
+                "to": call["to"],
+                "from": call["from"],
+                "status": "queued",
+                "direction": "outbound-api",
+                "api_version": "2010-04-01",
+                "date_created": formatdate(usegmt=True),
+                "uri": f"/2010-04-01/Accounts/{account_sid}/Calls/{sid}.json"
+            }, status_code=201)
+
+        return app
+
+    # ==================== CALL LIFECYCLE ====================
+
+    async def _play(self, call: dict):
+        started = time.monotonic()
+        outcome = "failed"
+        try:
+            await self._status(call, "initiated", "initiated")
+            await self.ring.wait()
+            await self._status(call, "ringing", "ringing")
+
+            if self.rng.random() < self.no_answer_rate:
+                await self.ring.wait()
+                outcome = "no-answer"
+                return
+
+            twiml = await self._fetch(call, "twiml_fetch", call["method"], call["url"], self._params(call, "in-progress"))
+            if twiml is None:
+                return
+            for url in _PLAY_URL.findall(twiml.text):
+                audio = await self._fetch(call, "audio_fetch", "GET", url.replace("&amp;", "&"), {})
+                if audio is not None:
+                    self.audio_bytes += len(audio.content)
+            await self._status(call, "answered", "in-progress")
+
+            await self.talk.wait()
+            outcome = "completed"
+        except Exception:
+            outcome = "failed"
+        finally:
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            duration = str(int(time.monotonic() - started))
+            try:
+                await self._status(call, "completed", outcome, {"CallDuration": duration})
+            finally:
+                self.active -= 1
+
+    @staticmethod
+    def _params(call: dict, status: str) -> Dict[str, str]:
+        return {
+            "AccountSid": call["account_sid"],
+            "ApiVersion": "2010-04-01",
+            "CallSid": call["sid"],
+            "CallStatus": status,
+            "Direction": "outbound-api",
+            "From": call["from"] or "",
+            "To": call["to"] or "",
+        }
+
+    async def _status(self, call: dict, event: str, status: str, extra: Dict[str, str] = None):
+        if event not in call["events"] or not call["status_callback"]:
+            return
+        params = self._params(call, status)
+        params.update(extra or {})
+        params["Timestamp"] = formatdate(usegmt=True)
+        await self._fetch(call, "status_callback", "POST", call["status_callback"], params)
+
+    async def _fetch(self, call: dict, kind: str, method: str, url: str, params: Dict[str, str]):
+        """Signed request to the app; returns the response, or None on failure"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=30.0, limits=httpx.Limits(max_connections=200))
+        signed = params if method == "POST" else {}
+        headers = {"X-Twilio-Signature": self.validator.compute_signature(url, signed), "User-Agent": "TwilioProxy/1.1"}
+        start = time.perf_counter()
+        try:
+            if method == "POST":
+                response = await self._client.post(url, data=params, headers=headers)
+            else:
+                response = await self._client.get(url, headers=headers)
+        except httpx.HTTPError:
+            self.failures[kind] += 1
+            return None
+        self.latencies[kind].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.failures[kind] += 1
+            return None
+        return response
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeProviderServer:
+    """Runs the fake provider app in a background thread"""
+
+    def __init__(self, app: FastAPI, port: Optional[int] = None):
+        self.port = port or _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._server = uvicorn.Server(uvicorn.Config(
+            app,
+            host="127.0.0.1",
+            port=self.port,
+            log_level="warning",
+            access_log=False
+        ))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def start(self) -> "FakeProviderServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+__all__ = [
+    "Latency",
+    "Faults",
+    "create_fake_app",
+    "FakeTwilio",
+    "FakeProviderServer",
+    "FAKE_COMPLETION",
+    "FAKE_TRANSCRIPT",
+    "FAKE_WAV"
+]
@@ -0,0 +1,119 @@
+"""
+/query Throughput Load Test
+Measures concurrent /api/voice/query throughput against a local stand-in LLM
+
+Usage (from backend/):
+    python -m loadtest.query_throughput --concurrency 1,4,16,64 --requests 128
+
+With a non-blocking Groq client, throughput should grow roughly linearly with
+concurrency until GROQ_MAX_CONCURRENCY; a blocking client stays flat at
+1 / LLM latency regardless of concurrency.
+
+Every request asks a different question and the response cache and rate
+limiter are off, so each one reaches the stand-in LLM. The run exits 1 if
+any request did not return 200.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from loadtest.fake_providers import create_fake_app, FakeProviderServer
+
+TOPICS = ["EMI due date", "late payment charges", "auto-debit mandate", "loan foreclosure", "credit card bill"]
+
+
+def _query(i: int) -> str:
+    """A distinct question per request, so no two share a cache entry"""
+    return f"What is the {TOPICS[i % len(TOPICS)]} for request {i}?"
+
+
+async def _run_level(client, concurrency: int, total: int, first: int = 0) -> dict:
+    """Fire `total` queries with `concurrency` workers"""
+    latencies = []
+    statuses = {}
+    remaining = iter(range(first, first + total))
+
+    async def worker():
+        for i in remaining:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/voice/query",
+                json={"text": _query(i), "sector": "banking", "language": "en"}
+            )
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": sum(statuses.values()),
+        "statuses": statuses,
+        "throughput_rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000
+    }
+
+
+async def main(args) -> int:
+    import httpx
+    from app.main import app
+    from app.services.groq_service import groq_service
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=120) as client:
+        print(f"LLM latency {args.llm_latency_ms:.0f} ms, TTS latency {args.tts_latency_ms:.0f} ms")
+        print(f"{'conc':>5} {'reqs':>6} {'err':>4} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        failed = False
+        for level, concurrency in enumerate(args.concurrency):
+            result = await _run_level(client, concurrency, args.requests, first=level * args.requests)
+            print(
+                f"{result['concurrency']:>5} {result['requests']:>6} {result['errors']:>4} "
+                f"{result['throughput_rps']:>9.1f} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f}"
+            )
+            if result["errors"]:
+                failed = True
+                print(f"      non-200 responses: {result['statuses']}")
+
+    await groq_service.aclose()
+    if failed:
+        print("FAILED: some requests did not return 200; latencies above are not LLM round trips")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,4,16,64",
+                        type=lambda v: [int(c) for c in v.split(",")])
+    parser.add_argument("--requests", type=int, default=128, help="Requests per concurrency level")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--tts-latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    server = FakeProviderServer(create_fake_app(args.llm_latency_ms, args.tts_latency_ms)).start()
+
+    # Settings are read at import time, so point providers at the stand-in first
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ["SARVAM_API_URL"] = server.base_url
+    os.environ.setdefault("GROQ_MAX_CONCURRENCY", str(max(args.concurrency)))
+    for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+        os.environ.setdefault(key, "loadtest")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Measure the LLM client, not cache hits or 429s
+    os.environ["RESPONSE_CACHE_ENABLED"] = "False"
+    os.environ["RATE_LIMIT_ENABLED"] = "False"
+
+    try:
+        exit_code = asyncio.run(main(args))
+    finally:
+        server.stop()
+    sys.exit(exit_code)
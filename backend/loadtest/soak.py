@@ -0,0 +1,369 @@
+"""
+Soak Test
+Drives a compressed 24-hour dialing profile against the app, with every
+provider replaced by a local stand-in (loadtest.fake_providers), and fails
+if the app's memory grows faster than a budget per call
+
+The app runs in its own uvicorn process with the admin API on. Each
+simulated hour lasts --hour-seconds and dials at --peak-cps times that
+hour's share of the daily peak (HOURLY_PROFILE: nothing outside the 9:00
+to 21:00 calling window, a lunch dip, an afternoon peak), so the run also
+shows whether memory is given back over the idle night.
+
+After --warmup-calls calls, tracemalloc is started in the app
+(PUT /api/admin/tracemalloc) and every --sample-seconds the driver records
+GET /api/admin/memory:
+
+    rss          resident memory of the app process
+    traced       bytes allocated since warm-up and still alive, and the
+                 source lines that allocated the most of them
+    objects      live gc-tracked objects per type
+    stores       sizes of call_sessions, the consent cache and the
+                 conversation store
+    loop lag     worst event loop heartbeat delay since the last sample
+
+Growth per call is the least-squares slope of each series against calls
+dialled since warm-up; the run fails (exit 1) when RSS, traced bytes or
+any single object type grows faster than its budget, or the loop lag
+exceeds --max-loop-lag-ms.
+
+Usage (from backend/):
+    python -m loadtest.soak                                   # 24 simulated hours in 24 minutes
+    python -m loadtest.soak --hour-seconds 600 --peak-cps 20  # 4-hour soak
+    python -m loadtest.soak --hour-seconds 5 --peak-cps 20 --json soak.json
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadtest.campaign import AUTH_TOKEN, percentiles, start_app, wait_healthy
+from loadtest.fake_providers import create_fake_app, FakeTwilio, FakeProviderServer, _free_port
+
+# Share of the peak dialing rate per hour of the day (outbound calls only
+# between 9:00 and 21:00)
+HOURLY_PROFILE = (
+    0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0.4, 0.8, 1.0, 0.9, 0.6, 0.9, 1.0, 0.9, 0.8, 0.6, 0.5, 0.3,
+    0, 0, 0
+)
+
+PURPOSES = ["personal_loan_reminder", "credit_card_reminder", "home_loan_reminder", "sip_debit_reminder"]
+LANGUAGES = ["en", "hi", "ta"]
+
+
+def slope(xs: List[float], ys: List[float]) -> float:
+    """Least-squares slope of ys against xs (0 when xs do not vary)"""
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if not spread:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+class Soak:
+    """Dials the hourly profile and samples the app's memory"""
+
+    def __init__(self, args, client: httpx.AsyncClient, app_url: str, twilio: FakeTwilio):
+        self.args = args
+        self.client = client
+        self.app_url = app_url
+        self.twilio = twilio
+        self.dialed = 0
+        self.statuses: Dict[int, int] = {}
+        self.latencies: List[float] = []
+        self.samples: List[dict] = []
+        self.warm_calls: Optional[int] = None
+        self.start = 0.0
+
+    def hour(self) -> float:
+        """Simulated hour of the day since the start of the run"""
+        return (time.perf_counter() - self.start) / self.args.hour_seconds
+
+    async def dial(self, i: int):
+        number = i % self.args.customers if self.args.customers else i
+        sent = time.perf_counter()
+        try:
+            response = await self.client.post("/api/voice/outbound", json={
+                "phone_number": f"+9198{number:08d}",
+                "purpose": PURPOSES[i % len(PURPOSES)],
+                "sector": "banking",
+                "language": LANGUAGES[i % len(LANGUAGES)],
+                "customer_data": {"name": f"Customer {number}", "amount": str(1000 + i % 9000)},
+                "public_url": self.app_url
+            })
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        self.latencies.append(time.perf_counter() - sent)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    async def dialer(self):
+        """Paces calls to the profile; waits (falls behind) when --concurrency calls are in flight"""
+        slots = asyncio.Semaphore(self.args.concurrency)
+        pending = set()
+        next_call = time.perf_counter()
+
+        async def call(i: int):
+            try:
+                await self.dial(i)
+            finally:
+                slots.release()
+
+        while True:
+            hour = self.hour()
+            if hour >= self.args.hours:
+                break
+            rate = self.args.peak_cps * HOURLY_PROFILE[int(hour) % 24]
+            now = time.perf_counter()
+            if not rate:
+                # Idle hour: skip to the next one
+                next_call = self.start + (int(hour) + 1) * self.args.hour_seconds
+                await asyncio.sleep(max(0.0, next_call - now))
+                continue
+            if next_call > now:
+                await asyncio.sleep(next_call - now)
+            next_call = max(next_call, now - 1.0) + 1 / rate
+
+            await slots.acquire()
+            task = asyncio.create_task(call(self.dialed))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            self.dialed += 1
+
+            if self.warm_calls is None and self.dialed >= self.args.warmup_calls:
+                await self.warm_up()
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def warm_up(self):
+        """Start tracing in the app and take the baseline sample"""
+        self.warm_calls = self.dialed
+        await self.client.put("/api/admin/tracemalloc", params={"frames": self.args.trace_frames})
+        await self.sample()
+
+    async def sample(self):
+        response = await self.client.get("/api/admin/memory", params={"top": self.args.top})
+        response.raise_for_status()
+        snapshot = response.json()
+        self.samples.append({
+            "seconds": round(time.perf_counter() - self.start, 1),
+            "hour": round(self.hour(), 2),
+            "calls": self.dialed - (self.warm_calls or 0),
+            "rss": snapshot["rss_bytes"],
+            "traced": (snapshot["tracemalloc"] or {}).get("current_bytes", 0),
+            "gc_objects": snapshot["gc_objects"],
+            "objects": snapshot["objects"],
+            "top_allocations": (snapshot["tracemalloc"] or {}).get("top", []),
+            "stores": snapshot["stores"],
+            "loop_lag_ms": snapshot["loop"]["peak_lag_ms"],
+            "loop_stalls": snapshot["loop"]["stalls"]
+        })
+
+    async def sampler(self):
+        while True:
+            await asyncio.sleep(self.args.sample_seconds)
+            if self.warm_calls is not None:
+                await self.sample()
+
+    async def run(self) -> dict:
+        self.start = time.perf_counter()
+        sampler = asyncio.create_task(self.sampler())
+        try:
+            await self.dialer()
+            # Let every call hang up before the final sample
+            deadline = time.monotonic() + self.args.drain_timeout
+            while self.twilio.active and time.monotonic() < deadline:
+                await asyncio.sleep(0.2)
+        finally:
+            sampler.cancel()
+        if self.warm_calls is None:
+            raise RuntimeError(f"Only {self.dialed} calls dialled; fewer than --warmup-calls {self.args.warmup_calls}")
+        await self.sample()
+        return self.report()
+
+    def report(self) -> dict:
+        args, samples = self.args, self.samples
+        first, last = samples[0], samples[-1]
+        calls = [sample["calls"] for sample in samples]
+
+        def per_call(values: List[float]) -> float:
+            return slope(calls, values)
+
+        # Object types present throughout, growing fastest first
+        types = set(first["objects"]).intersection(*(sample["objects"] for sample in samples[1:]))
+        object_growth = sorted(
+            ((name, per_call([sample["objects"][name] for sample in samples])) for name in types),
+            key=lambda item: item[1], reverse=True
+        )
+        measured_calls = max(1, last["calls"])
+        growth = {
+            "rss_kb": round(per_call([sample["rss"] for sample in samples]) / 1024, 3),
+            "traced_kb": round(per_call([sample["traced"] for sample in samples]) / 1024, 3),
+            "gc_objects": round(per_call([sample["gc_objects"] for sample in samples]), 3),
+            "objects": {name: round(rate, 3) for name, rate in object_growth[:args.report_top] if rate > 0},
+            "allocation_sites_kb": {
+                site["where"]: round(site["bytes"] / measured_calls / 1024, 3)
+                for site in last["top_allocations"][:args.report_top]
+            }
+        }
+
+        failures = []
+        if growth["rss_kb"] > args.rss_budget_kb:
+            failures.append(f"RSS grows {growth['rss_kb']} KB per call (budget {args.rss_budget_kb})")
+        if growth["traced_kb"] > args.traced_budget_kb:
+            failures.append(f"Traced memory grows {growth['traced_kb']} KB per call (budget {args.traced_budget_kb})")
+        for name, rate in object_growth:
+            if rate > args.objects_budget:
+                failures.append(f"{name} objects grow {rate:.2f} per call (budget {args.objects_budget})")
+        lags = [sample["loop_lag_ms"] for sample in samples[1:]]
+        worst_lag = max(lags, default=0.0)
+        if worst_lag > args.max_loop_lag_ms:
+            failures.append(f"Event loop lagged {worst_lag} ms (budget {args.max_loop_lag_ms})")
+
+        return {
+            "hours": args.hours,
+            "hour_seconds": args.hour_seconds,
+            "peak_cps": args.peak_cps,
+            "calls": {
+                "dialled": self.dialed,
+                "warmup": self.warm_calls,
+                "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+                "outcomes": dict(sorted(self.twilio.outcomes.items())),
+                "still_active": self.twilio.active,
+                "latency_ms": percentiles(self.latencies)
+            },
+            "memory_mb": {
+                "rss_start": round(first["rss"] / 1e6, 1),
+                "rss_peak": round(max(sample["rss"] for sample in samples) / 1e6, 1),
+                "rss_end": round(last["rss"] / 1e6, 1),
+                "traced_end": round(last["traced"] / 1e6, 1)
+            },
+            "growth_per_call": growth,
+            "stores": {"start": first["stores"], "end": last["stores"]},
+            "loop": {
+                "lag_ms": percentiles([lag / 1000 for lag in lags]) if lags else {},
+                "worst_lag_ms": worst_lag,
+                "stalls": last["loop_stalls"] - first["loop_stalls"]
+            },
+            "failures": failures,
+            "timeline": [
+                {key: sample[key] for key in ("seconds", "hour", "calls", "rss", "traced", "gc_objects", "loop_lag_ms", "stores")}
+                for sample in samples
+            ]
+        }
+
+
+def print_report(report: dict):
+    calls, memory, growth, loop = report["calls"], report["memory_mb"], report["growth_per_call"], report["loop"]
+    print(f"\nSoak: {report['hours']} simulated hours of {report['hour_seconds']} s, peak {report['peak_cps']} calls/s")
+    print(f"Calls: {calls['dialled']:,} dialled ({calls['warmup']:,} warm-up), statuses {calls['statuses']}, "
+          f"outcomes {calls['outcomes']}, {calls['still_active']} still active")
+    print(f"POST /outbound: p50 {calls['latency_ms']['p50']:.1f}  p95 {calls['latency_ms']['p95']:.1f}  "
+          f"p99 {calls['latency_ms']['p99']:.1f} ms")
+    print(f"Memory: RSS {memory['rss_start']} -> {memory['rss_end']} MB (peak {memory['rss_peak']}), "
+          f"{memory['traced_end']} MB allocated since warm-up still alive")
+    print(f"Growth per call: RSS {growth['rss_kb']} KB, traced {growth['traced_kb']} KB, "
+          f"{growth['gc_objects']} gc objects")
+    if growth["objects"]:
+        print("  Objects per call")
+        for name, rate in growth["objects"].items():
+            print(f"    {name:<48} {rate:>8.3f}")
+    if growth["allocation_sites_kb"]:
+        print("  Live KB per call by allocation site")
+        for where, kb in growth["allocation_sites_kb"].items():
+            print(f"    {where:<48} {kb:>8.3f}")
+    print("Stores: " + ", ".join(
+        f"{name} {report['stores']['start'][name]:,} -> {size:,}" for name, size in report["stores"]["end"].items()
+    ))
+    if loop["lag_ms"]:
+        print(f"Event loop lag per sample: p50 {loop['lag_ms']['p50']:.1f}  p95 {loop['lag_ms']['p95']:.1f}  "
+              f"worst {loop['worst_lag_ms']:.1f} ms, {loop['stalls']} stalls")
+    if report["failures"]:
+        print("\nFAILED")
+        for failure in report["failures"]:
+            print(f"  {failure}")
+    else:
+        print("\nWithin budget")
+
+
+async def main(args) -> int:
+    providers = FakeProviderServer(create_fake_app(
+        llm_latency_ms=args.llm_latency_ms,
+        tts_latency_ms=args.tts_latency_ms,
+        error_rate=args.tts_error_rate,
+        seed=args.seed
+    )).start()
+    twilio = FakeTwilio(
+        AUTH_TOKEN,
+        create_latency_ms=args.twilio_latency_ms,
+        ring_ms=args.ring_ms,
+        talk_ms=args.talk_ms,
+        error_rate=args.twilio_error_rate,
+        no_answer_rate=args.no_answer_rate,
+        seed=args.seed
+    )
+    twilio_server = FakeProviderServer(twilio.create_app()).start()
+
+    port = _free_port()
+    app_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory(prefix="soak-") as data_dir:
+        process = start_app(port, providers.base_url, twilio_server.base_url, data_dir, extra_env={
+            "ADMIN_API_ENABLED": "True",
+            "LOOP_WATCHDOG_ENABLED": "True"
+        })
+        limits = httpx.Limits(max_connections=args.concurrency + 4)
+        try:
+            async with httpx.AsyncClient(base_url=app_url, timeout=120.0, limits=limits) as client:
+                await wait_healthy(client, process)
+                report = await Soak(args, client, app_url, twilio).run()
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            twilio_server.stop()
+            providers.stop()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=24, help="Simulated hours to run")
+    parser.add_argument("--hour-seconds", type=float, default=60, help="Real seconds per simulated hour")
+    parser.add_argument("--peak-cps", type=float, default=10, help="Dialing rate at the daily peak")
+    parser.add_argument("--concurrency", type=int, default=50, help="Outbound requests in flight at most")
+    parser.add_argument("--customers", type=int, default=0, help="Distinct numbers dialled (0: a new number every call)")
+    parser.add_argument("--warmup-calls", type=int, default=200, help="Calls before the baseline sample")
+    parser.add_argument("--sample-seconds", type=float, default=15, help="Seconds between memory samples")
+    parser.add_argument("--top", type=int, default=200, help="Object types and allocation sites per sample")
+    parser.add_argument("--trace-frames", type=int, default=1, help="tracemalloc frames per allocation")
+    parser.add_argument("--report-top", type=int, default=10, help="Growing types and sites to print")
+    parser.add_argument("--rss-budget-kb", type=float, default=4.0, help="Allowed RSS growth per call")
+    parser.add_argument("--traced-budget-kb", type=float, default=1.0, help="Allowed live traced bytes per call")
+    parser.add_argument("--objects-budget", type=float, default=0.5, help="Allowed growth per call of any object type")
+    parser.add_argument("--max-loop-lag-ms", type=float, default=250, help="Allowed worst event loop lag")
+    parser.add_argument("--tts-latency-ms", default="lognormal:250:1200", help="300, uniform:LO:HI or lognormal:P50:P99")
+    parser.add_argument("--llm-latency-ms", default="lognormal:300:1500")
+    parser.add_argument("--twilio-latency-ms", default="lognormal:150:600", help="Calls API create")
+    parser.add_argument("--ring-ms", default="uniform:500:3000")
+    parser.add_argument("--talk-ms", default="uniform:3000:10000")
+    parser.add_argument("--tts-error-rate", type=float, default=0.0)
+    parser.add_argument("--twilio-error-rate", type=float, default=0.0)
+    parser.add_argument("--no-answer-rate", type=float, default=0.1)
+    parser.add_argument("--drain-timeout", type=float, default=120.0, help="Seconds to wait for calls to hang up")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", default=None, help="Also write the report to this file")
+    raise SystemExit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,17 @@
+"""
+Test configuration
+
+Settings are read at import time, so the required provider keys and
+scratch directories are set before any app module is imported.
+"""
+
+import os
+import tempfile
+
+_scratch = tempfile.mkdtemp(prefix="bfsi-tests-")
+
+for key in ("GROQ_API_KEY", "SARVAM_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"):
+    os.environ.setdefault(key, "test")
+os.environ.setdefault("LOG_DIR", os.path.join(_scratch, "logs"))
+os.environ.setdefault("AUDIT_STORE_DIR", os.path.join(_scratch, "audit"))
+os.environ.setdefault("CONSENT_DB_PATH", os.path.join(_scratch, "consent.db"))
@@ -0,0 +1,79 @@
+"""DND registry: generations written by another process reach running readers"""
+
+import asyncio
+import threading
+
+from app.core.config import settings
+from app.services.dnd_registry import DNDRegistry
+
+
+def _scrub_file(tmp_path, name, numbers):
+    path = tmp_path / name
+    path.write_text("\n".join(numbers) + "\n")
+    return str(path)
+
+
+def test_reader_picks_up_delta_from_another_writer(tmp_path):
+    directory = str(tmp_path / "dnd")
+    writer = DNDRegistry(directory=directory)
+    writer.load_full([_scrub_file(tmp_path, "full.csv", ["9876543210", "9123456789"])])
+
+    reader = DNDRegistry(directory=directory).load()
+    assert not reader.contains("9000000001")
+    assert not reader.reload_if_changed()
+
+    writer.apply_delta(added=[_scrub_file(tmp_path, "add.csv", ["9000000001"])])
+    assert not reader.contains("9000000001")
+    assert reader.reload_if_changed()
+    assert reader.contains("9000000001")
+    assert reader.contains("+91 98765 43210")
+    assert reader.generation == writer.generation
+
+
+def test_background_poll_reloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DND_RELOAD_INTERVAL_SECONDS", 0.05)
+    directory = str(tmp_path / "dnd")
+    writer = DNDRegistry(directory=directory)
+    writer.load_full([_scrub_file(tmp_path, "full.csv", ["9876543210"])])
+    reader = DNDRegistry(directory=directory).load()
+
+    async def run():
+        await reader.start()
+        writer.apply_delta(added=[_scrub_file(tmp_path, "add.csv", ["9000000002"])])
+        for _ in range(100):
+            if reader.contains("9000000002"):
+                break
+            await asyncio.sleep(0.02)
+        await reader.stop()
+
+    asyncio.run(run())
+    assert reader.contains("9000000002")
+
+
+def test_lookups_during_reloads_never_miss(tmp_path):
+    directory = str(tmp_path / "dnd")
+    numbers = [f"98{i:08d}" for i in range(2000)]
+    writer = DNDRegistry(directory=directory)
+    writer.load_full([_scrub_file(tmp_path, "full.csv", numbers)])
+    reader = DNDRegistry(directory=directory).load()
+
+    misses = []
+    done = threading.Event()
+
+    def lookups():
+        while not done.is_set():
+            if not reader.contains(numbers[0]) or not reader.contains_many(numbers[:50]).all():
+                misses.append(reader.generation)
+
+    thread = threading.Thread(target=lookups)
+    thread.start()
+    try:
+        for i in range(20):
+            # Growing deltas change the Bloom filter size every generation
+            extra = [f"97{j:08d}" for j in range(i * 500)]
+            writer.apply_delta(added=[_scrub_file(tmp_path, f"add{i}.csv", extra)])
+            reader.reload_if_changed()
+    finally:
+        done.set()
+        thread.join()
+    assert misses == []
@@ -0,0 +1,42 @@
+"""Fast-path intent classifier"""
+
+import pytest
+
+from app.services.intent_classifier import IntentClassifier
+
+
+@pytest.fixture
+def classifier():
+    return IntentClassifier(min_confidence=0.7, cache_size=0)
+
+
+@pytest.mark.parametrize("utterance", [
+    "is it paid?",
+    "is it paid",
+    "what if it's not paid",
+    "I have not paid yet",
+    "I haven't paid",
+    "did I already pay",
+    "paid?",
+    "kya payment ho gaya",
+    "क्या भुगतान कर दिया",
+])
+def test_questions_and_negations_go_to_llm(classifier, utterance):
+    assert classifier.classify_local(utterance) is None
+
+
+@pytest.mark.parametrize("utterance, intent", [
+    ("I already paid", "already_paid"),
+    ("payment done", "already_paid"),
+    ("maine bhar diya", "already_paid"),
+    ("no", "denial"),
+    ("not interested", "denial"),
+    ("don't call me", "opt_out"),
+    ("call me later, I am busy", "callback_request"),
+    ("yes", "affirmation"),
+])
+def test_short_replies_stay_on_fast_path(classifier, utterance, intent):
+    result = classifier.classify_local(utterance)
+    assert result is not None
+    assert result["intent"] == intent
+    assert result["source"] == "fast_path"
@@ -0,0 +1,27 @@
+"""BM25 lexical index"""
+
+import numpy as np
+
+from app.services.lexical_index import LexicalIndex
+
+
+def test_idf_counts_only_documents_with_text(tmp_path):
+    documents = [(0, "auto debit mandate"), (1, "loan foreclosure charges"), (2, "credit card bill")]
+
+    sparse = LexicalIndex(directory=str(tmp_path / "sparse"))
+    # Rows 3..99 are empty (deleted chunks left out of the rebuild)
+    sparse.build(documents, num_rows=100)
+    dense = LexicalIndex(directory=str(tmp_path / "dense"))
+    dense.build(documents, num_rows=3)
+
+    assert sparse.num_docs == dense.num_docs == 3
+    sparse_scores, sparse_rows = sparse.search("foreclosure charges")
+    dense_scores, dense_rows = dense.search("foreclosure charges")
+    assert sparse_rows.tolist() == dense_rows.tolist() == [1]
+    np.testing.assert_allclose(sparse_scores, dense_scores, rtol=1e-6)
+
+
+def test_document_count_survives_reload(tmp_path):
+    index = LexicalIndex(directory=str(tmp_path))
+    index.build([(0, "emi due date"), (5, "late fee")], num_rows=10)
+    assert LexicalIndex(directory=str(tmp_path)).load().num_docs == 2
@@ -0,0 +1,112 @@
+"""Log pipeline: PII masking of structured extras and audit delivery"""
+
+import json
+import threading
+
+from loguru import logger
+
+from app.core.logging import LogPipeline
+from app.services.audit_store import AuditStore
+
+
+def _pipeline(tmp_path):
+    pipeline = LogPipeline(tmp_path / "logs")
+    pipeline._masker()
+    pipeline._audit_store = AuditStore(directory=str(tmp_path / "audit")).open()
+    handler = logger.add(pipeline, format="{message}", catch=False)
+    return pipeline, handler
+
+
+def _app_lines(tmp_path):
+    lines = []
+    for path in (tmp_path / "logs").glob("app_*.jsonl"):
+        lines += [json.loads(line) for line in path.read_text().splitlines()]
+    return lines
+
+
+def test_large_integer_in_extra_keeps_batch_and_audit_events(tmp_path):
+    pipeline, handler = _pipeline(tmp_path)
+    try:
+        logger.bind(AUDIT=True, event="call_started", user_id="u1", metadata={"call_id": "c1"}).info("AUDIT: call_started")
+        logger.bind(amount_paise=12345678901, nested={"phone": 9876543210, "note": "ok"}).info("payment received")
+        logger.bind(AUDIT=True, event="call_started", user_id="u2", metadata={"call_id": "c2"}).info("AUDIT: call_started")
+        pipeline._drain()
+    finally:
+        logger.remove(handler)
+
+    assert [event["call_id"] for event in pipeline._audit_store.query(event="call_started")] == ["c1", "c2"]
+
+    payment = next(line for line in _app_lines(tmp_path) if line["message"] == "payment received")
+    assert payment["extra"]["amount_paise"] == "[ACCOUNT_REDACTED]"
+    assert payment["extra"]["nested"] == {"phone": "[PHONE_REDACTED]", "note": "ok"}
+    pipeline._audit_store.close()
+
+
+def test_small_numbers_and_flags_are_kept(tmp_path):
+    pipeline, handler = _pipeline(tmp_path)
+    try:
+        logger.bind(attempt=3, ratio=0.5, retry=True, reason=None, tags=("a", "b")).info("retrying")
+        pipeline._drain()
+    finally:
+        logger.remove(handler)
+
+    retry = next(line for line in _app_lines(tmp_path) if line["message"] == "retrying")
+    assert retry["extra"] == {"attempt": 3, "ratio": 0.5, "retry": True, "reason": None, "tags": ["a", "b"]}
+    pipeline._audit_store.close()
+
+
+def test_unformattable_record_still_reaches_audit_store(tmp_path, monkeypatch):
+    pipeline, handler = _pipeline(tmp_path)
+
+    def broken(value):
+        raise ValueError("cannot format")
+
+    monkeypatch.setattr(pipeline, "_mask_value", broken)
+    try:
+        logger.bind(AUDIT=True, event="consent_recorded", user_id="u3", metadata={"call_id": "c3"}).info("AUDIT: consent_recorded")
+        pipeline._drain()
+    finally:
+        logger.remove(handler)
+
+    events = pipeline._audit_store.query(call_id="c3")
+    assert [event["event"] for event in events] == ["consent_recorded"]
+    assert any(line.get("format_error") for line in _app_lines(tmp_path))
+    pipeline._audit_store.close()
+
+
+def test_full_queue_drops_info_but_not_audit(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.logging.QUEUE_MAX_RECORDS", 1)
+    pipeline, handler = _pipeline(tmp_path)
+
+    # Stall the writer on its first batch so the queue fills up
+    stalled, release = threading.Event(), threading.Event()
+    write_batch = pipeline._write_batch
+
+    def slow_write(records):
+        stalled.set()
+        release.wait()
+        write_batch(records)
+
+    monkeypatch.setattr(pipeline, "_write_batch", slow_write)
+    try:
+        logger.info("first")
+        stalled.wait()
+        logger.info("queued")
+        logger.info("dropped")
+        assert pipeline.stats() == {"queued": 1, "dropped": 1}
+
+        audit = threading.Thread(target=lambda: logger.bind(
+            AUDIT=True, event="call_ended", user_id="u4", metadata={"call_id": "c4"}
+        ).info("AUDIT: call_ended"))
+        audit.start()
+        audit.join(0.2)
+        assert audit.is_alive()  # blocked, not dropped
+        release.set()
+        audit.join()
+        pipeline._drain()
+    finally:
+        release.set()
+        logger.remove(handler)
+
+    assert [event["call_id"] for event in pipeline._audit_store.query(event="call_ended")] == ["c4"]
+    pipeline._audit_store.close()
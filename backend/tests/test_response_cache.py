@@ -0,0 +1,38 @@
+"""Response cache: the semantic tier must not answer a different question"""
+
+import pytest
+
+from app.services.response_cache import ResponseCache
+
+CACHED = "How do I enable auto-debit for my home loan EMI from my savings account?"
+
+
+@pytest.fixture
+def cache():
+    # A loose threshold, so every near miss below clears it on similarity alone
+    cache = ResponseCache(ttl_seconds=60, max_bytes=1 << 20, similarity_threshold=0.8)
+    cache.put(CACHED, "banking", "en", "To enable auto-debit...")
+    return cache
+
+
+@pytest.mark.parametrize("query", [
+    "How do I disable auto-debit for my home loan EMI from my savings account?",
+    "Why can I not enable auto-debit for my home loan EMI from my savings account?",
+    "How do I enable auto-debit for my home loan EMI from my current account?",
+])
+def test_near_miss_questions_do_not_hit(cache, query):
+    embed = cache.embedder.embed_one
+    assert float(embed(CACHED) @ embed(query)) >= cache.similarity_threshold
+    assert cache.get(query, "banking", "en") is None
+
+
+def test_rephrasing_with_same_content_words_hits(cache):
+    hit = cache.get("Please tell me how do I enable auto-debit for the home loan EMI from a savings account", "banking", "en")
+    assert hit is not None
+    assert hit["match"] == "semantic"
+    assert hit["text"] == "To enable auto-debit..."
+
+
+def test_exact_repeat_hits(cache):
+    hit = cache.get(CACHED.lower(), "banking", "en")
+    assert hit is not None and hit["match"] == "exact"
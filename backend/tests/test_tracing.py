@@ -0,0 +1,16 @@
+"""Call trace export"""
+
+from app.core.config import settings
+from app.core.tracing import CallTrace, OTLPExporter
+
+
+def test_repeated_terminal_callbacks_export_once(monkeypatch):
+    monkeypatch.setattr(settings, "OTEL_EXPORT_ENABLED", True)
+    exporter = OTLPExporter()
+    trace = CallTrace("call-1")
+
+    for status in ("no-answer", "failed", "completed"):
+        trace.event(f"status:{status}")
+        exporter.submit(trace)
+
+    assert exporter._pending == [trace]
@@ -0,0 +1,79 @@
+"""Sentence-streaming voice endpoint"""
+
+import base64
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import voice
+from app.main import app
+from app.services.response_cache import response_cache
+
+
+def _events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_tts(text, language="en", **kwargs):
+        return b"RIFF" + text.encode() * 400
+
+    monkeypatch.setattr(voice.sarvam_service, "text_to_speech", fake_tts)
+    return TestClient(app)
+
+
+def test_text_only_cache_hit_skips_llm(client, monkeypatch):
+    response_cache.put("what is my emi due date", "banking", "en", "Your EMI is due on the 5th. Pay on time.")
+
+    def no_llm(*args, **kwargs):
+        raise AssertionError("LLM called on a cache hit")
+
+    async def no_rag(*args, **kwargs):
+        raise AssertionError("RAG called on a cache hit")
+
+    monkeypatch.setattr(voice.groq_service, "stream_bfsi_response", no_llm)
+    monkeypatch.setattr(voice.rag_service, "get_context", no_rag)
+
+    response = client.post("/api/voice/query/stream", json={
+        "text": "What is my EMI due date?", "sector": "banking", "language": "en"
+    })
+    assert response.status_code == 200
+    events = _events(response.text)
+    assert [name for name, _ in events] == ["audio", "audio", "done"]
+    assert [data["text"] for name, data in events[:2]] == ["Your EMI is due on the 5th.", "Pay on time."]
+    assert events[-1][1]["text_response"] == "Your EMI is due on the 5th. Pay on time."
+
+
+def test_tts_failure_sends_error_event(monkeypatch):
+    # Real Sarvam service; its HTTP call fails on the second sentence
+    async def post(url, json=None, **kwargs):
+        if json["text"].startswith("Second"):
+            raise httpx.ConnectError("connection refused")
+        audio = base64.b64encode(b"RIFF" + b"\0" * 400).decode()
+        return httpx.Response(200, json={"audios": [audio]}, request=httpx.Request("POST", url))
+
+    async def sentences(**kwargs):
+        for sentence in ("First sentence here.", "Second sentence here.", "Third sentence here."):
+            yield sentence
+
+    async def no_context(*args, **kwargs):
+        return ""
+
+    monkeypatch.setattr(voice.sarvam_service.client, "post", post)
+    monkeypatch.setattr(voice.groq_service, "stream_bfsi_response", sentences)
+    monkeypatch.setattr(voice.rag_service, "get_context", no_context)
+
+    response = TestClient(app).post("/api/voice/query/stream", json={
+        "text": "Tell me about my loan statement", "sector": "banking", "language": "en"
+    })
+    assert response.status_code == 200
+    events = _events(response.text)
+    assert [name for name, _ in events] == ["audio", "error"]
+    assert events[1][1]["index"] == 1
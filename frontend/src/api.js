@@ -1,11 +1,17 @@
 import axios from 'axios'
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
+// Local development only: VITE_* values are compiled into the public bundle,
+// so production builds never read the token (vite.config.js refuses to build
+// with one set). In production, authenticate users in front of the API.
+const API_TOKEN = import.meta.env.DEV ? import.meta.env.VITE_API_TOKEN : undefined
 
 const api = axios.create({
     baseURL: API_BASE_URL,
     headers: {
-        'Content-Type': 'application/json'
+        'Content-Type': 'application/json',
+        // Needed when a local backend runs with AUTH_ENABLED=True
+        ...(API_TOKEN ? { Authorization: `Bearer ${API_TOKEN}` } : {})
     }
 })
 
@@ -1,16 +1,23 @@
-import { defineConfig } from 'vite'
+import { defineConfig, loadEnv } from 'vite'
 import react from '@vitejs/plugin-react'
 
 // https://vitejs.dev/config/
-export default defineConfig({
-  plugins: [react()],
-  server: {
-    port: 3000,
-    host: true,
-    proxy: {
-      '/api': {
-        target: 'http://localhost:8001',
-        changeOrigin: true
+export default defineConfig(({ command, mode }) => {
+  // VITE_* values end up in the public bundle; the API token is for `vite dev` only
+  if (command === 'build' && loadEnv(mode, process.cwd()).VITE_API_TOKEN) {
+    throw new Error('VITE_API_TOKEN is set: it would be readable by anyone who loads the app. Unset it for builds.')
+  }
+
+  return {
+    plugins: [react()],
+    server: {
+      port: 3000,
+      host: true,
+      proxy: {
+        '/api': {
+          target: 'http://localhost:8001',
+          changeOrigin: true
+        }
       }
     }
   }